@@ -0,0 +1,229 @@
+"""Admission control: per-client rate limiting and bounded per-endpoint queues."""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from .metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS
+
+# Constants
+DEFAULT_RATE_PER_MINUTE = 60.0
+DEFAULT_BURST = 20
+DEFAULT_MAX_CLIENTS = 10_000
+DEFAULT_QUEUE_TIMEOUT_SECONDS = 10.0
+# Starting estimate of how long a request holds its slot (for Retry-After)
+INITIAL_SERVICE_SECONDS = 1.0
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class Rejected(Exception):
+    """A request was not admitted; carries the HTTP status and Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+@dataclass
+class TokenBucket:
+    """Refills at rate tokens per second, holding at most burst tokens."""
+
+    rate: float
+    burst: float
+    tokens: float
+    updated_at: float
+
+    def take(self, cost: float, now: float) -> float:
+        """
+        Take cost tokens if available.
+
+        Returns:
+            0.0 if taken, else seconds until enough tokens will have refilled
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Token bucket per client (API key or IP address) and endpoint.
+
+    Each endpoint has its own bucket, so uploads or a batch do not use up a
+    client's query allowance. Buckets of the least recently seen clients are dropped beyond
+    max_clients, so memory stays bounded; a dropped client starts again with
+    a full bucket.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        burst: int = DEFAULT_BURST,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate_per_minute: Sustained requests per client per minute (0 disables)
+            burst: Requests a client can make at once after being idle
+            max_clients: Most (client, endpoint) buckets tracked at a time
+        """
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[tuple[str, str], TokenBucket] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether requests are limited at all."""
+        return self.rate > 0
+
+    def check(self, client_id: str, endpoint: str, cost: int = 1) -> None:
+        """
+        Charge a request to a client's bucket for an endpoint.
+
+        Args:
+            client_id: Client identity
+            endpoint: Endpoint the bucket is for (also the rejection counter label)
+            cost: Tokens to take (capped at burst, so any request can pass eventually)
+
+        Raises:
+            Rejected: 429 if the client is over its rate
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        key = (client_id, endpoint)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst, self.burst, now)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            wait = bucket.take(min(cost, self.burst), now)
+        if wait:
+            ADMISSION_REJECTIONS.labels(endpoint=endpoint, reason="rate_limited").inc()
+            raise Rejected(429, "Too many requests, slow down", wait)
+
+
+class AdmissionGate:
+    """
+    Concurrency cap with a bounded wait queue for one endpoint.
+
+    At most max_concurrency requests run at once; up to max_queue more wait
+    for a slot, each for at most queue_timeout seconds. Anything beyond that
+    is rejected at once with a 503, so a burst fails fast instead of piling
+    onto Gemini. Retry-After is estimated from the smoothed time requests
+    hold a slot.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            endpoint: Endpoint label for metrics
+            max_concurrency: Requests running at once
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Longest wait for a slot, in seconds
+        """
+        self.endpoint = endpoint
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.waiting = 0
+        self.service_seconds = INITIAL_SERVICE_SECONDS
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _retry_after(self) -> float:
+        """Rough time until a slot frees up for a new arrival."""
+        return self.service_seconds * (self.waiting + 1) / self.max_concurrency
+
+    def _reject(self, reason: str, detail: str) -> Rejected:
+        ADMISSION_REJECTIONS.labels(endpoint=self.endpoint, reason=reason).inc()
+        return Rejected(503, detail, self._retry_after())
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot (call release() when done).
+
+        Raises:
+            Rejected: 503 if the queue is full or the wait times out
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.running >= self.max_concurrency and self.waiting >= self.max_queue:
+            raise self._reject("queue_full", "Server busy, request queue is full")
+
+        self.waiting += 1
+        ADMISSION_QUEUE_DEPTH.labels(endpoint=self.endpoint).inc()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            raise self._reject(
+                "queue_timeout", f"Server busy, no slot within {self.queue_timeout:g}s"
+            ) from None
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.labels(endpoint=self.endpoint).dec()
+        self.running += 1
+        ADMISSION_IN_FLIGHT.labels(endpoint=self.endpoint).inc()
+
+    def release(self, held_seconds: float) -> None:
+        """Free a slot and fold its hold time into the Retry-After estimate."""
+        self.running -= 1
+        ADMISSION_IN_FLIGHT.labels(endpoint=self.endpoint).dec()
+        self.service_seconds += SERVICE_TIME_SMOOTHING * (held_seconds - self.service_seconds)
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+
+def gate_from_env(endpoint: str, default_concurrency: int, default_queue: int) -> AdmissionGate:
+    """
+    Build an endpoint's gate from ADMISSION_<ENDPOINT>_CONCURRENCY/_QUEUE.
+
+    The queue timeout comes from ADMISSION_QUEUE_TIMEOUT_SECONDS.
+    """
+    prefix = f"ADMISSION_{endpoint.upper()}"
+    return AdmissionGate(
+        endpoint,
+        max_concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", str(default_concurrency))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(default_queue))),
+        queue_timeout=float(
+            os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", str(DEFAULT_QUEUE_TIMEOUT_SECONDS))
+        ),
+    )
@@ -0,0 +1,128 @@
+"""Provider interface for the Gemini SDK calls used by the API and ingestion."""
+import os
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional, Protocol
+
+# Constants
+GEMINI_BACKEND = "gemini"
+FAKE_BACKEND = "fake"
+
+
+class ModelsAPI(Protocol):
+    """Generation and embedding calls (client.models)."""
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None) -> Any: ...
+
+    def generate_content_stream(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> Iterator[Any]: ...
+
+    def embed_content(self, *, model: str, contents: Any, config: Any = None) -> Any: ...
+
+
+class FilesAPI(Protocol):
+    """Files API calls (client.files)."""
+
+    def upload(self, *, file: Any, config: Any = None) -> Any: ...
+
+    def get(self, *, name: str, config: Any = None) -> Any: ...
+
+    def list(self, *, config: Any = None) -> Iterable[Any]: ...
+
+
+class DocumentsAPI(Protocol):
+    """Store document calls (client.file_search_stores.documents)."""
+
+    def list(self, *, parent: str, config: Any = None) -> Iterable[Any]: ...
+
+    def delete(self, *, name: str, config: Any = None) -> None: ...
+
+
+class FileSearchStoresAPI(Protocol):
+    """File Search store calls (client.file_search_stores)."""
+
+    @property
+    def documents(self) -> DocumentsAPI: ...
+
+    def list(self, *, config: Any = None) -> Iterable[Any]: ...
+
+    def create(self, *, config: Any = None) -> Any: ...
+
+    def get(self, *, name: str, config: Any = None) -> Any: ...
+
+    def upload_to_file_search_store(
+        self, *, file_search_store_name: str, file: Any, config: Any = None
+    ) -> Any: ...
+
+    def import_file(
+        self, *, file_search_store_name: str, file_name: str, config: Any = None
+    ) -> Any: ...
+
+
+class OperationsAPI(Protocol):
+    """Long-running operation polling (client.operations)."""
+
+    def get(self, operation: Any, *, config: Any = None) -> Any: ...
+
+
+class CachesAPI(Protocol):
+    """Context caching calls (client.caches)."""
+
+    def create(self, *, model: str, config: Any = None) -> Any: ...
+
+
+class GenaiBackend(Protocol):
+    """
+    The subset of genai.Client that this app uses.
+
+    genai.Client satisfies it as is; app.fake_backend.FakeGenaiClient is an
+    offline stand-in for load tests and benchmarks.
+    """
+
+    @property
+    def models(self) -> ModelsAPI: ...
+
+    @property
+    def files(self) -> FilesAPI: ...
+
+    @property
+    def file_search_stores(self) -> FileSearchStoresAPI: ...
+
+    @property
+    def operations(self) -> OperationsAPI: ...
+
+    @property
+    def caches(self) -> CachesAPI: ...
+
+
+def backend_name() -> str:
+    """Configured backend (GEMINI_BACKEND: "gemini" or "fake")."""
+    return os.getenv("GEMINI_BACKEND", GEMINI_BACKEND).strip().lower()
+
+
+def uses_fake_backend() -> bool:
+    """Whether the offline fake backend is configured (no API key needed)."""
+    return backend_name() == FAKE_BACKEND
+
+
+def create_genai_client(api_key: Optional[str] = None) -> GenaiBackend:
+    """
+    Create the SDK client for the configured backend.
+
+    Args:
+        api_key: Gemini API key (ignored by the fake backend)
+
+    Returns:
+        The process-wide genai.Client (shared connection pool), or a
+        FakeGenaiClient when GEMINI_BACKEND=fake
+    """
+    name = backend_name()
+    if name == FAKE_BACKEND:
+        from .fake_backend import FakeGenaiClient, FakeSettings
+
+        return FakeGenaiClient(FakeSettings.from_env())
+    if name != GEMINI_BACKEND:
+        raise ValueError(f"Unknown GEMINI_BACKEND: {name} (use {GEMINI_BACKEND} or {FAKE_BACKEND})")
+    from .connections import shared_genai_client
+
+    return shared_genai_client(api_key)
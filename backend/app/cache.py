@@ -0,0 +1,325 @@
+"""In-memory answer cache for /api/query."""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from .models import CacheStatsResponse, QueryResponse
+from .shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 3600
+STORE_VERSIONS_DIRNAME = "store-versions"
+SHARED_KEY_PREFIX = "query:"
+
+CacheKey = tuple[str, str, str]
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different phrasings share a cache key."""
+    normalized = re.sub(r"\s+", " ", question.strip().lower())
+    return normalized.rstrip(" ?!.")
+
+
+def hash_prompt(system_prompt: str) -> str:
+    """Return a short stable hash of the system prompt."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def _store_version_marker(data_dir: str | Path, store: str) -> Path:
+    return Path(data_dir) / STORE_VERSIONS_DIRNAME / quote(store, safe="")
+
+
+def read_store_version(data_dir: str | Path, stores: str | Sequence[str]) -> str:
+    """
+    Read the version of one File Search store, or of several together.
+
+    Each store has a marker file under the data directory that is touched
+    whenever a document is added to or removed from the store, by /api/upload
+    or by ingestion.py (whatever folder it ingests), so its mtime acts as a
+    version that is shared across processes.
+
+    Args:
+        data_dir: Local state directory (DATA_DIR) holding the markers
+        stores: Store display name, or several (e.g. a federated query)
+
+    Returns:
+        Opaque version string ("0" for a store that never changed)
+    """
+    names = [stores] if isinstance(stores, str) else sorted(stores)
+    versions = []
+    for name in names:
+        try:
+            versions.append(str(_store_version_marker(data_dir, name).stat().st_mtime_ns))
+        except OSError:
+            versions.append("0")
+    return "+".join(versions)
+
+
+def bump_store_version(data_dir: str | Path, store: str) -> None:
+    """Mark a File Search store as changed."""
+    marker = _store_version_marker(data_dir, store)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.write_text(str(time.time_ns()))
+
+
+def _cosine_similarity(a: list[float], b: list[float]) -> float:
+    """Cosine similarity between two vectors (0.0 for empty or zero vectors)."""
+    dot = sum(x * y for x, y in zip(a, b, strict=False))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+@dataclass
+class CacheEntry:
+    """A cached query response."""
+
+    response: QueryResponse
+    store_version: str
+    created_at: float = field(default_factory=time.monotonic)
+    embedding: Optional[list[float]] = None
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query responses with TTL and store-version invalidation.
+
+    Entries are keyed on (normalized question, system prompt hash, store name).
+    When a similarity threshold is configured, callers can also look up entries
+    by question embedding so near-duplicate phrasings hit the cache.
+
+    With shared state, exact-match answers are also written there, and a
+    local miss is looked up in it, so an answer computed by one worker
+    process is served by all of them. The similarity tier stays per process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        similarity_threshold: Optional[float] = None,
+        shared: Optional[SharedState] = None,
+    ):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # max_entries=0 disables caching, shared tier included
+        self.shared = shared if max_entries > 0 else None
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        """Whether the embedding-similarity tier is enabled."""
+        return self.similarity_threshold is not None
+
+    @staticmethod
+    def make_key(
+        question: str, system_prompt: str, store_name: str, generation: str = ""
+    ) -> CacheKey:
+        """
+        Build the cache key for a query.
+
+        generation describes non-default generation settings (output limit,
+        temperature); answers produced with different settings are cached apart.
+        """
+        prompt_key = f"{system_prompt}\n{generation}" if generation else system_prompt
+        return normalize_question(question), hash_prompt(prompt_key), store_name
+
+    def _is_fresh(self, entry: CacheEntry, store_version: str) -> bool:
+        """Check TTL and store version of an entry."""
+        if entry.store_version != store_version:
+            return False
+        return time.monotonic() - entry.created_at < self.ttl_seconds
+
+    def get(self, key: CacheKey, store_version: str) -> Optional[QueryResponse]:
+        """
+        Look up an exact match.
+
+        Args:
+            key: Cache key from make_key()
+            store_version: Current store version; older entries are dropped
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry, store_version):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+            if entry is not None:
+                del self._entries[key]
+
+        shared = self._shared_get(key, store_version)
+        with self._lock:
+            if shared is None:
+                self.misses += 1
+                return None
+            self._entries[key] = shared
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.hits += 1
+            self.shared_hits += 1
+            return shared.response
+
+    @staticmethod
+    def _shared_key(key: CacheKey) -> str:
+        digest = hashlib.sha256("\x1f".join(key).encode("utf-8")).hexdigest()
+        return f"{SHARED_KEY_PREFIX}{digest}"
+
+    def _shared_get(self, key: CacheKey, store_version: str) -> Optional[CacheEntry]:
+        """Entry another worker cached for this key, if fresh for store_version."""
+        if self.shared is None:
+            return None
+        try:
+            raw = self.shared.get(self._shared_key(key))
+        except Exception as e:
+            logger.warning(f"Shared query cache unavailable: {e}")
+            return None
+        if raw is None:
+            return None
+        stored = json.loads(raw)
+        if stored["store_version"] != store_version:
+            return None
+        age = max(0.0, time.time() - stored["cached_at"])
+        return CacheEntry(
+            response=QueryResponse.model_validate(stored["response"]),
+            store_version=store_version,
+            created_at=time.monotonic() - age,
+        )
+
+    def _shared_put(self, key: CacheKey, response: QueryResponse, store_version: str) -> None:
+        if self.shared is None:
+            return
+        value = json.dumps(
+            {
+                "store_version": store_version,
+                "cached_at": time.time(),
+                "response": response.model_dump(mode="json"),
+            }
+        )
+        try:
+            self.shared.set(self._shared_key(key), value, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Could not share cached answer: {e}")
+
+    def get_similar(
+        self, key: CacheKey, embedding: list[float], store_version: str
+    ) -> Optional[QueryResponse]:
+        """
+        Look up the closest entry by question embedding.
+
+        Only entries with the same prompt hash and store name are considered.
+        A hit converts the miss recorded by get() into a semantic hit.
+
+        Args:
+            key: Cache key from make_key()
+            embedding: Embedding of the question
+            store_version: Current store version
+
+        Returns:
+            Cached response, or None if nothing is above the threshold
+        """
+        if self.similarity_threshold is None:
+            return None
+
+        with self._lock:
+            best_key: Optional[CacheKey] = None
+            best_score = self.similarity_threshold
+            for entry_key, entry in self._entries.items():
+                if entry_key[1:] != key[1:] or entry.embedding is None:
+                    continue
+                if not self._is_fresh(entry, store_version):
+                    continue
+                score = _cosine_similarity(embedding, entry.embedding)
+                if score >= best_score:
+                    best_key, best_score = entry_key, score
+
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            self.misses -= 1
+            self.semantic_hits += 1
+            return self._entries[best_key].response
+
+    def put(
+        self,
+        key: CacheKey,
+        response: QueryResponse,
+        store_version: str,
+        embedding: Optional[list[float]] = None,
+    ) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = CacheEntry(
+                response=response, store_version=store_version, embedding=embedding
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._shared_put(key, response, store_version)
+
+    async def get_async(self, key: CacheKey, store_version: str) -> Optional[QueryResponse]:
+        """get() that keeps shared-state I/O off the event loop."""
+        if self.shared is None:
+            return self.get(key, store_version)
+        return await asyncio.to_thread(self.get, key, store_version)
+
+    async def put_async(
+        self,
+        key: CacheKey,
+        response: QueryResponse,
+        store_version: str,
+        embedding: Optional[list[float]] = None,
+    ) -> None:
+        """put() that keeps shared-state I/O off the event loop."""
+        if self.shared is None:
+            self.put(key, response, store_version, embedding)
+        else:
+            await asyncio.to_thread(self.put, key, response, store_version, embedding)
+
+    def invalidate(self) -> None:
+        """Drop all entries (including the shared ones)."""
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            try:
+                self.shared.delete_prefix(SHARED_KEY_PREFIX)
+            except Exception as e:
+                logger.warning(f"Could not clear shared query cache: {e}")
+
+    def stats(self) -> CacheStatsResponse:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return CacheStatsResponse(
+                hits=self.hits,
+                semantic_hits=self.semantic_hits,
+                misses=self.misses,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+                ttl_seconds=self.ttl_seconds,
+                semantic_enabled=self.semantic_enabled,
+                shared_hits=self.shared_hits,
+                shared_enabled=self.shared is not None,
+            )
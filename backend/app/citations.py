@@ -1,48 +1,224 @@
 """Citation extraction from Gemini grounding metadata."""
-from typing import Any, List
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
 
-from .models import Citation
+from .extraction import marker_page, strip_page_markers
+from .metrics import timed
+from .models import AnswerSpan, Citation
 
+# Constants
+SNIPPET_MAX_CHARS = 240
 
-def extract_citations(grounding_metadata: Any) -> List[Citation]:
+
+@dataclass
+class _FileGroup:
+    """Chunks of one cited file, accumulated in a single pass."""
+
+    order: int
+    chunk_ids: List[str] = field(default_factory=list)
+    chunk_keys: set[str] = field(default_factory=set)
+    page: Optional[int] = None
+    snippet: Optional[str] = None
+    confidence: Optional[float] = None
+    supports: int = 0
+
+
+def _chunk_file_name(chunk: Any) -> str:
+    """Name of the file a grounding chunk came from ("unknown" if not found)."""
+    # Extract file name using getattr with fallback chain (Pythonic)
+    file_name = getattr(chunk, "source_file_name", None)
+    if not file_name:
+        chunk_file = getattr(chunk, "file", None)
+        if chunk_file:
+            file_name = getattr(chunk_file, "display_name", None) or (
+                chunk_file.name.split("/")[-1] if hasattr(chunk_file, "name") else None
+            )
+    if not file_name:
+        # File Search chunks carry the document's display name as the title
+        retrieved_context = getattr(chunk, "retrieved_context", None)
+        file_name = getattr(retrieved_context, "title", None)
+    return file_name or "unknown"
+
+
+def _chunk_text(chunk: Any) -> Optional[str]:
+    """Retrieved text of a grounding chunk."""
+    retrieved_context = getattr(chunk, "retrieved_context", None)
+    text = getattr(retrieved_context, "text", None) or getattr(
+        getattr(retrieved_context, "rag_chunk", None), "text", None
+    )
+    return text.strip() if text else None
+
+
+def _chunk_page(chunk: Any, text: Optional[str] = None) -> Optional[int]:
+    """First page of a grounding chunk, when known."""
+    page = getattr(chunk, "page", None)
+    if page is None:
+        rag_chunk = getattr(getattr(chunk, "retrieved_context", None), "rag_chunk", None)
+        page = getattr(getattr(rag_chunk, "page_span", None), "first_page", None)
+    if page is None:
+        # Documents extracted locally carry page markers in their text instead
+        page = marker_page(text)
+    return page
+
+
+def _shorten(text: str, max_chars: int = SNIPPET_MAX_CHARS) -> str:
+    """Collapse whitespace and cut text to max_chars on a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return f"{cut}…"
+
+
+def _char_offsets(answer: str) -> Optional[List[int]]:
     """
-    Extract citations from Gemini's grounding_metadata.
+    Map UTF-8 byte offsets of the answer to character offsets.
+
+    Segment indices in grounding supports are byte offsets. Returns None when
+    the answer is ASCII (offsets are then identical).
+    """
+    encoded_length = len(answer.encode("utf-8"))
+    if encoded_length == len(answer):
+        return None
+    offsets = []
+    for index, char in enumerate(answer):
+        offsets.extend([index] * len(char.encode("utf-8")))
+    offsets.append(len(answer))
+    return offsets
+
+
+@timed("extract_citations")
+def build_citations(
+    grounding_metadata: Any, answer: str = ""
+) -> tuple[List[Citation], List[AnswerSpan]]:
+    """
+    Turn Gemini's grounding_metadata into per-file citations and answer spans.
+
+    Grounding chunks are grouped by file in one pass (duplicate chunks are
+    dropped), so an answer citing the same document 15 times yields a single
+    citation carrying its chunk ids, a short snippet and a relevance score.
+    grounding_supports are mapped to character spans of the answer that
+    point at those citations. Runs in linear time over chunks and supports
+    (plus sorting the handful of cited files).
+
+    The score is the best confidence Gemini reported for the file; models
+    that report none (Gemini 2.5+) get the share of supported answer
+    segments that cite the file instead.
 
     Args:
         grounding_metadata: The grounding_metadata object from Gemini response
+        answer: Answer text the supports' segments refer to
 
     Returns:
-        List of Citation objects
+        Tuple of (citations ranked by relevance, answer spans)
     """
     if not grounding_metadata:
-        return []
+        return [], []
 
-    # Check for grounding_chunks using getattr (Pythonic)
-    grounding_chunks = getattr(grounding_metadata, "grounding_chunks", None)
-    if not grounding_chunks:
-        return []
-
-    # Use list comprehension for cleaner code
-    citations = []
+    grounding_chunks = getattr(grounding_metadata, "grounding_chunks", None) or []
+    groups: dict[str, _FileGroup] = {}
+    chunk_files: List[str] = []
     for chunk in grounding_chunks:
-        # Extract file name using getattr with fallback chain (Pythonic)
-        file_name = getattr(chunk, "source_file_name", None)
-        if not file_name:
-            chunk_file = getattr(chunk, "file", None)
-            if chunk_file:
-                file_name = getattr(chunk_file, "display_name", None) or (
-                    chunk_file.name.split("/")[-1] if hasattr(chunk_file, "name") else None
-                )
-        file_name = file_name or "unknown"
+        file_name = _chunk_file_name(chunk)
+        chunk_files.append(file_name)
+        group = groups.get(file_name)
+        if group is None:
+            group = groups[file_name] = _FileGroup(order=len(groups))
 
         # Extract chunk ID using getattr
         chunk_id = getattr(chunk, "id", None) or getattr(chunk, "chunk_id", None)
         chunk_id = str(chunk_id) if chunk_id else None
+        text = _chunk_text(chunk)
+        key = chunk_id or text
+        if key is not None and key in group.chunk_keys:
+            continue
+        if key is not None:
+            group.chunk_keys.add(key)
+        if chunk_id:
+            group.chunk_ids.append(chunk_id)
+        if group.page is None:
+            group.page = _chunk_page(chunk, text)
+        if group.snippet is None and text:
+            group.snippet = _shorten(strip_page_markers(text)) or None
 
-        # Extract page number
-        page = getattr(chunk, "page", None)
+    # Each support links an answer segment to the chunks backing it
+    offsets = _char_offsets(answer)
+    raw_spans = []
+    supported = 0
+    for support in getattr(grounding_metadata, "grounding_supports", None) or []:
+        chunk_indices = getattr(support, "grounding_chunk_indices", None) or []
+        # Scores are parallel to chunk_indices, including any out-of-range entries
+        scores = getattr(support, "confidence_scores", None) or []
+        scored = [
+            (index, scores[slot] if slot < len(scores) else None)
+            for slot, index in enumerate(chunk_indices)
+            if 0 <= index < len(chunk_files)
+        ]
+        if not scored:
+            continue
+        supported += 1
+        files = list(dict.fromkeys(chunk_files[index] for index, _ in scored))
+        for index, confidence in scored:
+            if confidence is not None:
+                group = groups[chunk_files[index]]
+                group.confidence = max(group.confidence or 0.0, float(confidence))
+        for file_name in files:
+            groups[file_name].supports += 1
 
-        citations.append(Citation(file=file_name, chunk_id=chunk_id, page=page))
+        segment = getattr(support, "segment", None)
+        start = getattr(segment, "start_index", None) or 0
+        end = getattr(segment, "end_index", None)
+        if end is None or end <= start:
+            continue
+        if offsets is not None:
+            start, end = offsets[min(start, len(offsets) - 1)], offsets[min(end, len(offsets) - 1)]
+        raw_spans.append((start, end, getattr(segment, "text", None), files))
 
-    return citations
+    def score(group: _FileGroup) -> Optional[float]:
+        if group.confidence is not None:
+            return round(group.confidence, 3)
+        if supported:
+            return round(group.supports / supported, 3)
+        return None
+
+    ranked = sorted(
+        groups.items(),
+        key=lambda item: (-(score(item[1]) or 0.0), -item[1].supports, item[1].order),
+    )
+    citations = [
+        Citation(
+            file=file_name,
+            chunk_id=group.chunk_ids[0] if group.chunk_ids else None,
+            chunk_ids=group.chunk_ids,
+            page=group.page,
+            snippet=group.snippet,
+            score=score(group),
+        )
+        for file_name, group in ranked
+    ]
+
+    citation_index = {citation.file: index for index, citation in enumerate(citations)}
+    spans = [
+        AnswerSpan(
+            start=start,
+            end=end,
+            text=text if text is not None else answer[start:end],
+            citations=sorted(citation_index[file_name] for file_name in files),
+        )
+        for start, end, text, files in raw_spans
+    ]
+    return citations, spans
+
+
+def extract_citations(grounding_metadata: Any) -> List[Citation]:
+    """
+    Extract citations from Gemini's grounding_metadata.
 
+    Args:
+        grounding_metadata: The grounding_metadata object from Gemini response
+
+    Returns:
+        List of Citation objects, one per cited file
+    """
+    citations, _ = build_citations(grounding_metadata)
+    return citations
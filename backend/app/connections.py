@@ -0,0 +1,206 @@
+"""Shared, tuned HTTP connection pool for the Gemini SDK."""
+import importlib.util
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from google import genai
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 16
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 10.0
+DEFAULT_TIMEOUT_SECONDS = 300.0
+DEFAULT_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 10.0
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class HttpSettings:
+    """Connection pool, timeout and retry settings for Gemini HTTP calls."""
+
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT_SECONDS
+    timeout: float = DEFAULT_TIMEOUT_SECONDS
+    retries: int = DEFAULT_RETRIES
+    http2: bool = False
+    base_url: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "HttpSettings":
+        """Read GEMINI_HTTP_* environment variables."""
+        return cls(
+            max_connections=int(
+                os.getenv("GEMINI_HTTP_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS))
+            ),
+            max_keepalive_connections=int(
+                os.getenv(
+                    "GEMINI_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+                    str(DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+                )
+            ),
+            keepalive_expiry=float(
+                os.getenv(
+                    "GEMINI_HTTP_KEEPALIVE_EXPIRY_SECONDS", str(DEFAULT_KEEPALIVE_EXPIRY_SECONDS)
+                )
+            ),
+            connect_timeout=float(
+                os.getenv(
+                    "GEMINI_HTTP_CONNECT_TIMEOUT_SECONDS", str(DEFAULT_CONNECT_TIMEOUT_SECONDS)
+                )
+            ),
+            timeout=float(os.getenv("GEMINI_HTTP_TIMEOUT_SECONDS", str(DEFAULT_TIMEOUT_SECONDS))),
+            retries=int(os.getenv("GEMINI_HTTP_RETRIES", str(DEFAULT_RETRIES))),
+            http2=os.getenv("GEMINI_HTTP2", "false").lower() in ("1", "true", "yes"),
+            base_url=os.getenv("GEMINI_BASE_URL") or None,
+        )
+
+
+class IdempotentRetryTransport(httpx.BaseTransport):
+    """
+    Retry idempotent requests on transient failures.
+
+    GET/HEAD/OPTIONS/PUT/DELETE are retried on connection errors and on
+    429/5xx responses, with jittered exponential backoff (honouring a numeric
+    Retry-After). Other methods (generate_content, uploads) are sent once, so
+    a retry can never duplicate work on the server.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, retries: int = DEFAULT_RETRIES):
+        """Wrap a transport."""
+        self._transport = transport
+        self.retries = retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying it when it is safe to."""
+        attempt = 0
+        while True:
+            retryable = request.method in IDEMPOTENT_METHODS and attempt < self.retries
+            retry_after = None
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError:
+                if not retryable:
+                    raise
+            else:
+                if not retryable or response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                retry_after = response.headers.get("retry-after")
+                response.close()
+
+            delay = random.uniform(0, RETRY_BASE_DELAY_SECONDS * 2**attempt)
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            time.sleep(min(delay, RETRY_MAX_DELAY_SECONDS))
+            attempt += 1
+            logger.info(f"Retrying {request.method} {request.url.path} (attempt {attempt + 1})")
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+def build_http_client(settings: HttpSettings) -> httpx.Client:
+    """
+    Create a pooled httpx client for the Gemini SDK.
+
+    Args:
+        settings: Pool, timeout and retry settings
+
+    Returns:
+        An httpx.Client whose keep-alive pool is shared by every SDK call
+    """
+    http2 = settings.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("GEMINI_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    transport = httpx.HTTPTransport(
+        limits=limits,
+        http2=http2,
+        # Connection failures happen before anything is sent, so any method is safe
+        retries=settings.retries,
+    )
+    return httpx.Client(
+        transport=IdempotentRetryTransport(transport, retries=settings.retries),
+        timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+    )
+
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_genai_clients: dict[Optional[str], "genai.Client"] = {}
+
+
+def shared_genai_client(
+    api_key: Optional[str], settings: Optional[HttpSettings] = None
+) -> "genai.Client":
+    """
+    Return the process-wide genai.Client for an API key.
+
+    Every client in the process sends requests through one pooled httpx
+    client, so connections (and TLS sessions) are reused across the API
+    handlers, upload jobs and ingestion workers.
+
+    Args:
+        api_key: Gemini API key
+        settings: HTTP settings (defaults to the environment); only used when
+            the shared pool is first created
+
+    Returns:
+        Shared genai.Client
+    """
+    # Imported on first use: the SDK takes seconds to import (see benchmarks.bench_startup)
+    from google import genai
+    from google.genai import types
+
+    global _http_client
+    with _lock:
+        client = _genai_clients.get(api_key)
+        if client is not None:
+            return client
+
+        settings = settings or HttpSettings.from_env()
+        if _http_client is None:
+            _http_client = build_http_client(settings)
+        client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                base_url=settings.base_url,
+                # The SDK passes this per request; without it httpx would not time out
+                timeout=int(settings.timeout * 1000),
+                httpx_client=_http_client,
+            ),
+        )
+        _genai_clients[api_key] = client
+        return client
+
+
+def close_shared_clients() -> None:
+    """Close the shared connection pool (at process shutdown)."""
+    global _http_client
+    with _lock:
+        _genai_clients.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
@@ -0,0 +1,174 @@
+"""Content-addressed index of documents already in a File Search store."""
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Constants
+HASH_CHUNK_BYTES = 1024 * 1024
+DEFAULT_INDEX_FILENAME = "content_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    sha256 TEXT NOT NULL,
+    store TEXT NOT NULL,
+    document_name TEXT,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (sha256, store, path)
+);
+CREATE INDEX IF NOT EXISTS documents_by_path ON documents (store, path);
+"""
+# Databases created before paths were part of the key: one row per content hash
+_MIGRATE_PATH_KEY = """
+DROP INDEX IF EXISTS documents_by_path;
+ALTER TABLE documents RENAME TO documents_by_hash;
+""" + _SCHEMA + """
+INSERT INTO documents SELECT * FROM documents_by_hash;
+DROP TABLE documents_by_hash;
+"""
+
+
+def hash_file(file_path: str | Path) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with Path(file_path).open("rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class IndexedDocument:
+    """A document recorded in the index."""
+
+    sha256: str
+    store: str
+    document_name: Optional[str]
+    path: str
+    size: int
+    mtime_ns: int
+
+
+class ContentIndex:
+    """
+    Persistent SHA-256 → store document index shared by uploads and ingestion.
+
+    Backed by SQLite so the API process and the ingestion CLI can use the same
+    file concurrently. Stores are keyed by display name, so lookups need no API
+    calls. There is one row per local path: identical files at several paths
+    share one store document and each keeps its own row.
+    """
+
+    def __init__(self, db_path: str | Path):
+        """Open (or create) the index database."""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            key = [row[1] for row in self._conn.execute("PRAGMA table_info(documents)") if row[5]]
+            if key and "path" not in key:
+                self._conn.executescript(_MIGRATE_PATH_KEY)
+            else:
+                self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _row_to_document(row: Optional[tuple]) -> Optional[IndexedDocument]:
+        return IndexedDocument(*row) if row else None
+
+    def get(self, sha256: str, store: str) -> Optional[IndexedDocument]:
+        """Look up a document by content hash (the row of its last recorded path)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, store, document_name, path, size, mtime_ns FROM documents "
+                "WHERE sha256 = ? AND store = ? ORDER BY updated_at DESC LIMIT 1",
+                (sha256, store),
+            ).fetchone()
+        return self._row_to_document(row)
+
+    def get_by_path(self, path: str | Path, store: str) -> Optional[IndexedDocument]:
+        """Look up the document last recorded for a local path."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, store, document_name, path, size, mtime_ns FROM documents "
+                "WHERE store = ? AND path = ? ORDER BY updated_at DESC LIMIT 1",
+                (store, str(Path(path).resolve())),
+            ).fetchone()
+        return self._row_to_document(row)
+
+    def find_unchanged(self, file_path: str | Path, store: str) -> Optional[IndexedDocument]:
+        """
+        Return the indexed document for a file whose path, size and mtime match.
+
+        This is the stat-only fast path: no file content is read.
+        """
+        document = self.get_by_path(file_path, store)
+        if document is None:
+            return None
+        stat = Path(file_path).stat()
+        if document.size == stat.st_size and document.mtime_ns == stat.st_mtime_ns:
+            return document
+        return None
+
+    def put(
+        self,
+        sha256: str,
+        store: str,
+        document_name: Optional[str],
+        file_path: str | Path,
+    ) -> None:
+        """Record (or refresh) a document for a local file; replaces the path's old content."""
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM documents WHERE store = ? AND path = ? AND sha256 != ?",
+                (store, str(path), sha256),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sha256,
+                    store,
+                    document_name,
+                    str(path),
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    time.time(),
+                ),
+            )
+
+    def entries(self, store: str) -> list[IndexedDocument]:
+        """Return all documents recorded for a store."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha256, store, document_name, path, size, mtime_ns FROM documents "
+                "WHERE store = ?",
+                (store,),
+            ).fetchall()
+        return [IndexedDocument(*row) for row in rows]
+
+    def remove(self, sha256: str, store: str) -> None:
+        """Forget a document (under every path it was recorded for)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM documents WHERE sha256 = ? AND store = ?", (sha256, store)
+            )
+
+    def remove_path(self, path: str | Path, store: str) -> None:
+        """Forget one local path of a document; rows for its other paths stay."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM documents WHERE store = ? AND path = ?", (store, str(path))
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,452 @@
+"""
+Local text extraction: PDF/DOCX to compact markdown before upload.
+
+Raw PDFs and Word files are often mostly images and layout; Gemini spends
+minutes processing them. Extracting the text locally (in a process pool, the
+work is CPU bound) and uploading markdown instead cuts upload size and store
+processing time.
+
+Pages are kept as `<!-- page N -->` markers, repeated every MARKER_INTERVAL_CHARS
+within a page, so every File Search chunk carries one and citations can still
+report the page (see marker_page). Text uploads get no page_span from Gemini.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+# Constants
+EXTRACTABLE_EXTENSIONS = {".pdf", ".docx"}
+# About half a File Search chunk (300 tokens, ~1200 chars): every chunk sees a marker
+MARKER_INTERVAL_CHARS = 600
+# Lines this close to the top/bottom of a page are header/footer candidates
+BOILERPLATE_EDGE_LINES = 3
+# ...and are dropped when they repeat on this share of pages (and at least 3)
+BOILERPLATE_MIN_SHARE = 0.5
+BOILERPLATE_MIN_PAGES = 3
+# Less text than this per page means a scanned document: leave OCR to Gemini
+MIN_CHARS_PER_PAGE = 80
+
+PAGE_MARKER_PATTERN = re.compile(r"<!-- page (\d+)( cont\.)? -->")
+_PAGE_NUMBER_LINE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_BULLET = re.compile(r"^[•●○▪■◦‣∙·*-]\s*")
+_NUMBERED = re.compile(r"^\(?\d+[.)]\s")
+_HYPHENATED = re.compile(r"(\w)-\n([a-z])")
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f\u00ad\ufeff]")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+@dataclass
+class ExtractedDocument:
+    """A PDF/DOCX file converted to markdown."""
+
+    source: Path
+    path: Path
+    pages: int
+    source_bytes: int
+    text_bytes: int
+    seconds: float
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes not uploaded thanks to extraction."""
+        return self.source_bytes - self.text_bytes
+
+    @property
+    def saved_ratio(self) -> float:
+        """Share of the source size saved (0..1)."""
+        return self.saved_bytes / self.source_bytes if self.source_bytes else 0.0
+
+
+def extraction_enabled() -> bool:
+    """Whether LOCAL_EXTRACTION is switched on."""
+    return os.getenv("LOCAL_EXTRACTION", "false").strip().lower() in ("1", "true", "yes")
+
+
+def default_extraction_workers() -> int:
+    """EXTRACTION_WORKERS if set, else one process per CPU core."""
+    configured = os.getenv("EXTRACTION_WORKERS", "").strip()
+    if configured:
+        return max(1, int(configured))
+    return os.cpu_count() or 1
+
+
+def is_extractable(path: Path) -> bool:
+    """Whether a file is a format extracted locally."""
+    return path.suffix.lower() in EXTRACTABLE_EXTENSIONS
+
+
+def page_marker(page: int, continued: bool = False) -> str:
+    """Marker put in front of a page's text (continued: repeated within the page)."""
+    return f"<!-- page {page}{' cont.' if continued else ''} -->"
+
+
+def marker_page(text: Optional[str]) -> Optional[int]:
+    """
+    First page of a chunk of extracted markdown, from its page markers.
+
+    Text before the first marker belongs to the previous page, unless that
+    marker is a repeat within the same page.
+
+    Returns:
+        Page number, or None if the text has no marker
+    """
+    text = text or ""
+    match = PAGE_MARKER_PATTERN.search(text)
+    if match is None:
+        return None
+    page = int(match.group(1))
+    if not match.group(2) and text[: match.start()].strip():
+        page -= 1
+    return max(page, 1)
+
+
+def strip_page_markers(text: str) -> str:
+    """Remove page markers (for snippets shown to users)."""
+    return PAGE_MARKER_PATTERN.sub(" ", text)
+
+
+def _pdf_pages(path: Path) -> list[str]:
+    """Raw text of each page of a PDF."""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise RuntimeError("PDF extraction needs the pypdf package (pip install pypdf)") from e
+    reader = PdfReader(str(path))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _docx_paragraph(paragraph: ElementTree.Element, rendered: bool) -> tuple[list[str], bool]:
+    """
+    Text of a Word paragraph, split where pages break inside it.
+
+    Returns:
+        Tuple of (text of each page the paragraph spans, whether it is a list item)
+    """
+    parts = [""]
+    for node in paragraph.iter():
+        if node.tag == f"{_W}t":
+            parts[-1] += node.text or ""
+        elif node.tag == f"{_W}tab":
+            parts[-1] += "\t"
+        elif node.tag == f"{_W}br":
+            if node.get(f"{_W}type") == "page":
+                if not rendered:
+                    parts.append("")
+            else:
+                parts[-1] += "\n"
+        elif node.tag == f"{_W}lastRenderedPageBreak" and rendered:
+            parts.append("")
+    list_item = paragraph.find(f"{_W}pPr/{_W}numPr") is not None
+    return parts, list_item
+
+
+def _docx_heading_level(paragraph: ElementTree.Element) -> int:
+    """Markdown heading level of a Word paragraph style (0 if not a heading)."""
+    style = paragraph.find(f"{_W}pPr/{_W}pStyle")
+    name = (style.get(f"{_W}val") or "").lower().replace(" ", "") if style is not None else ""
+    if name == "title":
+        return 1
+    if name.startswith("heading") and name[7:].isdigit():
+        return min(int(name[7:]), 6)
+    return 0
+
+
+def _docx_pages(path: Path) -> list[str]:
+    """
+    Text of each page of a Word document, as markdown.
+
+    Headers and footers live in their own parts of the file and are not read.
+    Pages follow the layout Word last rendered when it saved the file, or
+    explicit page breaks for files written by other tools.
+    """
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    body = root.find(f"{_W}body")
+    if body is None:
+        return []
+    rendered = any(True for _ in body.iter(f"{_W}lastRenderedPageBreak"))
+
+    pages: list[list[str]] = [[]]
+    for block in body:
+        if block.tag == f"{_W}p":
+            parts, list_item = _docx_paragraph(block, rendered)
+            level = _docx_heading_level(block)
+            for index, text in enumerate(parts):
+                if index > 0:
+                    pages.append([])
+                if not text.strip():
+                    continue
+                if level:
+                    text = f"{'#' * level} {' '.join(text.split())}"
+                elif list_item:
+                    text = f"- {text.strip()}"
+                pages[-1].append(text)
+        elif block.tag == f"{_W}tbl":
+            rows = []
+            for row in block.iter(f"{_W}tr"):
+                cells = [
+                    " ".join("".join(cell.itertext()).split()) for cell in row.iter(f"{_W}tc")
+                ]
+                rows.append(f"| {' | '.join(cells)} |")
+                if len(rows) == 1:
+                    rows.append(f"|{'---|' * len(cells)}")
+            pages[-1].append("\n".join(rows))
+    return ["\n\n".join(blocks) for blocks in pages]
+
+
+def _clean_lines(text: str) -> list[str]:
+    """Normalize whitespace and control characters; one entry per line."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\f", "\n")
+    text = _CONTROL_CHARS.sub("", text)
+    text = _HYPHENATED.sub(r"\1\2", text)
+    return [_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+
+
+def _boilerplate_key(line: str) -> str:
+    """Header/footer identity of a line: page numbers and dates vary, the rest repeats."""
+    return re.sub(r"\d+", "#", line.lower())
+
+
+def strip_boilerplate(pages: list[list[str]]) -> list[list[str]]:
+    """
+    Drop running headers, footers and page numbers from the lines of each page.
+
+    A line near the top or bottom of a page is boilerplate when the same line
+    (ignoring digits) sits near the edge of at least half of the pages, or
+    when it is a bare page number.
+    """
+    if len(pages) < 2:
+        return pages
+
+    def edges(lines: list[str]) -> list[int]:
+        filled = [index for index, line in enumerate(lines) if line]
+        return filled[:BOILERPLATE_EDGE_LINES] + filled[-BOILERPLATE_EDGE_LINES:]
+
+    counts: dict[str, int] = {}
+    for lines in pages:
+        for key in {_boilerplate_key(lines[index]) for index in edges(lines)}:
+            counts[key] = counts.get(key, 0) + 1
+    threshold = max(BOILERPLATE_MIN_PAGES, BOILERPLATE_MIN_SHARE * len(pages))
+    repeated = {key for key, count in counts.items() if count >= threshold}
+
+    stripped = []
+    for lines in pages:
+        drop = {
+            index
+            for index in edges(lines)
+            if _boilerplate_key(lines[index]) in repeated
+            or _PAGE_NUMBER_LINE.match(lines[index])
+        }
+        stripped.append([line for index, line in enumerate(lines) if index not in drop])
+    return stripped
+
+
+def _paragraphs(lines: list[str]) -> list[str]:
+    """
+    Rejoin hard-wrapped lines into paragraphs.
+
+    A line continues the previous one unless a blank line, a list item, a
+    heading or a table row starts something new, or the previous line ended
+    a sentence.
+    """
+    paragraphs: list[str] = []
+    current = ""
+    for line in lines:
+        if not line:
+            if current:
+                paragraphs.append(current)
+            current = ""
+            continue
+        if line.startswith("|") and current.startswith("|"):
+            # Rows of one table stay together, one per line
+            current = f"{current}\n{line}"
+            continue
+        starts_block = line.startswith(("#", "|")) or _NUMBERED.match(line)
+        if _BULLET.match(line) and not line.startswith(("#", "|")):
+            line = _BULLET.sub("- ", line)
+            starts_block = True
+        if current and (starts_block or current.startswith(("#", "|")) or current[-1] in ".!?:"):
+            paragraphs.append(current)
+            current = ""
+        current = f"{current} {line}" if current else line
+    if current:
+        paragraphs.append(current)
+    return paragraphs
+
+
+def render_markdown(pages: list[list[str]]) -> str:
+    """
+    Join cleaned pages into markdown with page markers.
+
+    Empty pages keep no text but the numbering of the following pages.
+    """
+    blocks = []
+    for number, lines in enumerate(pages, start=1):
+        paragraphs = _paragraphs(lines)
+        if not paragraphs:
+            continue
+        blocks.append(page_marker(number))
+        since_marker = 0
+        for paragraph in paragraphs:
+            if since_marker >= MARKER_INTERVAL_CHARS:
+                blocks.append(page_marker(number, continued=True))
+                since_marker = 0
+            blocks.append(paragraph)
+            since_marker += len(paragraph)
+    return "\n\n".join(blocks) + "\n"
+
+
+def extract_markdown(path: str | Path) -> tuple[str, int]:
+    """
+    Convert a PDF/DOCX file to markdown with page markers.
+
+    Args:
+        path: File to convert
+
+    Returns:
+        Tuple of (markdown, page_count)
+
+    Raises:
+        ValueError: If the format is not extractable or the file has too
+            little text (scanned pages, which Gemini should OCR)
+        RuntimeError: If the library needed for the format is not installed
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        raw_pages = _pdf_pages(path)
+    elif suffix == ".docx":
+        raw_pages = _docx_pages(path)
+    else:
+        raise ValueError(f"Not extractable: {path.name}")
+
+    pages = [_clean_lines(text) for text in raw_pages]
+    if suffix == ".pdf":
+        # Word keeps headers and footers out of the body; PDFs repeat them on every page
+        pages = strip_boilerplate(pages)
+    text_chars = sum(len(line) for lines in pages for line in lines)
+    if text_chars < MIN_CHARS_PER_PAGE * max(len(pages), 1):
+        raise ValueError(
+            f"{path.name} has {text_chars} characters of text on {len(pages)} pages "
+            "(scanned?)"
+        )
+    return render_markdown(pages), len(pages)
+
+
+def extract_document(path: str | Path, output_dir: str | Path) -> ExtractedDocument:
+    """
+    Convert a PDF/DOCX file to markdown in output_dir (runs in a worker process).
+
+    Args:
+        path: File to convert
+        output_dir: Folder for the markdown file
+
+    Returns:
+        The extracted document
+
+    Raises:
+        ValueError: If the format is not extractable or the file has too
+            little text (scanned pages, which Gemini should OCR)
+        RuntimeError: If the library needed for the format is not installed
+    """
+    started = time.perf_counter()
+    path = Path(path)
+    markdown, page_count = extract_markdown(path)
+
+    # Named after the source path, so same-named files in other folders don't clash
+    digest = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
+    output_path = Path(output_dir) / f"{path.stem}-{digest}.md"
+    output_path.write_text(markdown, encoding="utf-8")
+    return ExtractedDocument(
+        source=path,
+        path=output_path,
+        pages=page_count,
+        source_bytes=path.stat().st_size,
+        text_bytes=output_path.stat().st_size,
+        seconds=time.perf_counter() - started,
+    )
+
+
+class DocumentExtractor:
+    """
+    Process pool converting PDF/DOCX files to markdown before upload.
+
+    Failures are not fatal: extract() returns None and the caller uploads the
+    original file, so a missing library or a scanned PDF only costs speed.
+    """
+
+    def __init__(self, output_dir: str | Path, workers: Optional[int] = None):
+        """
+        Initialize the extractor (worker processes start on first use).
+
+        Args:
+            output_dir: Folder for the markdown files
+            workers: Worker processes (defaults to EXTRACTION_WORKERS, else one per core)
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or default_extraction_workers()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, path: str | Path) -> Optional[Future[ExtractedDocument]]:
+        """Start converting a file in the pool (None if it is not extractable)."""
+        path = Path(path)
+        if not is_extractable(path):
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs threads (uvicorn, upload jobs) is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor.submit(extract_document, path, self.output_dir)
+
+    def wait(
+        self, path: str | Path, future: Optional[Future[ExtractedDocument]]
+    ) -> Optional[ExtractedDocument]:
+        """
+        Result of submit().
+
+        Returns:
+            The extracted document, or None to upload the file as is
+        """
+        if future is None:
+            return None
+        name = Path(path).name
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory on a huge file): start a fresh pool next time
+            with self._lock:
+                self._executor = None
+            logger.warning(f"Extraction of {name} crashed, uploading it as is: {e}")
+        except Exception as e:
+            logger.warning(f"Could not extract {name}, uploading it as is: {e}")
+        return None
+
+    def extract(self, path: str | Path) -> Optional[ExtractedDocument]:
+        """Convert one file, blocking until done (None: upload it as is)."""
+        return self.wait(path, self.submit(path))
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,480 @@
+"""Deterministic offline stand-in for the Gemini SDK (load tests and benchmarks)."""
+import hashlib
+import os
+import random
+import threading
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from google.genai import types
+
+# Constants
+DEFAULT_LATENCY_SECONDS = 0.2
+DEFAULT_OPERATION_SECONDS = 2.0
+DEFAULT_SLOW_SECONDS = 5.0
+STREAM_CHUNKS = 4
+EMBEDDING_DIM = 64
+CITATIONS_PER_ANSWER = 2
+CHARS_PER_TOKEN = 4
+
+
+class FakeAPIError(Exception):
+    """Injected failure, shaped like the SDK's APIError (has .code)."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+@dataclass
+class FakeSettings:
+    """Behaviour of the fake backend."""
+
+    latency_seconds: float = DEFAULT_LATENCY_SECONDS
+    error_rate: float = 0.0
+    operation_seconds: float = DEFAULT_OPERATION_SECONDS
+    seed: int = 0
+    slow_rate: float = 0.0
+    slow_seconds: float = DEFAULT_SLOW_SECONDS
+    # Import throughput; 0 makes every import take operation_seconds regardless of size
+    processing_mb_per_second: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "FakeSettings":
+        """Read FAKE_GEMINI_* environment variables."""
+        return cls(
+            latency_seconds=float(
+                os.getenv("FAKE_GEMINI_LATENCY_SECONDS", str(DEFAULT_LATENCY_SECONDS))
+            ),
+            error_rate=float(os.getenv("FAKE_GEMINI_ERROR_RATE", "0")),
+            operation_seconds=float(
+                os.getenv("FAKE_GEMINI_OPERATION_SECONDS", str(DEFAULT_OPERATION_SECONDS))
+            ),
+            seed=int(os.getenv("FAKE_GEMINI_SEED", "0")),
+            slow_rate=float(os.getenv("FAKE_GEMINI_SLOW_RATE", "0")),
+            slow_seconds=float(
+                os.getenv("FAKE_GEMINI_SLOW_SECONDS", str(DEFAULT_SLOW_SECONDS))
+            ),
+            processing_mb_per_second=float(
+                os.getenv("FAKE_GEMINI_PROCESSING_MB_PER_SECOND", "0")
+            ),
+        )
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _operation(api_response: dict[str, Any]) -> types.UploadToFileSearchStoreOperation:
+    """Build an operation from its REST form, as the SDK does for real responses."""
+    return types.UploadToFileSearchStoreOperation.from_api_response(api_response)
+
+
+class _State:
+    """Stores, documents, files and operations shared by the fake sub-APIs."""
+
+    def __init__(self, settings: FakeSettings):
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.rng = random.Random(settings.seed)
+        self.stores: dict[str, types.FileSearchStore] = {}
+        self.documents: dict[str, dict[str, types.Document]] = {}
+        self.files: dict[str, tuple[types.File, float]] = {}
+        self.operations: dict[str, tuple[float, str, str]] = {}
+        self.caches: dict[str, tuple[str, list[types.Tool]]] = {}
+        self.calls = 0
+        self.failures = 0
+
+    def call(self, latency_scale: float = 1.0, timeout: Optional[float] = None) -> None:
+        """
+        Simulate one API round trip: latency, then maybe an injected error.
+
+        A slow_rate fraction of calls take slow_seconds longer (a degraded
+        upstream); a call that would outlast timeout fails like an HTTP timeout.
+        """
+        with self.lock:
+            self.calls += 1
+            jitter = self.rng.uniform(0.8, 1.2)
+            fail = self.rng.random() < self.settings.error_rate
+            slow = self.rng.random() < self.settings.slow_rate
+            if fail:
+                self.failures += 1
+        delay = self.settings.latency_seconds * latency_scale * jitter
+        if slow:
+            delay += self.settings.slow_seconds
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise FakeAPIError(504, "DEADLINE_EXCEEDED (request timed out)")
+        time.sleep(delay)
+        if fail:
+            raise FakeAPIError(503, "UNAVAILABLE (injected by fake backend)")
+
+    def store(self, name: str) -> types.FileSearchStore:
+        store = self.stores.get(name)
+        if store is None:
+            raise FakeAPIError(404, f"Store not found: {name}")
+        return store
+
+    def start_operation(
+        self, store_name: str, display_name: str, size_bytes: int = 0
+    ) -> types.UploadToFileSearchStoreOperation:
+        """Start a document import that completes after operation_seconds (plus size)."""
+        self.store(store_name)
+        name = f"{store_name}/operations/{uuid.uuid4().hex[:12]}"
+        seconds = self.settings.operation_seconds
+        if self.settings.processing_mb_per_second > 0:
+            seconds += size_bytes / (1024 * 1024) / self.settings.processing_mb_per_second
+        ready_at = time.monotonic() + seconds
+        with self.lock:
+            self.operations[name] = (ready_at, store_name, display_name)
+        return _operation({"name": name, "done": False})
+
+    def poll_operation(self, name: str) -> types.UploadToFileSearchStoreOperation:
+        with self.lock:
+            entry = self.operations.get(name)
+            if entry is None:
+                raise FakeAPIError(404, f"Operation not found: {name}")
+            ready_at, store_name, display_name = entry
+            if time.monotonic() < ready_at:
+                return _operation({"name": name, "done": False})
+
+            # Completes once: record the document in the store
+            document_name = f"{store_name}/documents/{_digest(name):016x}"
+            documents = self.documents.setdefault(store_name, {})
+            if document_name not in documents:
+                documents[document_name] = types.Document(
+                    name=document_name, display_name=display_name
+                )
+                self.stores[store_name].active_documents_count = len(documents)
+        return _operation(
+            {
+                "name": name,
+                "done": True,
+                "response": {"parent": store_name, "documentName": document_name},
+            }
+        )
+
+
+class _Models:
+    def __init__(self, state: _State):
+        self._state = state
+
+    def _prefix(self, config: Any) -> tuple[str, list[Any], int]:
+        """System instruction, tools and cached token count of a request."""
+        cached_content = getattr(config, "cached_content", None)
+        if cached_content:
+            with self._state.lock:
+                entry = self._state.caches.get(cached_content)
+            if entry is None:
+                raise FakeAPIError(404, f"Cached content not found: {cached_content}")
+            system_instruction, tools = entry
+            return system_instruction, tools, _tokens(system_instruction)
+        system_instruction = str(getattr(config, "system_instruction", None) or "")
+        return system_instruction, getattr(config, "tools", None) or [], 0
+
+    def _grounding(
+        self, prompt: str, tools: list[Any], answer: str
+    ) -> Optional[types.GroundingMetadata]:
+        store_names = [
+            name
+            for tool in tools
+            for name in (
+                getattr(getattr(tool, "file_search", None), "file_search_store_names", None) or []
+            )
+        ]
+        with self._state.lock:
+            documents = [
+                doc
+                for store_name in store_names
+                for doc in self._state.documents.get(store_name, {}).values()
+            ]
+        if not documents:
+            return None
+        seed = _digest(prompt)
+        picked = [documents[(seed + i) % len(documents)] for i in range(CITATIONS_PER_ANSWER)]
+        # Like the real API, the same chunk may appear more than once; one
+        # support backs the whole answer
+        return types.GroundingMetadata(
+            grounding_chunks=[
+                types.GroundingChunk(
+                    retrieved_context=types.GroundingChunkRetrievedContext(
+                        title=doc.display_name,
+                        document_name=doc.name,
+                        text=f"Excerpt from {doc.display_name}.",
+                    )
+                )
+                for doc in picked
+            ],
+            grounding_supports=[
+                types.GroundingSupport(
+                    segment=types.Segment(
+                        start_index=0, end_index=len(answer.encode("utf-8")), text=answer
+                    ),
+                    grounding_chunk_indices=list(range(len(picked))),
+                )
+            ],
+        )
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        return (
+            f"[fake answer {_digest(prompt):016x}] Based on the case studies, "
+            "the customer saw measurable improvements after the rollout."
+        )
+
+    @staticmethod
+    def _response(
+        text: str,
+        grounding: Optional[types.GroundingMetadata],
+        usage: Optional[types.GenerateContentResponseUsageMetadata] = None,
+    ) -> types.GenerateContentResponse:
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=[types.Part(text=text)]),
+                    grounding_metadata=grounding,
+                )
+            ],
+            usage_metadata=usage,
+        )
+
+    def _generate(
+        self, contents: Any, config: Any
+    ) -> tuple[str, Optional[types.GroundingMetadata], types.GenerateContentResponseUsageMetadata]:
+        """Answer, grounding and token usage for a request."""
+        prompt = str(contents)
+        system_instruction, tools, cached_tokens = self._prefix(config)
+        answer = self._answer(prompt)
+        max_output_tokens = getattr(config, "max_output_tokens", None)
+        if max_output_tokens:
+            answer = answer[: max_output_tokens * CHARS_PER_TOKEN]
+        prompt_tokens = _tokens(system_instruction) + _tokens(prompt)
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            cached_content_token_count=cached_tokens or None,
+            candidates_token_count=_tokens(answer),
+            total_token_count=prompt_tokens + _tokens(answer),
+        )
+        return answer, self._grounding(prompt, tools, answer), usage
+
+    @staticmethod
+    def _timeout(config: Any) -> Optional[float]:
+        """Per-call HTTP timeout of a request, in seconds."""
+        timeout_ms = getattr(getattr(config, "http_options", None), "timeout", None)
+        return timeout_ms / 1000 if timeout_ms else None
+
+    def generate_content(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> types.GenerateContentResponse:
+        self._state.call(timeout=self._timeout(config))
+        answer, grounding, usage = self._generate(contents, config)
+        return self._response(answer, grounding, usage)
+
+    def generate_content_stream(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> Iterator[types.GenerateContentResponse]:
+        self._state.call(latency_scale=0.5, timeout=self._timeout(config))
+        answer, grounding, usage = self._generate(contents, config)
+        words = answer.split(" ")
+        size = max(1, len(words) // STREAM_CHUNKS)
+        pieces = [" ".join(words[i : i + size]) for i in range(0, len(words), size)]
+        for i, piece in enumerate(pieces):
+            last = i == len(pieces) - 1
+            time.sleep(self._state.settings.latency_seconds * 0.5 / len(pieces))
+            yield self._response(
+                piece + ("" if last else " "),
+                grounding if last else None,
+                usage if last else None,
+            )
+
+    def embed_content(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> types.EmbedContentResponse:
+        self._state.call(latency_scale=0.25)
+        rng = random.Random(_digest(str(contents)))
+        return types.EmbedContentResponse(
+            embeddings=[
+                types.ContentEmbedding(values=[rng.uniform(-1, 1) for _ in range(EMBEDDING_DIM)])
+            ]
+        )
+
+
+class _Files:
+    def __init__(self, state: _State):
+        self._state = state
+
+    def upload(self, *, file: Any, config: Any = None) -> types.File:
+        self._state.call()
+        path = Path(str(file))
+        name = f"files/{uuid.uuid4().hex[:12]}"
+        display_name = (config or {}).get("display_name") if isinstance(config, dict) else None
+        uploaded = types.File(
+            name=name,
+            display_name=display_name or path.name,
+            size_bytes=path.stat().st_size if path.exists() else None,
+            state=types.FileState.PROCESSING,
+        )
+        ready_at = time.monotonic() + self._state.settings.operation_seconds / 2
+        with self._state.lock:
+            self._state.files[name] = (uploaded, ready_at)
+        return uploaded
+
+    def get(self, *, name: str, config: Any = None) -> types.File:
+        self._state.call(latency_scale=0.25)
+        with self._state.lock:
+            entry = self._state.files.get(name)
+        if entry is None:
+            raise FakeAPIError(404, f"File not found: {name}")
+        uploaded, ready_at = entry
+        state = (
+            types.FileState.ACTIVE if time.monotonic() >= ready_at else types.FileState.PROCESSING
+        )
+        return uploaded.model_copy(update={"state": state})
+
+    def list(self, *, config: Any = None) -> Iterable[types.File]:
+        self._state.call(latency_scale=0.25)
+        with self._state.lock:
+            return [uploaded for uploaded, _ in self._state.files.values()]
+
+
+class _Documents:
+    def __init__(self, state: _State):
+        self._state = state
+
+    def list(self, *, parent: str, config: Any = None) -> Iterable[types.Document]:
+        self._state.call(latency_scale=0.25)
+        with self._state.lock:
+            return list(self._state.documents.get(parent, {}).values())
+
+    def delete(self, *, name: str, config: Any = None) -> None:
+        self._state.call(latency_scale=0.25)
+        store_name = name.split("/documents/")[0]
+        with self._state.lock:
+            documents = self._state.documents.get(store_name, {})
+            documents.pop(name, None)
+            if store_name in self._state.stores:
+                self._state.stores[store_name].active_documents_count = len(documents)
+
+
+class _FileSearchStores:
+    def __init__(self, state: _State):
+        self._state = state
+        self.documents = _Documents(state)
+
+    def list(self, *, config: Any = None) -> Iterable[types.FileSearchStore]:
+        self._state.call(latency_scale=0.25)
+        with self._state.lock:
+            return list(self._state.stores.values())
+
+    def create(self, *, config: Any = None) -> types.FileSearchStore:
+        self._state.call(latency_scale=0.25)
+        display_name = (
+            (config or {}).get("display_name")
+            if isinstance(config, dict)
+            else getattr(config, "display_name", None)
+        )
+        name = f"fileSearchStores/{(display_name or 'store').lower()}-{uuid.uuid4().hex[:8]}"
+        store = types.FileSearchStore(
+            name=name, display_name=display_name, active_documents_count=0
+        )
+        with self._state.lock:
+            self._state.stores[name] = store
+            self._state.documents[name] = {}
+        return store
+
+    def get(self, *, name: str, config: Any = None) -> types.FileSearchStore:
+        self._state.call(latency_scale=0.25)
+        with self._state.lock:
+            return self._state.store(name).model_copy()
+
+    def upload_to_file_search_store(
+        self, *, file_search_store_name: str, file: Any, config: Any = None
+    ) -> types.UploadToFileSearchStoreOperation:
+        self._state.call()
+        display_name = (config or {}).get("display_name") if isinstance(config, dict) else None
+        path = Path(str(file))
+        return self._state.start_operation(
+            file_search_store_name,
+            display_name or path.name,
+            path.stat().st_size if path.exists() else 0,
+        )
+
+    def import_file(
+        self, *, file_search_store_name: str, file_name: str, config: Any = None
+    ) -> types.UploadToFileSearchStoreOperation:
+        self._state.call()
+        with self._state.lock:
+            entry = self._state.files.get(file_name)
+        display_name = entry[0].display_name if entry else file_name
+        size_bytes = (entry[0].size_bytes or 0) if entry else 0
+        return self._state.start_operation(
+            file_search_store_name, display_name or file_name, size_bytes
+        )
+
+
+class _Operations:
+    def __init__(self, state: _State):
+        self._state = state
+
+    def get(self, operation: Any, *, config: Any = None) -> types.UploadToFileSearchStoreOperation:
+        self._state.call(latency_scale=0.25)
+        return self._state.poll_operation(operation.name)
+
+
+class _Caches:
+    def __init__(self, state: _State):
+        self._state = state
+
+    def create(self, *, model: str, config: Any = None) -> types.CachedContent:
+        self._state.call(latency_scale=0.5)
+        system_instruction = str(getattr(config, "system_instruction", None) or "")
+        name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+        with self._state.lock:
+            self._state.caches[name] = (system_instruction, getattr(config, "tools", None) or [])
+        return types.CachedContent(
+            name=name,
+            model=model,
+            usage_metadata=types.CachedContentUsageMetadata(
+                total_token_count=_tokens(system_instruction)
+            ),
+        )
+
+
+class FakeGenaiClient:
+    """
+    In-memory implementation of the GenaiBackend interface.
+
+    Every call sleeps for the configured latency (±20%), plus slow_seconds
+    for a slow_rate fraction of calls, and fails with a 503 at the
+    configured error rate; document imports complete after
+    operation_seconds. Answers and embeddings are derived from a hash of the
+    prompt, so identical inputs give identical outputs.
+    """
+
+    def __init__(self, settings: Optional[FakeSettings] = None):
+        """Initialize an empty fake backend."""
+        self.settings = settings or FakeSettings()
+        self._state = _State(self.settings)
+        self.models = _Models(self._state)
+        self.files = _Files(self._state)
+        self.file_search_stores = _FileSearchStores(self._state)
+        self.operations = _Operations(self._state)
+        self.caches = _Caches(self._state)
+
+    @property
+    def calls(self) -> int:
+        """Number of API calls made so far."""
+        return self._state.calls
+
+    @property
+    def failures(self) -> int:
+        """Number of injected failures so far."""
+        return self._state.failures
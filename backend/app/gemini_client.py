@@ -1,29 +1,88 @@
 """Gemini client wrapper for File Search operations."""
+import asyncio
 import logging
 import os
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Any, Optional
-
-from google import genai
-from google.genai import types
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+from .backends import GenaiBackend, create_genai_client, uses_fake_backend
+from .health import StoreInfo
+from .metrics import (
+    GEMINI_ERRORS,
+    UPLOAD_OPERATIONS_PENDING,
+    record_gemini_error,
+    record_token_usage,
+    timed,
+    timer,
+)
+from .polling import poll_until, poll_until_async
+from .prompt_cache import (
+    DEFAULT_CACHE_TTL_SECONDS,
+    DEFAULT_MIN_TOKENS,
+    PromptCache,
+    context_cache_enabled,
+)
+from .resilience import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_RESET_SECONDS,
+    CircuitBreaker,
+    DeadlineExceeded,
+    HedgeBudget,
+    LatencyTracker,
+    hedged,
+)
+from .shared_state import SharedState
+from .stores import DEFAULT_STORE_TTL_SECONDS, StoreRegistry
+
+if TYPE_CHECKING:
+    from google.genai import types
 
 logger = logging.getLogger(__name__)
 
 # Constants
 DEFAULT_STORE_NAME = "case-study-store"
 DEFAULT_MODEL = "gemini-2.5-flash"
+DEFAULT_EMBEDDING_MODEL = "gemini-embedding-001"
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_QUERY_TIMEOUT_SECONDS = 60.0
+DEFAULT_HEDGE_MIN_DELAY_SECONDS = 1.0
+HEDGE_PERCENTILE = 95
+CHUNK_SIZE_TOKENS = 300
+CHUNK_OVERLAP_TOKENS = 30
+
+T = TypeVar("T")
+
+# One store display name, or several for a federated query
+StoreSelection = str | Sequence[str]
 
 
 class GeminiClient:
     """Client for interacting with Gemini File Search."""
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize Gemini client."""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        shared_state: Optional[SharedState] = None,
+    ):
+        """
+        Initialize Gemini client.
+
+        Args:
+            api_key: Gemini API key (defaults to GEMINI_API_KEY)
+            max_concurrency: Maximum number of blocking SDK calls run at once by the
+                async helpers (defaults to GEMINI_MAX_CONCURRENCY)
+            shared_state: State shared with other worker processes (store names)
+        """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
+        if not self.api_key and not uses_fake_backend():
             raise ValueError("GEMINI_API_KEY must be set")
         try:
-            self.client = genai.Client(api_key=self.api_key)
+            self.client: GenaiBackend = create_genai_client(self.api_key)
             # Verify client has required attributes
             if not hasattr(self.client, "files"):
                 raise ValueError(
@@ -34,71 +93,133 @@ class GeminiClient:
             # We'll handle this gracefully in the methods that use it
         except Exception as e:
             raise ValueError(f"Failed to initialize Gemini client: {e}") from e
-        self._store_name_cache: Optional[str] = None
+        self.stores = StoreRegistry(
+            self._find_or_create_store,
+            ttl_seconds=float(
+                os.getenv("STORE_CACHE_TTL_SECONDS", str(DEFAULT_STORE_TTL_SECONDS))
+            ),
+            shared=shared_state,
+        )
+
+        # Generation defaults (overridable per query; unset means the model default)
+        max_output_tokens = os.getenv("GEMINI_MAX_OUTPUT_TOKENS")
+        temperature = os.getenv("GEMINI_TEMPERATURE")
+        self.max_output_tokens = int(max_output_tokens) if max_output_tokens else None
+        self.temperature = float(temperature) if temperature else None
+
+        # Explicit context caching of the system prompt (when it is large enough)
+        self.prompt_cache: Optional[PromptCache] = None
+        if context_cache_enabled():
+            self.prompt_cache = PromptCache(
+                self.client,
+                ttl_seconds=int(
+                    os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", str(DEFAULT_CACHE_TTL_SECONDS))
+                ),
+                min_tokens=int(
+                    os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", str(DEFAULT_MIN_TOKENS))
+                ),
+            )
+
+        # Tail-latency protection for queries: deadline, circuit breaker and
+        # optional hedging after the recent p95 latency
+        self.query_timeout = float(
+            os.getenv("GEMINI_QUERY_TIMEOUT_SECONDS", str(DEFAULT_QUERY_TIMEOUT_SECONDS))
+        )
+        self.breaker = CircuitBreaker(
+            "gemini",
+            failure_threshold=int(
+                os.getenv("GEMINI_BREAKER_FAILURES", str(DEFAULT_FAILURE_THRESHOLD))
+            ),
+            reset_seconds=float(
+                os.getenv("GEMINI_BREAKER_RESET_SECONDS", str(DEFAULT_RESET_SECONDS))
+            ),
+        )
+        self.hedge_enabled = os.getenv("GEMINI_HEDGE", "false").lower() in ("1", "true", "yes")
+        self.hedge_min_delay = float(
+            os.getenv("GEMINI_HEDGE_MIN_DELAY_SECONDS", str(DEFAULT_HEDGE_MIN_DELAY_SECONDS))
+        )
+        self.latency = LatencyTracker()
+        self.hedge_budget = HedgeBudget()
+
+        # Bounded pool for running the blocking SDK calls off the event loop
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("GEMINI_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="gemini"
+        )
+
+    async def _run_blocking(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call on the client's bounded executor.
+
+        Calls beyond max_concurrency wait in the executor queue instead of
+        blocking the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """Shut down the executor used by the async helpers."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
     
-    def get_or_create_store(self, display_name: str = DEFAULT_STORE_NAME) -> str:
+    def _find_or_create_store(self, display_name: str) -> Optional[str]:
         """
-        Find existing store or create new one by display_name.
+        Find a store by display name, creating it if it doesn't exist.
 
         Args:
             display_name: Display name for the store
 
         Returns:
-            Store name (full resource name)
+            Store name (full resource name), or None if the stores could not be
+            listed
         """
-        # Check cache first
-        if self._store_name_cache:
-            return self._store_name_cache
+        # Note: file_search_stores may not be available in all library versions
+        if not hasattr(self.client, "file_search_stores"):
+            logger.warning(
+                "file_search_stores not available in this API version. "
+                "Using default store name."
+            )
+            return f"stores/{display_name}"
 
         # List all stores and find by display name using next() (Pythonic)
         try:
-            # Check if file_search_stores attribute exists
-            if hasattr(self.client, "file_search_stores"):
-                stores = list(self.client.file_search_stores.list())
-                matching_store = next(
-                    (store for store in stores if store.display_name == display_name), None
-                )
-                if matching_store:
-                    logger.info(f"✓ Using existing store: {matching_store.name}")
-                    self._store_name_cache = matching_store.name
-                    return matching_store.name
-            else:
-                # Fallback: use a default store name if file_search_stores is not available
-                logger.warning(
-                    "file_search_stores not available in this API version. "
-                    "Using default store name."
-                )
-                # Return a default store name format
-                default_store = f"stores/{display_name}"
-                self._store_name_cache = default_store
-                return default_store
+            stores = list(self.client.file_search_stores.list())
         except Exception as e:
             logger.warning(f"Could not list stores: {e}")
-            # Fallback to default store name
-            default_store = f"stores/{display_name}"
-            self._store_name_cache = default_store
-            return default_store
+            return None
+        matching_store = next(
+            (store for store in stores if store.display_name == display_name), None
+        )
+        if matching_store:
+            existing_name: Optional[str] = matching_store.name
+            logger.info(f"✓ Using existing store: {existing_name}")
+            return existing_name
+
+        # Create new store if not found
+        try:
+            store = self.client.file_search_stores.create(config={"display_name": display_name})
+            created_name: Optional[str] = store.name
+            logger.info(f"✓ Created new store: {created_name}")
+            return created_name
+        except Exception as e:
+            raise RuntimeError(f"Failed to create store: {e}") from e
+
+    def get_or_create_store(self, display_name: str = DEFAULT_STORE_NAME) -> str:
+        """
+        Find existing store or create new one by display_name.
+
+        Args:
+            display_name: Display name for the store
+
+        Returns:
+            Store name (full resource name)
+        """
+        return self.get_store_name(display_name)
 
-        # Create new store if not found (only if file_search_stores is available)
-        if hasattr(self.client, "file_search_stores"):
-            try:
-                store = self.client.file_search_stores.create(
-                    config={"display_name": display_name}
-                )
-                logger.info(f"✓ Created new store: {store.name}")
-                self._store_name_cache = store.name
-                return store.name
-            except Exception as e:
-                raise RuntimeError(f"Failed to create store: {e}") from e
-        else:
-            # Return default store name if file_search_stores is not available
-            default_store = f"stores/{display_name}"
-            self._store_name_cache = default_store
-            return default_store
-    
     def get_store_name(self, display_name: str = DEFAULT_STORE_NAME) -> str:
         """
-        Get store name (cached lookup).
+        Get store name (cached per display name in the store registry).
 
         Args:
             display_name: Display name for the store
@@ -106,46 +227,155 @@ class GeminiClient:
         Returns:
             Store name (full resource name)
         """
-        if not self._store_name_cache:
-            self._store_name_cache = self.get_or_create_store(display_name)
-        return self._store_name_cache
-    
+        store_name = self.stores.get(display_name)
+        if store_name is None:
+            # Fallback to default store name (not cached, so it is retried)
+            return f"stores/{display_name}"
+        return store_name
+
+    @timed("store_warmup")
+    def warm_stores(self, display_names: list[str]) -> dict[str, str]:
+        """
+        Resolve several stores up front with a single list call.
+
+        Stores that don't exist yet are created; stores another worker
+        already resolved are taken from the shared state without a call.
+
+        Args:
+            display_names: Display names to resolve
+
+        Returns:
+            Display name → resource name for the resolved stores
+        """
+        display_names = [name for name in display_names if self.stores.lookup(name) is None]
+        if not display_names:
+            return self.stores.snapshot()
+
+        existing: dict[str, str] = {}
+        if hasattr(self.client, "file_search_stores"):
+            try:
+                existing = {
+                    store.display_name: store.name
+                    for store in self.client.file_search_stores.list()
+                    if store.display_name and store.name
+                }
+            except Exception as e:
+                logger.warning(f"Store warm-up could not list stores: {e}")
+
+        for display_name in display_names:
+            if display_name in existing:
+                self.stores.put(display_name, existing[display_name])
+            else:
+                try:
+                    self.stores.get(display_name)
+                except RuntimeError as e:
+                    logger.warning(f"Store warm-up failed for {display_name}: {e}")
+        return self.stores.snapshot()
+
+    def get_store_names(self, store_display_names: StoreSelection) -> list[str]:
+        """
+        Resolve one or several stores for a query.
+
+        Stores missing from the registry are resolved together with a single
+        list call, so a cold federated query costs one lookup, not one per store.
+
+        Args:
+            store_display_names: Display name, or display names of a federated query
+
+        Returns:
+            Store names (full resource names), in the given order
+        """
+        if isinstance(store_display_names, str):
+            return [self.get_store_name(store_display_names)]
+
+        missing = [name for name in store_display_names if self.stores.lookup(name) is None]
+        if len(missing) > 1:
+            self.warm_stores(missing)
+        return [self.get_store_name(name) for name in store_display_names]
+
+    def _generation_config(
+        self,
+        system_prompt: str,
+        store_names: list[str],
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> "types.GenerateContentConfig":
+        """
+        Build the generation config with File Search enabled for some stores.
+
+        The system prompt goes in system_instruction rather than the contents.
+        All stores go into one File Search tool, so a federated query is a
+        single model call whose retrieval covers every store. When the prompt
+        prefix is context-cached, the request references the cache instead of
+        resending the instruction and tools.
+        """
+        from google.genai import types
+
+        tools = [
+            types.Tool(file_search=types.FileSearch(file_search_store_names=store_names))
+        ]
+        generation: dict[str, Any] = {
+            "max_output_tokens": max_output_tokens or self.max_output_tokens,
+            "temperature": temperature if temperature is not None else self.temperature,
+            # Per-call HTTP deadline, so a stalled call frees its worker thread
+            "http_options": types.HttpOptions(timeout=int(self.query_timeout * 1000)),
+        }
+        cached_content = (
+            self.prompt_cache.get(DEFAULT_MODEL, system_prompt, tools, store_names)
+            if self.prompt_cache is not None
+            else None
+        )
+        if cached_content is not None:
+            return types.GenerateContentConfig(cached_content=cached_content, **generation)
+        return types.GenerateContentConfig(
+            system_instruction=system_prompt,
+            # The config also accepts callables as tools, so its list type is wider
+            tools=list(tools),
+            **generation,
+        )
+
+    @timed("generate_content", gemini=True)
     def query(
         self,
         question: str,
         system_prompt: str,
-        store_display_name: str = DEFAULT_STORE_NAME,
-    ) -> tuple[str, Any]:
+        store_display_name: StoreSelection = DEFAULT_STORE_NAME,
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> tuple[str, Any, Any]:
         """
         Query Gemini with File Search enabled.
 
         Args:
             question: User's question
             system_prompt: System prompt for the model
-            store_display_name: Display name of the File Search store
+            store_display_name: Display name of the File Search store, or a list
+                of display names to search all of them in one call
+            max_output_tokens: Output token limit (defaults to GEMINI_MAX_OUTPUT_TOKENS)
+            temperature: Sampling temperature (defaults to GEMINI_TEMPERATURE)
 
         Returns:
-            Tuple of (answer_text, grounding_metadata)
-        """
-        store_name = self.get_store_name(store_display_name)
+            Tuple of (answer_text, grounding_metadata, usage_metadata)
 
-        # Combine system prompt and question
-        full_prompt = f"{system_prompt}\n\nQ: {question}"
+        Raises:
+            CircuitOpenError: If recent calls failed and Gemini is being skipped
+            RuntimeError: If the query fails
+        """
+        store_names = self.get_store_names(store_display_name)
+        self.breaker.before_call()
 
+        response = None
+        started = time.perf_counter()
         try:
             response = self.client.models.generate_content(
                 model=DEFAULT_MODEL,
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    tools=[
-                        types.Tool(
-                            file_search=types.FileSearch(
-                                file_search_store_names=[store_name]
-                            )
-                        )
-                    ]
+                contents=question,
+                config=self._generation_config(
+                    system_prompt, store_names, max_output_tokens, temperature
                 ),
             )
+            self.breaker.record_success()
+            self.latency.record(time.perf_counter() - started)
 
             if not response.candidates:
                 raise RuntimeError("No response candidates from Gemini")
@@ -155,86 +385,200 @@ class GeminiClient:
 
             # Extract grounding metadata (use getattr with default for cleaner code)
             grounding_metadata = getattr(candidate, "grounding_metadata", None)
+            usage_metadata = getattr(response, "usage_metadata", None)
+            record_token_usage("generate_content", usage_metadata)
 
-            return answer_text, grounding_metadata
+            return answer_text, grounding_metadata, usage_metadata
 
         except Exception as e:
+            if response is None:
+                self.breaker.record_failure(e)
             raise RuntimeError(f"Gemini query failed: {e}") from e
-    
-    def upload_file(
+
+    def query_stream(
         self,
-        file_path: str | Path,
-        store_display_name: str = DEFAULT_STORE_NAME,
-    ) -> tuple[bool, str]:
+        question: str,
+        system_prompt: str,
+        store_display_name: StoreSelection = DEFAULT_STORE_NAME,
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Iterator[tuple[str, Any, Any]]:
         """
-        Upload a file to the File Search store.
+        Stream a File Search query as it is generated.
 
         Args:
-            file_path: Path to the file to upload
-            store_display_name: Display name of the store
+            question: User's question
+            system_prompt: System prompt for the model
+            store_display_name: Display name of the File Search store, or a list
+                of display names to search all of them in one call
+            max_output_tokens: Output token limit (defaults to GEMINI_MAX_OUTPUT_TOKENS)
+            temperature: Sampling temperature (defaults to GEMINI_TEMPERATURE)
+
+        Yields:
+            Tuples of (text_delta, grounding_metadata, usage_metadata); the
+            metadata is None until the chunk that carries it arrives
+        """
+        store_names = self.get_store_names(store_display_name)
+        self.breaker.before_call()
+
+        finished = False
+        try:
+            with timer("generate_content_stream", gemini=True):
+                stream = self.client.models.generate_content_stream(
+                    model=DEFAULT_MODEL,
+                    contents=question,
+                    config=self._generation_config(
+                        system_prompt, store_names, max_output_tokens, temperature
+                    ),
+                )
+                usage_metadata = None
+                for chunk in stream:
+                    candidate = chunk.candidates[0] if chunk.candidates else None
+                    grounding_metadata = getattr(candidate, "grounding_metadata", None)
+                    usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                    yield chunk.text or "", grounding_metadata, getattr(
+                        chunk, "usage_metadata", None
+                    )
+                finished = True
+                self.breaker.record_success()
+                record_token_usage("generate_content_stream", usage_metadata)
+        except Exception as e:
+            finished = True
+            self.breaker.record_failure(e)
+            raise RuntimeError(f"Gemini query failed: {e}") from e
+        finally:
+            if not finished:
+                # Abandoned by the consumer: no verdict on Gemini's health
+                self.breaker.record_abandoned()
+    
+    @timed("embed", gemini=True)
+    def embed(self, text: str) -> list[float]:
+        """
+        Embed a short text (used for semantic cache lookups).
+
+        Args:
+            text: Text to embed
 
         Returns:
-            Tuple of (success: bool, message: str)
+            Embedding vector
         """
-        file_path_obj = Path(file_path)
-        if not file_path_obj.exists():
-            return False, f"File not found: {file_path}"
+        try:
+            response = self.client.models.embed_content(
+                model=DEFAULT_EMBEDDING_MODEL, contents=text
+            )
+            return list(response.embeddings[0].values)
+        except Exception as e:
+            raise RuntimeError(f"Gemini embedding failed: {e}") from e
+
+    @staticmethod
+    def _check_upload(file_path: Path) -> Optional[str]:
+        """Return why a file cannot be uploaded, or None if it can."""
+        if not file_path.exists():
+            return f"File not found: {file_path}"
 
         # Check file size (100MB limit)
         MB_TO_BYTES = 1024 * 1024
         MAX_FILE_SIZE_MB = 100
-        file_size_mb = file_path_obj.stat().st_size / MB_TO_BYTES
-
+        file_size_mb = file_path.stat().st_size / MB_TO_BYTES
         if file_size_mb > MAX_FILE_SIZE_MB:
-            return False, f"File exceeds {MAX_FILE_SIZE_MB}MB limit ({file_size_mb:.1f}MB)"
+            return f"File exceeds {MAX_FILE_SIZE_MB}MB limit ({file_size_mb:.1f}MB)"
 
         # Check file extension
         SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md"}
-        file_ext = file_path_obj.suffix.lower()
+        file_ext = file_path.suffix.lower()
         if file_ext not in SUPPORTED_EXTENSIONS:
-            return (
-                False,
-                f"Unsupported file type: {file_ext}. Supported: {', '.join(SUPPORTED_EXTENSIONS)}",
-            )
-
-        try:
-            store_name = self.get_store_name(store_display_name)
-
-            # Use upload_to_file_search_store directly (same as ingestion script)
-            # The API should auto-detect MIME type from file extension
-            import time
+            supported = ", ".join(SUPPORTED_EXTENSIONS)
+            return f"Unsupported file type: {file_ext}. Supported: {supported}"
+        return None
+
+    def _start_upload(
+        self, file_path: Path, store_display_name: str, display_name: Optional[str] = None
+    ) -> Any:
+        """Upload a file to the store and return the import operation."""
+        store_name = self.get_store_name(store_display_name)
 
-            op = self.client.file_search_stores.upload_to_file_search_store(
+        # Use upload_to_file_search_store directly (same as ingestion script)
+        # The API should auto-detect MIME type from file extension
+        with timer("upload_to_store", gemini=True):
+            return self.client.file_search_stores.upload_to_file_search_store(
                 file_search_store_name=store_name,
-                file=str(file_path_obj),
+                file=str(file_path),
                 config={
-                    "display_name": file_path_obj.name,
+                    "display_name": display_name or file_path.name,
                     "chunking_config": {
                         "white_space_config": {
-                            "max_tokens_per_chunk": 300,
-                            "max_overlap_tokens": 30,
+                            "max_tokens_per_chunk": CHUNK_SIZE_TOKENS,
+                            "max_overlap_tokens": CHUNK_OVERLAP_TOKENS,
                         }
                     },
                 },
             )
 
-            # Poll for completion
-            POLL_INTERVAL_SECONDS = 5
-            while not op.done:
-                time.sleep(POLL_INTERVAL_SECONDS)
-                op = self.client.operations.get(op)
+    @staticmethod
+    def _upload_result(display_name: str, op: Any) -> tuple[bool, str, Optional[str]]:
+        """Turn a finished import operation into upload_file's return value."""
+        if hasattr(op, "error") and op.error:
+            GEMINI_ERRORS.labels(stage="upload_poll", error_type="operation_error").inc()
+            return False, f"Upload failed: {op.error}", None
+
+        document_name = getattr(getattr(op, "response", None), "document_name", None)
+        return True, f"File uploaded successfully: {display_name}", document_name
+
+    @timed("upload_file")
+    def upload_file(
+        self,
+        file_path: str | Path,
+        store_display_name: str = DEFAULT_STORE_NAME,
+        on_processing: Optional[Callable[[Optional[str]], None]] = None,
+        display_name: Optional[str] = None,
+    ) -> tuple[bool, str, Optional[str]]:
+        """
+        Upload a file to the File Search store.
+
+        Args:
+            file_path: Path to the file to upload
+            store_display_name: Display name of the store
+            on_processing: Called with the import operation's name once the
+                file is uploaded and the store is processing it
+            display_name: Document name in the store (defaults to the file
+                name; citations show it)
+
+        Returns:
+            Tuple of (success: bool, message: str, document_name: str | None)
+        """
+        file_path_obj = Path(file_path)
+        problem = self._check_upload(file_path_obj)
+        if problem:
+            return False, problem, None
 
-            if hasattr(op, "error") and op.error:
-                return False, f"Upload failed: {op.error}"
+        try:
+            op = self._start_upload(file_path_obj, store_display_name, display_name)
+            if on_processing is not None:
+                on_processing(op.name)
 
-            return True, f"File uploaded successfully: {file_path_obj.name}"
+            # Poll for completion, fast at first and backing off for big files
+            UPLOAD_OPERATIONS_PENDING.inc()
+            try:
+                started_op = op
+                with timer("upload_poll", gemini=True):
+                    op = poll_until(
+                        lambda: self.client.operations.get(started_op),
+                        lambda current: bool(current.done),
+                        op,
+                        stage="upload_poll",
+                    )
+            finally:
+                UPLOAD_OPERATIONS_PENDING.dec()
+
+            return self._upload_result(display_name or file_path_obj.name, op)
 
         except Exception as e:
-            return False, f"Upload failed: {str(e)}"
+            return False, f"Upload failed: {str(e)}", None
 
+    @timed("store_info")
     def get_store_info(
         self, store_display_name: str = DEFAULT_STORE_NAME
-    ) -> dict[str, str | int | None]:
+    ) -> StoreInfo:
         """
         Get information about the store (file count, etc.).
 
@@ -247,11 +591,18 @@ class GeminiClient:
         store_name = self.get_store_name(store_display_name)
 
         try:
+            # Single lookup of the store's document counters when available
+            if hasattr(self.client, "file_search_stores"):
+                store = self.client.file_search_stores.get(name=store_name)
+                file_count = getattr(store, "active_documents_count", None)
+                if file_count is not None:
+                    return {"store_name": store_name, "file_count": int(file_count)}
+
             # Check if client has required attributes
             if not hasattr(self.client, "files"):
                 return {"store_name": store_name, "file_count": None}
 
-            # List files in the store using list comprehension (Pythonic)
+            # Fallback: list files in the store using list comprehension (Pythonic)
             files = list(self.client.files.list())
             store_files = [
                 f
@@ -262,6 +613,175 @@ class GeminiClient:
 
             return {"store_name": store_name, "file_count": len(store_files)}
         except Exception as e:
-            print(f"Warning: Could not get store info: {e}")
+            record_gemini_error("store_info", e)
+            logger.warning(f"Could not get store info: {e}")
             return {"store_name": store_name, "file_count": None}
 
+    async def query_async(
+        self,
+        question: str,
+        system_prompt: str,
+        store_display_name: StoreSelection = DEFAULT_STORE_NAME,
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> tuple[str, Any, Any]:
+        """
+        Async variant of query() that does not block the event loop.
+
+        Fails fast while the circuit breaker is open, gives up after
+        query_timeout seconds and, with GEMINI_HEDGE, sends a second identical
+        request when the first is slower than the recent p95.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            DeadlineExceeded: If no answer arrived within query_timeout
+            RuntimeError: If the query fails
+        """
+        self.breaker.raise_if_open()
+
+        def attempt() -> Awaitable[tuple[str, Any, Any]]:
+            return self._run_blocking(
+                self.query,
+                question=question,
+                system_prompt=system_prompt,
+                store_display_name=store_display_name,
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+            )
+
+        try:
+            async with asyncio.timeout(self.query_timeout):
+                return await hedged(attempt, self._hedge_delay(), self.hedge_budget)
+        except TimeoutError as e:
+            raise DeadlineExceeded(
+                f"Gemini query exceeded its {self.query_timeout:g}s deadline"
+            ) from e
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds before a query is hedged (None when hedging is off or unprimed)."""
+        if not self.hedge_enabled:
+            return None
+        p95 = self.latency.percentile(HEDGE_PERCENTILE)
+        return max(self.hedge_min_delay, p95) if p95 is not None else None
+
+    async def query_stream_async(
+        self,
+        question: str,
+        system_prompt: str,
+        store_display_name: StoreSelection = DEFAULT_STORE_NAME,
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> AsyncIterator[tuple[str, Any, Any]]:
+        """
+        Async variant of query_stream() that pulls chunks on the executor.
+
+        Fails fast while the circuit breaker is open, before a thread is
+        taken, and gives up when no chunk arrives within query_timeout
+        seconds (the query_async deadline, applied to each chunk).
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            DeadlineExceeded: If the stream stalled for query_timeout
+            RuntimeError: If the query fails
+        """
+        self.breaker.raise_if_open()
+        stream = self.query_stream(
+            question, system_prompt, store_display_name, max_output_tokens, temperature
+        )
+        sentinel = object()
+        while True:
+            try:
+                async with asyncio.timeout(self.query_timeout):
+                    item = await self._run_blocking(next, stream, sentinel)
+            except TimeoutError as e:
+                raise DeadlineExceeded(
+                    f"Gemini stream sent nothing for {self.query_timeout:g}s"
+                ) from e
+            if item is sentinel:
+                return
+            yield item
+
+    async def embed_async(self, text: str) -> list[float]:
+        """Async variant of embed() that does not block the event loop."""
+        return await self._run_blocking(self.embed, text)
+
+    async def upload_file_async(
+        self,
+        file_path: str | Path,
+        store_display_name: str = DEFAULT_STORE_NAME,
+        on_processing: Optional[Callable[[Optional[str]], None]] = None,
+        display_name: Optional[str] = None,
+    ) -> tuple[bool, str, Optional[str]]:
+        """
+        Async variant of upload_file().
+
+        Only the API calls use the executor; waiting between polls holds no
+        thread, so many uploads can be watched from one event loop.
+        """
+        file_path_obj = Path(file_path)
+        problem = self._check_upload(file_path_obj)
+        if problem:
+            return False, problem, None
+
+        try:
+            with timer("upload_file"):
+                op = await self._run_blocking(
+                    self._start_upload, file_path_obj, store_display_name, display_name
+                )
+                if on_processing is not None:
+                    on_processing(op.name)
+                op = await self._wait_for_import(op)
+
+            return self._upload_result(display_name or file_path_obj.name, op)
+
+        except Exception as e:
+            return False, f"Upload failed: {str(e)}", None
+
+    async def resume_upload_async(
+        self, operation_name: str, display_name: str
+    ) -> tuple[bool, str, Optional[str]]:
+        """
+        Wait for an import started before a restart, without uploading again.
+
+        Args:
+            operation_name: Name passed to on_processing by upload_file_async()
+            display_name: Document name in the store
+
+        Returns:
+            Tuple of (success: bool, message: str, document_name: str | None)
+        """
+        from google.genai import types
+
+        try:
+            op = types.UploadToFileSearchStoreOperation.from_api_response(
+                {"name": operation_name}
+            )
+            op = await self._wait_for_import(op)
+            return self._upload_result(display_name, op)
+        except Exception as e:
+            return False, f"Upload failed: {str(e)}", None
+
+    async def _wait_for_import(self, op: Any) -> Any:
+        """Poll an import operation until it is done."""
+        started_op = op
+        UPLOAD_OPERATIONS_PENDING.inc()
+        try:
+            with timer("upload_poll", gemini=True):
+                return await poll_until_async(
+                    lambda: self._run_blocking(self.client.operations.get, started_op),
+                    lambda current: bool(current.done),
+                    op,
+                    stage="upload_poll",
+                )
+        finally:
+            UPLOAD_OPERATIONS_PENDING.dec()
+
+    async def warm_stores_async(self, display_names: list[str]) -> dict[str, str]:
+        """Async variant of warm_stores() that does not block the event loop."""
+        return await self._run_blocking(self.warm_stores, display_names)
+
+    async def get_store_info_async(
+        self, store_display_name: str = DEFAULT_STORE_NAME
+    ) -> StoreInfo:
+        """Async variant of get_store_info() that does not block the event loop."""
+        return await self._run_blocking(self.get_store_info, store_display_name)
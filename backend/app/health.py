@@ -0,0 +1,198 @@
+"""Background-refreshed store snapshot for health and readiness checks."""
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Optional, TypedDict
+
+from .shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_REFRESH_SECONDS = 60.0
+DEFAULT_REFRESH_TIMEOUT_SECONDS = 10.0
+DEFAULT_SHARED_KEY = "health:store"
+SHARED_POLL_SECONDS = 0.5
+
+
+class StoreInfo(TypedDict):
+    """Store resource name and document count (None when unknown)."""
+
+    store_name: Optional[str]
+    file_count: Optional[int]
+
+
+class StoreSnapshot:
+    """
+    Cached store information, refreshed in the background.
+
+    Health endpoints read the snapshot instead of calling Gemini. A refresh
+    that fails or times out keeps the previous data (stale-while-revalidate)
+    and records the error.
+
+    With shared state, worker processes take turns: a snapshot published by
+    one worker less than refresh_seconds ago is adopted by the others, and a
+    short lease lets only one of them call Gemini when it is due.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[StoreInfo]],
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+        timeout_seconds: float = DEFAULT_REFRESH_TIMEOUT_SECONDS,
+        shared: Optional[SharedState] = None,
+        shared_key: str = DEFAULT_SHARED_KEY,
+    ):
+        """
+        Initialize an empty snapshot.
+
+        Args:
+            fetch: Coroutine function returning store info
+            refresh_seconds: Interval between background refreshes
+            timeout_seconds: Give up on a single refresh after this long
+            shared: State shared with other worker processes
+            shared_key: Key of this snapshot in the shared state
+        """
+        self.fetch = fetch
+        self.refresh_seconds = refresh_seconds
+        self.timeout_seconds = timeout_seconds
+        self.shared = shared
+        self.shared_key = shared_key
+        self.info: Optional[StoreInfo] = None
+        self.updated_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        """Seconds since the last successful refresh (None if never refreshed)."""
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the data is older than two refresh intervals."""
+        age = self.age_seconds
+        return age is None or age > 2 * self.refresh_seconds
+
+    def _adopt_shared(self) -> bool:
+        """Take over a snapshot another worker published recently; True if adopted."""
+        assert self.shared is not None
+        try:
+            raw = self.shared.get(self.shared_key)
+        except Exception as e:
+            logger.warning(f"Shared store snapshot unavailable: {e}")
+            return False
+        if raw is None:
+            return False
+        published = json.loads(raw)
+        age = max(0.0, time.time() - published["published_at"])
+        if age >= self.refresh_seconds:
+            return False
+        self.info = published["info"]
+        self.updated_at = time.monotonic() - age
+        self.error = None
+        return True
+
+    async def _await_shared(self) -> bool:
+        """
+        Let another worker's refresh finish instead of fetching as well.
+
+        With data in hand, keep it until the next interval. Without (at
+        start-up), wait up to timeout_seconds for the other worker's snapshot.
+
+        Returns:
+            False if nothing arrived and this worker should fetch itself
+        """
+        deadline = time.monotonic() + self.timeout_seconds
+        while self.info is None and time.monotonic() < deadline:
+            await asyncio.sleep(SHARED_POLL_SECONDS)
+            if await asyncio.to_thread(self._adopt_shared):
+                return True
+        return self.info is not None
+
+    def _publish(self) -> None:
+        assert self.shared is not None
+        try:
+            self.shared.set(
+                self.shared_key,
+                json.dumps({"info": self.info, "published_at": time.time()}),
+                2 * self.refresh_seconds,
+            )
+        except Exception as e:
+            logger.warning(f"Could not share store snapshot: {e}")
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Fetch store info once; failures keep the previous data.
+
+        Args:
+            force: Fetch even if another worker published a fresh snapshot
+        """
+        if self.shared is not None and not force:
+            if await asyncio.to_thread(self._adopt_shared):
+                return
+            leased = await asyncio.to_thread(
+                self.shared.add, f"lease:{self.shared_key}", str(os.getpid()), self.timeout_seconds
+            )
+            if not leased and await self._await_shared():
+                return
+
+        try:
+            info = await asyncio.wait_for(self.fetch(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.error = f"Store info refresh timed out after {self.timeout_seconds:g}s"
+            logger.warning(self.error)
+            return
+        except Exception as e:
+            self.error = f"Store info refresh failed: {e}"
+            logger.warning(self.error)
+            return
+
+        if info.get("file_count") is None and self.info is not None:
+            self.error = "Store info refresh returned no file count"
+            return
+
+        self.info = info
+        self.updated_at = time.monotonic()
+        self.error = None
+        if self.shared is not None:
+            await asyncio.to_thread(self._publish)
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        force = False
+        while True:
+            await self.refresh(force)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self.refresh_seconds)
+            # Woken by request_refresh(): the store changed, so fetch for real
+            force = self._wake.is_set()
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start refreshing in the background (call from the event loop)."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def request_refresh(self) -> None:
+        """Refresh as soon as possible; safe to call from any thread."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
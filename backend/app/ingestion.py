@@ -1,28 +1,140 @@
 #!/usr/bin/env python3
-"""CLI script for ingesting case study documents into Gemini File Search."""
+"""
+CLI script for ingesting case study documents into Gemini File Search.
+
+Run from the backend directory as a module: python -m app.ingestion --folder ...
+"""
 import argparse
 import os
+import random
+import tempfile
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Optional, TypeVar
 
+import httpx
 from dotenv import load_dotenv
-from google import genai
+
+from .backends import GenaiBackend, create_genai_client, uses_fake_backend
+from .cache import bump_store_version
+from .content_index import DEFAULT_INDEX_FILENAME, ContentIndex, IndexedDocument, hash_file
+from .extraction import DocumentExtractor, ExtractedDocument, extraction_enabled
+from .gemini_client import CHUNK_OVERLAP_TOKENS, CHUNK_SIZE_TOKENS
+from .metrics import UPLOAD_OPERATIONS_PENDING, timer
+from .polling import poll_until
 
 # Constants
 MB_TO_BYTES = 1024 * 1024
 MAX_FILE_SIZE_MB = 100
-POLL_INTERVAL_SECONDS = 5
 SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md"}
 DEFAULT_STORE_NAME = "case-study-store"
-CHUNK_SIZE_TOKENS = 300
-CHUNK_OVERLAP_TOKENS = 30
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 5
+RETRY_BASE_DELAY_SECONDS = 2
+RETRYABLE_STATUS_CODES = {429, 500, 503}
+# Uploads and imports are not idempotent: retried only when the server did nothing
+NON_IDEMPOTENT_RETRYABLE_STATUS_CODES = {429}
+UNSENT_REQUEST_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+DOCUMENTS_PAGE_SIZE = 20
+
+T = TypeVar("T")
 
 # Load environment variables
 load_dotenv()
 
 
+def _call_with_backoff(
+    func: Callable[..., T],
+    retryable: Callable[[Exception], bool],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> T:
+    """Call func, retrying errors retryable() accepts with jittered exponential backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not retryable(e) or attempt == MAX_RETRIES:
+                raise
+            delay = random.uniform(0, RETRY_BASE_DELAY_SECONDS * 2**attempt)
+            reason = getattr(e, "code", None) or type(e).__name__
+            print(f"  ↻ API returned {reason}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def with_backoff(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call an idempotent API function, retrying rate-limit and transient server errors.
+
+    Retries use exponential backoff with full jitter so concurrent workers
+    spread out instead of retrying in lockstep. Only for calls that are safe
+    to repeat (list, get, delete); see with_backoff_non_idempotent.
+
+    Args:
+        func: API function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The function's return value
+    """
+    return _call_with_backoff(
+        func, lambda e: getattr(e, "code", None) in RETRYABLE_STATUS_CODES, args, kwargs
+    )
+
+
+def with_backoff_non_idempotent(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call an API function that creates something (upload, import), retrying only safe errors.
+
+    A 5xx may come back for a request the server carried out, and sending it
+    again would create a duplicate store document. Only a rate-limit
+    rejection (429) or a connection that failed before the request was sent
+    is retried.
+
+    Args:
+        func: API function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The function's return value
+    """
+    return _call_with_backoff(
+        func,
+        lambda e: getattr(e, "code", None) in NON_IDEMPOTENT_RETRYABLE_STATUS_CODES
+        or isinstance(e, UNSENT_REQUEST_ERRORS),
+        args,
+        kwargs,
+    )
+
+
+def find_store(client: GenaiBackend, display_name: str = DEFAULT_STORE_NAME) -> Optional[str]:
+    """
+    Look up a store by display_name without creating it.
+
+    Args:
+        client: Gemini client instance
+        display_name: Display name of the store
+
+    Returns:
+        Store name (full resource name), or None if there is no such store
+    """
+    stores = list(client.file_search_stores.list())
+    # Use next() with generator for finding first match (Pythonic)
+    matching_store = next(
+        (store for store in stores if store.display_name == display_name), None
+    )
+    existing_name: Optional[str] = matching_store.name if matching_store else None
+    return existing_name
+
+
 def get_or_create_store(
-    client: genai.Client, display_name: str = DEFAULT_STORE_NAME
+    client: GenaiBackend, display_name: str = DEFAULT_STORE_NAME
 ) -> str:
     """
     Find existing store or create new one by display_name.
@@ -35,27 +147,65 @@ def get_or_create_store(
         Store name (full resource name)
     """
     try:
-        stores = list(client.file_search_stores.list())
-        # Use next() with generator for finding first match (Pythonic)
-        matching_store = next(
-            (store for store in stores if store.display_name == display_name), None
-        )
-        if matching_store:
-            print(f"✓ Using existing store: {matching_store.name}")
-            return matching_store.name
+        existing_name = find_store(client, display_name)
+        if existing_name:
+            print(f"✓ Using existing store: {existing_name}")
+            return existing_name
     except Exception as e:
         print(f"Note: Could not list existing stores: {e}")
 
     # Create new store if not found
     try:
         store = client.file_search_stores.create(config={"display_name": display_name})
-        print(f"✓ Created new store: {store.name}")
-        return store.name
+        created_name: str = store.name
+        print(f"✓ Created new store: {created_name}")
+        return created_name
     except Exception as e:
         raise RuntimeError(f"Failed to create store: {e}") from e
 
 
-def ingest_file(client: genai.Client, store_name: str, file_path: Path) -> bool:
+def list_store_documents(
+    client: GenaiBackend, store_name: str, page_size: int = DOCUMENTS_PAGE_SIZE
+) -> list[Any]:
+    """
+    List every document in a store, retrying each page fetch.
+
+    Iterating the SDK pager fetches later pages lazily, outside with_backoff.
+    Here every page is its own list call with the previous page's token, so
+    a throttled page is retried instead of failing the whole listing.
+
+    Args:
+        client: Gemini client instance
+        store_name: Store name (full resource name)
+        page_size: Documents per page
+
+    Returns:
+        The store's documents
+    """
+    documents: list[Any] = []
+    config: dict[str, Any] = {"page_size": page_size}
+    while True:
+        pager = with_backoff(
+            client.file_search_stores.documents.list, parent=store_name, config=config
+        )
+        page = getattr(pager, "page", None)
+        if page is None:
+            # Not paged (the fake backend returns a plain list)
+            documents.extend(pager)
+            return documents
+        documents.extend(page)
+        page_token = getattr(pager, "config", {}).get("page_token")
+        if not page_token:
+            return documents
+        config = {**config, "page_token": page_token}
+
+
+def ingest_file(
+    client: GenaiBackend,
+    store_name: str,
+    file_path: Path,
+    upload_path: Optional[Path] = None,
+) -> tuple[bool, Optional[str]]:
     """
     Upload single file with sales-optimized chunking.
 
@@ -63,24 +213,26 @@ def ingest_file(client: genai.Client, store_name: str, file_path: Path) -> bool:
         client: Gemini client instance
         store_name: Name of the File Search store
         file_path: Path to the file to upload
+        upload_path: File actually sent, e.g. the markdown extracted from
+            file_path (the document keeps file_path's name)
 
     Returns:
-        True if successful, False otherwise
+        Tuple of (success, store document name if known)
     """
+    upload_path = upload_path or file_path
     # Check file size (100MB limit per Gemini File Search)
-    file_size_mb = file_path.stat().st_size / MB_TO_BYTES
+    file_size_mb = upload_path.stat().st_size / MB_TO_BYTES
     if file_size_mb > MAX_FILE_SIZE_MB:
         print(
             f"✗ Skipped: {file_path.name} "
             f"(exceeds {MAX_FILE_SIZE_MB}MB limit: {file_size_mb:.1f}MB)"
         )
-        return False
+        return False, None
 
     try:
+        extracted_note = " as extracted text" if upload_path != file_path else ""
         print(
-            f"Uploading: {file_path.name} ({file_size_mb:.1f}MB)...",
-            end=" ",
-            flush=True,
+            f"Uploading: {file_path.name} ({file_size_mb:.1f}MB{extracted_note})...", flush=True
         )
 
         # Map file extensions to MIME types
@@ -90,26 +242,35 @@ def ingest_file(client: genai.Client, store_name: str, file_path: Path) -> bool:
             ".txt": "text/plain",
             ".md": "text/markdown",
         }
-        file_ext = file_path.suffix.lower()
+        file_ext = upload_path.suffix.lower()
         mime_type = MIME_TYPE_MAP.get(file_ext, "text/plain")
 
         # Step 1: Upload to Files API with MIME type in config
-        uploaded_file = client.files.upload(
-            file=str(file_path.absolute()),
-            config={"mime_type": mime_type}
+        uploaded_file = with_backoff_non_idempotent(
+            client.files.upload,
+            file=str(upload_path.absolute()),
+            config={"mime_type": mime_type, "display_name": file_path.name},
         )
-        
+
         # Wait for file to be processed
-        while uploaded_file.state.name == "PROCESSING":
-            time.sleep(2)
-            uploaded_file = client.files.get(uploaded_file.name)
-        
+        file_name = uploaded_file.name
+        with timer("ingest_file_processing", gemini=True):
+            uploaded_file = poll_until(
+                lambda: with_backoff(client.files.get, name=file_name),
+                lambda current: current.state.name != "PROCESSING",
+                uploaded_file,
+                stage="ingest_file_processing",
+            )
+
         if uploaded_file.state.name != "ACTIVE":
-            print(f"✗ Error: File processing failed: {uploaded_file.state.name}")
-            return False
+            print(
+                f"✗ Error: {file_path.name}: File processing failed: {uploaded_file.state.name}"
+            )
+            return False, None
 
         # Step 2: Import file into File Search store
-        op = client.file_search_stores.import_file(
+        op = with_backoff_non_idempotent(
+            client.file_search_stores.import_file,
             file_search_store_name=store_name,
             file_name=uploaded_file.name,
             config={
@@ -122,37 +283,216 @@ def ingest_file(client: genai.Client, store_name: str, file_path: Path) -> bool:
             },
         )
 
-        # Poll for completion (aligned with official docs: 5 second intervals)
-        while not op.done:
-            time.sleep(POLL_INTERVAL_SECONDS)
-            op = client.operations.get(op)
+        # Poll for completion, fast at first and backing off for big files
+        UPLOAD_OPERATIONS_PENDING.inc()
+        try:
+            with timer("ingest_poll", gemini=True):
+                started_op = op
+                op = poll_until(
+                    lambda: with_backoff(client.operations.get, started_op),
+                    lambda current: bool(current.done),
+                    op,
+                    stage="ingest_poll",
+                )
+        finally:
+            UPLOAD_OPERATIONS_PENDING.dec()
 
         if hasattr(op, "error") and op.error:
-            print(f"✗ Error: {op.error}")
-            return False
+            print(f"✗ Error: {file_path.name}: {op.error}")
+            return False, None
 
-        print("✓ Complete")
-        return True
+        print(f"✓ Complete: {file_path.name}")
+        document_name = getattr(getattr(op, "response", None), "document_name", None)
+        return True, document_name
 
     except Exception as e:
-        print(f"✗ Failed: {e}")
-        return False
+        print(f"✗ Failed: {file_path.name}: {e}")
+        return False, None
+
+
+def scan_folder(folder: Path) -> tuple[list[Path], int]:
+    """
+    List supported files in a folder (recursively).
+
+    Dotfiles are local state (partial uploads etc.) and are ignored.
+
+    Returns:
+        Tuple of (supported_files, unsupported_count)
+    """
+    # Use list comprehension to filter files (Pythonic)
+    all_files = [f for f in folder.rglob("*") if f.is_file() and not f.name.startswith(".")]
+    supported_files = [f for f in all_files if f.suffix.lower() in SUPPORTED_EXTENSIONS]
+    return supported_files, len(all_files) - len(supported_files)
+
+
+def data_dir() -> Path:
+    """Local state shared with the API (DATA_DIR)."""
+    return Path(os.getenv("DATA_DIR", "/app/data"))
+
+
+def open_index(index_path: Optional[str] = None) -> ContentIndex:
+    """Open the content index (defaults to DATA_DIR/content_index.sqlite3)."""
+    return ContentIndex(index_path or data_dir() / DEFAULT_INDEX_FILENAME)
+
+
+def plan_uploads(
+    files: list[Path],
+    index: ContentIndex,
+    store_display_name: str,
+    workers: int = DEFAULT_WORKERS,
+    force: bool = False,
+) -> tuple[list[tuple[Path, str]], list[tuple[Path, str, IndexedDocument]], int]:
+    """
+    Work out which files need uploading, without any API calls.
+
+    Files whose path, size and mtime match the index are skipped without being
+    read. The rest are hashed; content already in the store (renamed, copied
+    or touched files) only needs its index entry relinked.
+
+    Returns:
+        Tuple of (to_upload as (path, sha256), to_relink as (path, sha256,
+        existing document), unchanged_count)
+    """
+    # Stat-only fast path: unchanged files are skipped without reading them
+    candidates = [
+        f for f in files if force or index.find_unchanged(f, store_display_name) is None
+    ]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        digests = list(executor.map(hash_file, candidates))
+
+    to_upload: list[tuple[Path, str]] = []
+    to_relink: list[tuple[Path, str, IndexedDocument]] = []
+    for file_path, digest in zip(candidates, digests, strict=True):
+        existing = None if force else index.get(digest, store_display_name)
+        if existing is not None:
+            to_relink.append((file_path, digest, existing))
+        else:
+            to_upload.append((file_path, digest))
+    return to_upload, to_relink, len(files) - len(candidates)
+
+
+def ingest_files(
+    client: GenaiBackend,
+    store_name: str,
+    items: list[tuple[Path, str]],
+    index: ContentIndex,
+    store_display_name: str,
+    workers: int = DEFAULT_WORKERS,
+    extractor: Optional[DocumentExtractor] = None,
+) -> list[bool]:
+    """
+    Ingest files concurrently and record successful ones in the content index.
 
+    With an extractor, every PDF/DOCX is queued for extraction up front, so
+    the process pool converts files on all cores while earlier ones upload.
+    Identical files are uploaded once and recorded under each of their paths.
 
-def main(folder_path: str, store_display_name: str = DEFAULT_STORE_NAME) -> None:
+    Args:
+        client: Gemini client instance
+        store_name: Name of the File Search store
+        items: Files to ingest as (path, sha256)
+        index: Content index to record documents in
+        store_display_name: Display name the index is keyed on
+        workers: Number of files ingested concurrently
+        extractor: Converts PDF/DOCX files to markdown before upload
+
+    Returns:
+        Per-file success flags, in input order
+    """
+    paths_by_digest: dict[str, list[Path]] = {}
+    for path, digest in items:
+        paths_by_digest.setdefault(digest, []).append(path)
+    unique = [(paths[0], digest) for digest, paths in paths_by_digest.items()]
+    futures = [extractor.submit(path) if extractor else None for path, _ in unique]
+
+    def ingest_and_record(
+        item: tuple[Path, str], future: Optional[Future[ExtractedDocument]]
+    ) -> bool:
+        file_path, digest = item
+        started = time.monotonic()
+        extracted = extractor.wait(file_path, future) if extractor else None
+        try:
+            success, document_name = ingest_file(
+                client, store_name, file_path, extracted.path if extracted else None
+            )
+        finally:
+            if extracted is not None:
+                extracted.path.unlink(missing_ok=True)
+        if success:
+            for path in paths_by_digest[digest]:
+                index.put(digest, store_display_name, document_name, path)
+            if extracted is not None:
+                print(f"  {_extraction_report(extracted, time.monotonic() - started)}")
+        return success
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        succeeded = dict(
+            zip(paths_by_digest, executor.map(ingest_and_record, unique, futures), strict=True)
+        )
+    return [succeeded[digest] for _, digest in items]
+
+
+def _extraction_report(extracted: ExtractedDocument, ingest_seconds: float) -> str:
+    """One line on what extracting a file saved."""
+    return (
+        f"⇣ {extracted.source.name}: {extracted.pages} pages, "
+        f"{extracted.source_bytes / MB_TO_BYTES:.2f}MB → {extracted.text_bytes / MB_TO_BYTES:.2f}MB "
+        f"({extracted.saved_ratio:.0%} saved), extracted in {extracted.seconds:.1f}s, "
+        f"ingested in {ingest_seconds:.1f}s"
+    )
+
+
+@contextmanager
+def local_extractor(enabled: Optional[bool] = None) -> Iterator[Optional[DocumentExtractor]]:
+    """
+    Process-pool extractor writing to a temporary folder, removed afterwards.
+
+    Args:
+        enabled: Extract PDF/DOCX files locally (defaults to LOCAL_EXTRACTION)
+
+    Yields:
+        The extractor, or None when extraction is off
+    """
+    if not (extraction_enabled() if enabled is None else enabled):
+        yield None
+        return
+    with tempfile.TemporaryDirectory(prefix="casestudy-extracted-") as output_dir:
+        extractor = DocumentExtractor(output_dir)
+        try:
+            yield extractor
+        finally:
+            extractor.close()
+
+
+def main(
+    folder_path: str,
+    store_display_name: str = DEFAULT_STORE_NAME,
+    workers: int = DEFAULT_WORKERS,
+    index_path: Optional[str] = None,
+    force: bool = False,
+    extract: Optional[bool] = None,
+) -> None:
     """
     Main ingestion function.
 
+    Files already in the store (per the content index) are skipped without any
+    API calls: unchanged files by path/size/mtime, renamed or touched ones by
+    SHA-256.
+
     Args:
         folder_path: Path to folder containing case study documents
         store_display_name: Display name for the File Search store
+        workers: Number of files hashed/ingested concurrently
+        index_path: Content index database (defaults to DATA_DIR/content_index.sqlite3)
+        force: Re-ingest files even if the index says they are in the store
+        extract: Upload text extracted locally from PDF/DOCX files instead of
+            the files (defaults to LOCAL_EXTRACTION)
     """
     api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if not api_key and not uses_fake_backend():
         raise ValueError("GEMINI_API_KEY environment variable must be set")
 
-    client = genai.Client(api_key=api_key)
-    store_name = get_or_create_store(client, store_display_name)
     folder = Path(folder_path)
 
     if not folder.exists():
@@ -163,38 +503,220 @@ def main(folder_path: str, store_display_name: str = DEFAULT_STORE_NAME) -> None
     print("Note: File Search supports many more formats (see Gemini API docs)")
     print(f"File size limit: {MAX_FILE_SIZE_MB}MB per file\n")
 
-    # Use list comprehension to filter files (Pythonic)
-    all_files = list(folder.rglob("*"))
-    supported_files = [
-        f
-        for f in all_files
-        if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
-    ]
-    skipped = sum(1 for f in all_files if f.is_file() and f not in supported_files)
-
-    # Process files (use loop for side effects, but track results efficiently)
-    count = 0
-    errors = 0
-    for file_path in supported_files:
-        if ingest_file(client, store_name, file_path):
-            count += 1
-        else:
-            errors += 1
+    supported_files, skipped = scan_folder(folder)
+    index = open_index(index_path)
+    to_ingest, relinked, unchanged = plan_uploads(
+        supported_files, index, store_display_name, workers, force=force
+    )
+    for file_path, digest, existing in relinked:
+        index.put(digest, store_display_name, existing.document_name, file_path)
+    duplicates = len(relinked)
+
+    store_name = store_display_name
+    results: list[bool] = []
+    started = time.monotonic()
+    if to_ingest:
+        client = create_genai_client(api_key)
+        store_name = get_or_create_store(client, store_display_name)
+        with local_extractor(extract) as extractor:
+            results = ingest_files(
+                client, store_name, to_ingest, index, store_display_name, workers, extractor
+            )
+    elapsed = time.monotonic() - started
+
+    count = sum(results)
+    errors = len(results) - count
+    ingested_mb = sum(
+        f.stat().st_size for (f, _), ok in zip(to_ingest, results, strict=True) if ok
+    ) / MB_TO_BYTES
+
+    # Invalidate cached API answers for this store
+    if count > 0:
+        bump_store_version(data_dir(), store_display_name)
 
     # Summary output
     separator = "=" * 50
     print(f"\n{separator}")
     print("🎉 Ingestion complete!")
-    print(f"   ✓ Ingested: {count} files")
+    print(f"   ✓ Ingested: {count} files ({ingested_mb:.1f}MB)")
+    if unchanged + duplicates > 0:
+        print(f"   ↷ Already in store: {unchanged + duplicates} files")
     if skipped > 0:
         print(f"   ⊘ Skipped: {skipped} unsupported files")
     if errors > 0:
         print(f"   ✗ Errors: {errors} files failed")
+    if elapsed > 0 and to_ingest:
+        print(
+            f"   ⏱ {elapsed:.1f}s with {workers} workers: "
+            f"{count / elapsed * 60:.1f} files/min, {ingested_mb / elapsed:.2f} MB/s"
+        )
     print(f"   Store: {store_name}")
     print("   Ready for queries. Run: docker compose up")
     print(f"{separator}")
 
 
+def sync(
+    folder_path: str,
+    store_display_name: str = DEFAULT_STORE_NAME,
+    workers: int = DEFAULT_WORKERS,
+    index_path: Optional[str] = None,
+    dry_run: bool = False,
+    extract: Optional[bool] = None,
+) -> None:
+    """
+    Mirror a folder into the File Search store.
+
+    New and modified files are uploaded, the old document of a modified file is
+    replaced, and documents whose source file was removed are deleted. The
+    local diff uses stat plus content hash, so a no-op sync makes no per-file
+    API calls; the store itself is listed once to catch documents that were
+    deleted remotely.
+
+    Args:
+        folder_path: Path to folder containing case study documents
+        store_display_name: Display name for the File Search store
+        workers: Number of files hashed/ingested concurrently
+        index_path: Content index database (defaults to DATA_DIR/content_index.sqlite3)
+        dry_run: Only print the planned operations
+        extract: Upload text extracted locally from PDF/DOCX files instead of
+            the files (defaults to LOCAL_EXTRACTION)
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key and not uses_fake_backend():
+        raise ValueError("GEMINI_API_KEY environment variable must be set")
+
+    folder = Path(folder_path)
+    if not folder.exists():
+        raise ValueError(f"Folder does not exist: {folder_path}")
+
+    print(f"\nSyncing folder: {folder_path}{' (dry run)' if dry_run else ''}\n")
+
+    supported_files, _ = scan_folder(folder)
+    index = open_index(index_path)
+    tracked = index.entries(store_display_name)
+
+    # Documents deleted from the store behind our back need re-uploading
+    client = create_genai_client(api_key)
+    store_name: Optional[str]
+    if dry_run:
+        # A dry run must not create the store; a missing store has no documents
+        store_name = find_store(client, store_display_name)
+    else:
+        store_name = get_or_create_store(client, store_display_name)
+    try:
+        remote = (
+            {doc.name for doc in list_store_documents(client, store_name)}
+            if store_name
+            else set()
+        )
+        missing = [doc for doc in tracked if doc.document_name and doc.document_name not in remote]
+    except Exception as e:
+        print(f"Note: Could not list store documents, trusting local index: {e}")
+        missing = []
+    if not dry_run:
+        for doc in missing:
+            index.remove(doc.sha256, store_display_name)
+    tracked_by_path = {doc.path: doc for doc in tracked if doc not in missing}
+
+    to_upload, to_relink, unchanged = plan_uploads(
+        supported_files, index, store_display_name, workers
+    )
+    relinked_hashes = {digest for _, digest, _ in to_relink}
+    uploaded_hashes = {digest for _, digest in to_upload}
+
+    # Content still held by a local file that is not being re-uploaded (the
+    # same document can be recorded for several paths)
+    local_paths = {str(f.resolve()) for f in supported_files}
+    upload_paths = {str(f.resolve()) for f, _ in to_upload}
+    kept_hashes = relinked_hashes | {
+        doc.sha256
+        for doc in tracked_by_path.values()
+        if doc.path in local_paths and doc.path not in upload_paths
+    }
+
+    # A modified file replaces the document previously uploaded from its path
+    to_replace: dict[Path, IndexedDocument] = {}
+    for file_path, digest in to_upload:
+        previous = tracked_by_path.get(str(file_path.resolve()))
+        if previous and previous.sha256 != digest and previous.sha256 not in kept_hashes:
+            to_replace[file_path] = previous
+
+    # Documents whose source files are all gone; a removed path whose content
+    # lives on elsewhere is only forgotten
+    replaced_hashes = {doc.sha256 for doc in to_replace.values()}
+    removed = [doc for doc in tracked_by_path.values() if doc.path not in local_paths]
+    to_forget = [
+        doc for doc in removed if doc.sha256 in kept_hashes | uploaded_hashes | replaced_hashes
+    ]
+    to_delete = list({doc.sha256: doc for doc in removed if doc not in to_forget}.values())
+
+    new_count = len(to_upload) - len(to_replace)
+    print("Planned operations:")
+    print(f"   + Upload: {new_count} new files")
+    print(f"   ~ Replace: {len(to_replace)} modified files")
+    print(f"   - Delete: {len(to_delete)} removed files")
+    print(f"   = Unchanged: {unchanged + len(to_relink)} files")
+    if missing:
+        print(f"   ! Missing from store: {len(missing)} documents (will re-upload)")
+    for file_path, _ in to_upload:
+        action = "~" if file_path in to_replace else "+"
+        print(f"     {action} {file_path.relative_to(folder)}")
+    for doc in to_delete:
+        print(f"     - {Path(doc.path).name}")
+
+    if dry_run:
+        print("\nDry run: no changes made.")
+        return
+    assert store_name is not None  # only a dry run skips creating the store
+
+    for file_path, digest, existing in to_relink:
+        index.put(digest, store_display_name, existing.document_name, file_path)
+    for doc in to_forget:
+        index.remove_path(doc.path, store_display_name)
+
+    def delete_document(doc: IndexedDocument) -> bool:
+        try:
+            if doc.document_name:
+                with_backoff(
+                    client.file_search_stores.documents.delete,
+                    name=doc.document_name,
+                    config={"force": True},
+                )
+            index.remove(doc.sha256, store_display_name)
+            return True
+        except Exception as e:
+            print(f"✗ Failed to delete {Path(doc.path).name}: {e}")
+            return False
+
+    with local_extractor(extract) as extractor:
+        uploaded = ingest_files(
+            client, store_name, to_upload, index, store_display_name, workers, extractor
+        )
+    # Copies of one file may have replaced the same document
+    replaced_documents = {
+        to_replace[file_path].sha256: to_replace[file_path]
+        for (file_path, _), ok in zip(to_upload, uploaded, strict=True)
+        if ok and file_path in to_replace
+    }
+    replaced = [delete_document(doc) for doc in replaced_documents.values()]
+    deleted = [delete_document(doc) for doc in to_delete]
+    uploaded_new = sum(
+        ok for (file_path, _), ok in zip(to_upload, uploaded, strict=True) if file_path not in to_replace
+    )
+
+    if any(uploaded) or any(deleted):
+        bump_store_version(data_dir(), store_display_name)
+
+    separator = "=" * 50
+    print(f"\n{separator}")
+    print("🔄 Sync complete! (executed / planned)")
+    print(f"   + Uploaded: {uploaded_new} / {new_count}")
+    print(f"   ~ Replaced: {sum(replaced)} / {len(to_replace)}")
+    print(f"   - Deleted: {sum(deleted)} / {len(to_delete)}")
+    print(f"   Store: {store_name}")
+    print(f"{separator}")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Ingest case study documents into Gemini File Search"
@@ -209,7 +731,55 @@ if __name__ == "__main__":
         default=DEFAULT_STORE_NAME,
         help=f"Display name for the File Search store (default: {DEFAULT_STORE_NAME})",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of files to ingest concurrently (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help=f"Content index database (default: $DATA_DIR/{DEFAULT_INDEX_FILENAME})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-ingest every file, even if it is already in the store",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Mirror the folder into the store (upload new/modified, delete removed files)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --sync, only print the planned operations",
+    )
+    parser.add_argument(
+        "--extract",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Extract PDF/DOCX text locally and upload that (default: $LOCAL_EXTRACTION)",
+    )
     args = parser.parse_args()
-    
-    main(args.folder, args.store_name)
 
+    if args.sync:
+        sync(
+            args.folder,
+            args.store_name,
+            workers=args.workers,
+            index_path=args.index,
+            dry_run=args.dry_run,
+            extract=args.extract,
+        )
+    else:
+        main(
+            args.folder,
+            args.store_name,
+            workers=args.workers,
+            index_path=args.index,
+            force=args.force,
+            extract=args.extract,
+        )
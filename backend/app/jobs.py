@@ -0,0 +1,329 @@
+"""Background upload jobs backed by a local SQLite database."""
+import asyncio
+import contextlib
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Optional
+
+from .content_index import ContentIndex
+from .extraction import DocumentExtractor, ExtractedDocument
+from .gemini_client import GeminiClient
+from .metrics import EXTRACTION_BYTES, timer
+from .models import UploadProgressResponse
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_UPLOAD_WORKERS = 2
+CLOSE_TIMEOUT_SECONDS = 5.0
+PENDING_STATUSES = ("uploading", "processing")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    store_display_name TEXT NOT NULL,
+    sha256 TEXT,
+    status TEXT NOT NULL,
+    progress REAL,
+    message TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    operation_name TEXT
+)
+"""
+# Columns added after the first release (databases created before lack them)
+_ADDED_COLUMNS = {"operation_name": "TEXT"}
+
+
+class UploadJobStore:
+    """Persistent record of upload jobs (survives restarts)."""
+
+    def __init__(self, db_path: str | Path):
+        """Open (or create) the job database."""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(upload_jobs)")}
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE upload_jobs ADD COLUMN {column} {column_type}")
+
+    def create(
+        self,
+        filename: str,
+        path: str | Path,
+        store_display_name: str,
+        sha256: Optional[str] = None,
+    ) -> str:
+        """Insert a new job in the "uploading" state and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO upload_jobs (id, filename, path, store_display_name, sha256, "
+                "status, progress, message, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    filename,
+                    str(path),
+                    store_display_name,
+                    sha256,
+                    "uploading",
+                    0.0,
+                    None,
+                    now,
+                    now,
+                ),
+            )
+        return job_id
+
+    def update(
+        self,
+        job_id: str,
+        status: str,
+        progress: Optional[float] = None,
+        message: Optional[str] = None,
+    ) -> None:
+        """Update the status of a job."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE upload_jobs SET status = ?, progress = ?, message = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, progress, message, time.time(), job_id),
+            )
+
+    def set_operation(self, job_id: str, operation_name: Optional[str]) -> None:
+        """Record the store import of a job ("processing"), so a restart can resume it."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE upload_jobs SET status = ?, progress = ?, operation_name = ?, "
+                "updated_at = ? WHERE id = ?",
+                ("processing", 0.5, operation_name, time.time(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        """Fetch a job row by id."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM upload_jobs WHERE id = ?", (job_id,))
+            row: Optional[sqlite3.Row] = cursor.fetchone()
+            return row
+
+    def pending(self) -> list[sqlite3.Row]:
+        """Return jobs that have not finished yet, oldest first."""
+        placeholders = ", ".join("?" for _ in PENDING_STATUSES)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT * FROM upload_jobs WHERE status IN ({placeholders}) "
+                "ORDER BY created_at",
+                PENDING_STATUSES,
+            )
+            return cursor.fetchall()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class UploadJobQueue:
+    """
+    Uploads files to the File Search store in the background.
+
+    The HTTP handler only saves the file and enqueues a job. Jobs run as
+    coroutines on one event loop in a dedicated thread: extraction waits on
+    the process pool and the upload goes through
+    GeminiClient.upload_file_async, so a job holds no thread while the store
+    processes its file. At most `workers` jobs run at once; progress is
+    reported through the job store.
+    """
+
+    def __init__(
+        self,
+        store: UploadJobStore,
+        client: GeminiClient,
+        workers: int = DEFAULT_UPLOAD_WORKERS,
+        on_complete: Optional[Callable[[str], None]] = None,
+        content_index: Optional[ContentIndex] = None,
+        extractor: Optional[DocumentExtractor] = None,
+        on_failure: Optional[Callable[[Path], None]] = None,
+    ):
+        """
+        Initialize the queue and start its event loop.
+
+        Args:
+            store: Job store used for status and persistence
+            client: Gemini client used for uploads
+            workers: Number of concurrent uploads
+            on_complete: Called with the job id after a successful upload
+            content_index: Index to record uploaded documents in (by content hash)
+            extractor: Converts PDF/DOCX files to markdown before upload
+                (None uploads files as they are)
+            on_failure: Called with the saved file's path after a failed
+                upload has removed it
+        """
+        self.store = store
+        self.client = client
+        self.on_complete = on_complete
+        self.on_failure = on_failure
+        self.content_index = content_index
+        self.extractor = extractor
+        self._slots = asyncio.Semaphore(max(1, workers))
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="upload-jobs", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        filename: str,
+        path: str | Path,
+        store_display_name: str,
+        sha256: Optional[str] = None,
+    ) -> str:
+        """Create a job for a saved file and schedule it; returns the job id."""
+        job_id = self.store.create(filename, path, store_display_name, sha256)
+        self._schedule(job_id)
+        return job_id
+
+    def resume_pending(self) -> int:
+        """
+        Reschedule jobs interrupted by a restart; returns how many were resumed.
+
+        A job whose file already reached the store ("processing") waits for
+        its recorded import operation instead of uploading the file again.
+        """
+        jobs = self.store.pending()
+        for job in jobs:
+            logger.info(f"Resuming upload job {job['id']} ({job['filename']})")
+            self._schedule(job["id"])
+        return len(jobs)
+
+    def status(self, job_id: str) -> Optional[UploadProgressResponse]:
+        """Return the progress of a job, or None if it does not exist."""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        return UploadProgressResponse(
+            job_id=job["id"],
+            filename=job["filename"],
+            status=job["status"],
+            progress=job["progress"],
+            message=job["message"],
+        )
+
+    def _schedule(self, job_id: str) -> None:
+        """Run a job on the queue's event loop (callable from any thread)."""
+        asyncio.run_coroutine_threadsafe(self._run(job_id), self._loop)
+
+    async def _run(self, job_id: str) -> None:
+        """Run one job once a slot is free."""
+        async with self._slots:
+            await self._upload(job_id)
+
+    @staticmethod
+    async def _extract(extractor: DocumentExtractor, path: Path) -> Optional[ExtractedDocument]:
+        """Convert a PDF/DOCX file in the process pool without holding a thread."""
+        future = extractor.submit(path)
+        if future is not None:
+            # wait() below reports conversion errors; here we only wait for the result
+            with contextlib.suppress(Exception):
+                await asyncio.wrap_future(future)
+        return extractor.wait(path, future)
+
+    async def _upload(self, job_id: str) -> None:
+        """Upload one file (or wait for its import after a restart) and record the outcome."""
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        path = Path(job["path"])
+        if job["operation_name"]:
+            logger.info(f"Waiting for the import of {job['filename']} started before restart")
+            success, message, document_name = await self.client.resume_upload_async(
+                job["operation_name"], path.name
+            )
+        else:
+            success, message, document_name = await self._upload_file(job_id, job, path)
+
+        if success:
+            logger.info(f"Upload job {job_id} complete: {job['filename']}")
+            self.store.update(job_id, "complete", 1.0, message)
+            if self.content_index is not None and job["sha256"]:
+                self.content_index.put(
+                    job["sha256"], job["store_display_name"], document_name, path
+                )
+            if self.on_complete is not None:
+                await asyncio.to_thread(self.on_complete, job_id)
+        else:
+            logger.error(f"Upload job {job_id} failed: {message}")
+            # Remove the saved file so a failed upload leaves no local copy
+            path.unlink(missing_ok=True)
+            self.store.update(job_id, "error", None, message)
+            if self.on_failure is not None:
+                await asyncio.to_thread(self.on_failure, path)
+
+    async def _upload_file(
+        self, job_id: str, job: sqlite3.Row, path: Path
+    ) -> tuple[bool, str, Optional[str]]:
+        """Extract (if enabled) and upload a job's file."""
+        extracted = None
+        try:
+            if self.extractor is not None:
+                with timer("extract_document"):
+                    extracted = await self._extract(self.extractor, path)
+            if extracted is not None:
+                EXTRACTION_BYTES.labels(kind="source").inc(extracted.source_bytes)
+                EXTRACTION_BYTES.labels(kind="text").inc(extracted.text_bytes)
+                logger.info(
+                    f"Extracted {job['filename']}: {extracted.pages} pages, "
+                    f"{extracted.source_bytes} -> {extracted.text_bytes} bytes "
+                    f"in {extracted.seconds:.2f}s"
+                )
+            return await self.client.upload_file_async(
+                extracted.path if extracted is not None else path,
+                job["store_display_name"],
+                on_processing=lambda operation_name: self.store.set_operation(
+                    job_id, operation_name
+                ),
+                display_name=path.name,
+            )
+        except Exception as e:
+            return False, f"Upload failed: {str(e)}", None
+        finally:
+            if extracted is not None:
+                extracted.path.unlink(missing_ok=True)
+
+    async def _cancel_jobs(self) -> None:
+        """Cancel the running and waiting jobs; they stay pending in the store."""
+        current = asyncio.current_task()
+        jobs = [task for task in asyncio.all_tasks() if task is not current]
+        for task in jobs:
+            task.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+    def close(self) -> None:
+        """Stop the queue; unfinished jobs are picked up again on next start."""
+        if self._loop.is_closed():
+            return
+        cancelled = asyncio.run_coroutine_threadsafe(self._cancel_jobs(), self._loop)
+        with contextlib.suppress(Exception):
+            cancelled.result(timeout=CLOSE_TIMEOUT_SECONDS)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=CLOSE_TIMEOUT_SECONDS)
+        if not self._thread.is_alive():
+            self._loop.close()
+        if self.extractor is not None:
+            self.extractor.close()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for /api/query and /api/upload.
+
+Runs in-process against the offline fake backend by default (no quota used):
+
+    GEMINI_BACKEND=fake python -m app.loadtest --endpoint query --concurrency 32
+
+or against a running server with --url http://localhost:8000. --max-p99 turns
+a run into a pass/fail check, e.g. p99 under injected upstream slowness:
+
+    FAKE_GEMINI_SLOW_RATE=0.05 GEMINI_HEDGE=true python -m app.loadtest --max-p99 2
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+# Constants
+DEFAULT_CONCURRENCY = 16
+DEFAULT_REQUESTS = 200
+DEFAULT_TIMEOUT_SECONDS = 120.0
+UPLOAD_POLL_SECONDS = 0.2
+UPLOAD_FILLER_WORDS = 2000
+DEFAULT_MAX_ERROR_RATE = 0.01
+SAMPLE_QUESTIONS = [
+    "What ROI did retail customers see after migrating to the cloud?",
+    "Which case studies mention fraud detection?",
+    "How long did a typical healthcare deployment take?",
+    "What were the biggest challenges in manufacturing rollouts?",
+    "Which customers reduced infrastructure costs by more than 30%?",
+]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def budget_failures(
+    results: list["EndpointStats"],
+    max_p99: float,
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+) -> list[str]:
+    """
+    Why a run misses its latency budget (empty if it passes).
+
+    Errors are not latency samples, so a run that mostly fails has a
+    flattering p99; it fails on its error rate instead, and an endpoint with
+    no successful request at all always fails.
+
+    Args:
+        results: Stats per endpoint
+        max_p99: Largest acceptable p99 latency, in seconds
+        max_error_rate: Largest acceptable share of failed requests
+
+    Returns:
+        One message per failed check
+    """
+    failures = []
+    for stats in results:
+        total = len(stats.latencies) + stats.errors
+        if not stats.latencies:
+            failures.append(f"{stats.name}: no successful requests ({stats.errors} errors)")
+            continue
+        error_rate = stats.errors / total
+        if error_rate > max_error_rate:
+            failures.append(
+                f"{stats.name}: error rate {error_rate:.1%} > {max_error_rate:.1%} "
+                f"({stats.errors}/{total})"
+            )
+        p99 = percentile(sorted(stats.latencies), 99)
+        if p99 > max_p99:
+            failures.append(f"{stats.name}: p99 {p99:.2f}s > {max_p99:g}s")
+    return failures
+
+
+@dataclass
+class EndpointStats:
+    """Latency samples and errors for one endpoint."""
+
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def report(self) -> str:
+        """One-line summary with throughput and latency percentiles."""
+        ordered = sorted(self.latencies)
+        total = len(ordered) + self.errors
+        throughput = total / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{self.name:<18} {total:>6} req  {self.errors:>4} err  "
+            f"{throughput:>8.1f} req/s  "
+            f"p50 {percentile(ordered, 50) * 1000:>7.1f}ms  "
+            f"p95 {percentile(ordered, 95) * 1000:>7.1f}ms  "
+            f"p99 {percentile(ordered, 99) * 1000:>7.1f}ms"
+        )
+
+
+async def _drive(
+    requests: int, concurrency: int, send: Callable[[int], Awaitable[None]]
+) -> float:
+    """Run send(i) for i in range(requests) with a fixed number of workers."""
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            await send(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def run_queries(
+    client: httpx.AsyncClient, requests: int, concurrency: int, repeat: bool
+) -> EndpointStats:
+    """
+    Load /api/query.
+
+    Args:
+        client: HTTP client bound to the API
+        requests: Total number of queries
+        concurrency: Queries in flight at once
+        repeat: Reuse the sample questions (exercises the cache and coalescing)
+            instead of making every question unique
+
+    Returns:
+        Collected stats
+    """
+    stats = EndpointStats("query")
+    run_id = uuid.uuid4().hex[:6]
+
+    async def send(i: int) -> None:
+        question = SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]
+        if not repeat:
+            question = f"{question} (run {run_id} #{i})"
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/query", json={"question": question})
+            response.raise_for_status()
+            stats.latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            stats.errors += 1
+
+    stats.elapsed = await _drive(requests, concurrency, send)
+    return stats
+
+
+async def run_uploads(
+    client: httpx.AsyncClient, requests: int, concurrency: int, wait: bool
+) -> list[EndpointStats]:
+    """
+    Load /api/upload with unique synthetic Markdown files.
+
+    Args:
+        client: HTTP client bound to the API
+        requests: Total number of uploads
+        concurrency: Uploads in flight at once
+        wait: Also poll each job to completion and report end-to-end latency
+
+    Returns:
+        Stats for the upload request, plus job completion when wait is set
+    """
+    accepted = EndpointStats("upload")
+    completed = EndpointStats("upload (complete)")
+    run_id = uuid.uuid4().hex[:6]
+    filler = " ".join(f"word{n}" for n in range(UPLOAD_FILLER_WORDS))
+
+    async def send(i: int) -> None:
+        body = f"# Load test {run_id} #{i}\n\n{filler}\n".encode()
+        files = {"file": (f"loadtest-{run_id}-{i}.md", body, "text/markdown")}
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/upload", files=files)
+            response.raise_for_status()
+            accepted.latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            accepted.errors += 1
+            return
+
+        job_id = response.json().get("job_id")
+        if not wait or not job_id:
+            return
+        while True:
+            await asyncio.sleep(UPLOAD_POLL_SECONDS)
+            try:
+                status = (await client.get(f"/api/upload/{job_id}")).json().get("status")
+            except httpx.HTTPError:
+                status = None
+            if status == "complete":
+                completed.latencies.append(time.perf_counter() - started)
+                return
+            if status in ("error", None):
+                completed.errors += 1
+                return
+
+    elapsed = await _drive(requests, concurrency, send)
+    accepted.elapsed = completed.elapsed = elapsed
+    return [accepted, completed] if wait else [accepted]
+
+
+async def main(
+    endpoint: str,
+    requests: int = DEFAULT_REQUESTS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    url: Optional[str] = None,
+    repeat: bool = False,
+    wait: bool = False,
+) -> list[EndpointStats]:
+    """
+    Run the load test and print a summary.
+
+    Args:
+        endpoint: "query", "upload" or "both"
+        requests: Requests per endpoint
+        concurrency: Requests in flight at once
+        url: Base URL of a running server (in-process app when omitted)
+        repeat: See run_queries
+        wait: See run_uploads
+
+    Returns:
+        Stats per endpoint
+    """
+    timeout = httpx.Timeout(DEFAULT_TIMEOUT_SECONDS)
+    limits = httpx.Limits(max_connections=concurrency)
+    app: Optional["FastAPI"] = None
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits)
+    else:
+        # In-process: fake backend and throwaway state unless configured otherwise
+        os.environ.setdefault("GEMINI_BACKEND", "fake")
+        # Every request comes from one client: measure the server, not the rate limiter
+        os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "0")
+        scratch = tempfile.mkdtemp(prefix="loadtest-")
+        os.environ.setdefault("CASE_STUDIES_DIR", os.path.join(scratch, "case-studies"))
+        os.environ.setdefault("DATA_DIR", os.path.join(scratch, "data"))
+        from . import main
+
+        app = main.app
+
+        await app.router.startup()
+        # The Gemini client is built by a start-up task; measure from when it is ready
+        await app.state.gemini_init_task
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=timeout
+        )
+
+    results: list[EndpointStats] = []
+    try:
+        if endpoint in ("query", "both"):
+            results.append(await run_queries(client, requests, concurrency, repeat))
+        if endpoint in ("upload", "both"):
+            results.extend(await run_uploads(client, requests, concurrency, wait))
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    target = url or f"in-process ({os.getenv('GEMINI_BACKEND', 'gemini')} backend)"
+    separator = "=" * 50
+    print(f"\n{separator}")
+    print(f"Load test against {target}, concurrency {concurrency}")
+    for stats in results:
+        print(f"   {stats.report()}")
+    print(separator)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the CaseStudy AI API")
+    parser.add_argument(
+        "--endpoint",
+        choices=["query", "upload", "both"],
+        default="query",
+        help="Endpoint(s) to load (default: query)",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=DEFAULT_REQUESTS,
+        help=f"Requests per endpoint (default: {DEFAULT_REQUESTS})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Requests in flight at once (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--url",
+        default=None,
+        help="Base URL of a running server (default: run the app in-process)",
+    )
+    parser.add_argument(
+        "--repeat",
+        action="store_true",
+        help="Reuse a few questions instead of unique ones (measures cache hits)",
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Poll upload jobs to completion and report end-to-end latency",
+    )
+    parser.add_argument(
+        "--max-p99",
+        type=float,
+        default=None,
+        help="Fail (exit 1) if an endpoint's p99 latency exceeds this many seconds",
+    )
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=DEFAULT_MAX_ERROR_RATE,
+        help=f"With --max-p99, also fail above this share of errors (default: {DEFAULT_MAX_ERROR_RATE})",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        main(
+            args.endpoint,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            url=args.url,
+            repeat=args.repeat,
+            wait=args.wait,
+        )
+    )
+    if args.max_p99 is not None:
+        failures = budget_failures(results, args.max_p99, args.max_error_rate)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        raise SystemExit(1 if failures else 0)
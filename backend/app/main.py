@@ -1,19 +1,77 @@
 """FastAPI application for CaseStudy AI."""
+import asyncio
+import hashlib
+import json
 import logging
+import math
 import os
 import sys
-import tempfile
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
 from pathlib import Path
+from typing import Any
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.background import BackgroundTask
 
-from .citations import extract_citations
-from .gemini_client import DEFAULT_STORE_NAME, GeminiClient
-from .models import HealthResponse, QueryRequest, QueryResponse, UploadResponse
+from .admission import (
+    DEFAULT_BURST,
+    DEFAULT_RATE_PER_MINUTE,
+    AdmissionGate,
+    RateLimiter,
+    Rejected,
+    gate_from_env,
+)
+from .cache import (
+    CacheKey,
+    QueryCache,
+    bump_store_version,
+    normalize_question,
+    read_store_version,
+)
+from .citations import build_citations
+from .connections import close_shared_clients
+from .content_index import DEFAULT_INDEX_FILENAME, ContentIndex
+from .extraction import DocumentExtractor, extraction_enabled
+from .gemini_client import DEFAULT_STORE_NAME, GeminiClient, StoreSelection
+from .health import DEFAULT_REFRESH_SECONDS, DEFAULT_REFRESH_TIMEOUT_SECONDS, StoreSnapshot
+from .jobs import DEFAULT_UPLOAD_WORKERS, UploadJobQueue, UploadJobStore
+from .metrics import QUERIES_IN_FLIGHT, error_type, timer
+from .models import (
+    BatchQueryItem,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    CacheStatsResponse,
+    Citation,
+    HealthResponse,
+    LivenessResponse,
+    QueryRequest,
+    QueryResponse,
+    ReadinessResponse,
+    RelatedFile,
+    RelatedResponse,
+    SearchHitResponse,
+    SearchResponse,
+    StoresResponse,
+    TokenUsage,
+    UploadProgressResponse,
+    UploadResponse,
+)
 from .prompts import SALES_SYSTEM_PROMPT
+from .resilience import CircuitOpenError, DeadlineExceeded
+from .retrieval import TEXT_EXTENSIONS, LocalIndex
+from .shared_state import create_shared_state
+from .singleflight import SingleFlight
+from .stores import configured_stores
+from .uploads import InvalidUpload, receive_upload
 
 # Load environment variables
 load_dotenv()
@@ -48,22 +106,150 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Initialize Gemini client
+# Upload limits
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md"}
+MAX_FILE_SIZE_MB = 100
+MB_TO_BYTES = 1024 * 1024
+MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * MB_TO_BYTES
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Admission control: per-client token bucket, then a bounded queue per endpoint
+rate_limiter = RateLimiter(
+    rate_per_minute=float(os.getenv("RATE_LIMIT_PER_MINUTE", str(DEFAULT_RATE_PER_MINUTE))),
+    burst=int(os.getenv("RATE_LIMIT_BURST", str(DEFAULT_BURST))),
+)
+query_gate = gate_from_env("query", default_concurrency=16, default_queue=64)
+BATCH_RATE_LIMIT_ENDPOINT = "batch"
+upload_gate = gate_from_env("upload", default_concurrency=4, default_queue=16)
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+UPSTREAM_RETRY_AFTER_SECONDS = 5
+
+# Coalesces identical in-flight queries into one upstream call
+query_flight: SingleFlight[QueryResponse] = SingleFlight()
+
+# Batch query limits
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "50"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# File Search stores served by this process (selected per request by "store",
+# or several at once by "stores")
+DEFAULT_STORE = os.getenv("FILE_SEARCH_STORE_NAME", DEFAULT_STORE_NAME)
+CONFIGURED_STORES = configured_stores(DEFAULT_STORE)
+ALL_STORES = "*"
+
+# Local copy of uploaded case studies (mounted in docker-compose)
+CASE_STUDIES_DIR = Path(os.getenv("CASE_STUDIES_DIR", "/app/case-studies"))
+
+# Local state (upload job database, content index shared with ingestion)
+DATA_DIR = Path(os.getenv("DATA_DIR", "/app/data"))
+
+# State shared by the worker processes (STATE_BACKEND; None = per process)
+shared_state = create_shared_state(DATA_DIR)
+# Start-up work one worker does on behalf of all workers of a launch
+# (app.serve sets SERVER_INSTANCE_ID for its workers)
+SERVER_INSTANCE_ID = os.getenv("SERVER_INSTANCE_ID") or uuid.uuid4().hex
+STARTUP_LEASE_SECONDS = 3600.0
+
+# Local hybrid index over the case-studies folder (search, previews, degraded mode).
+# Each worker process has its own; local_index_version is the store version it
+# was last synced at.
+local_index = LocalIndex()
+local_index_version: str | None = None
+_local_index_sync_lock = threading.Lock()
+LOCAL_SEARCH_MAX_K = 50
+DEGRADED_ANSWER_HITS = 3
+
+# Answer cache in front of GeminiClient.query
+_similarity_threshold = os.getenv("QUERY_CACHE_SIMILARITY_THRESHOLD")
+query_cache = QueryCache(
+    max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600")),
+    similarity_threshold=float(_similarity_threshold) if _similarity_threshold else None,
+    shared=shared_state,
+)
+
+# Gemini client and the services built on it. They are created by a start-up
+# task off the event loop (importing the SDK alone takes seconds), so /livez
+# and / answer as soon as the process starts.
 gemini_client: GeminiClient | None = None
-try:
-    gemini_client = GeminiClient()
+upload_jobs: UploadJobQueue | None = None
+store_snapshot: StoreSnapshot | None = None
+# "starting" until the client is built, then "ready" or why it is unavailable
+gemini_status = "starting"
+GEMINI_STARTING_RETRY_AFTER_SECONDS = 1
+
+
+def _on_upload_complete(job_id: str) -> None:
+    """Invalidate cached answers once a document lands in the store."""
+    job = upload_jobs.store.get(job_id) if upload_jobs is not None else None
+    bump_store_version(DATA_DIR, job["store_display_name"] if job is not None else DEFAULT_STORE)
+    query_cache.invalidate()
+    if store_snapshot is not None:
+        store_snapshot.request_refresh()
+
+
+def _on_upload_failed(path: Path) -> None:
+    """Drop a file whose upload failed (and was deleted) from the local index."""
+    local_index.remove(path.name)
+
+
+def _init_gemini() -> None:
+    """Build the Gemini client, upload jobs and store snapshot (blocking)."""
+    global gemini_client, upload_jobs, store_snapshot, gemini_status
+    try:
+        client = GeminiClient(shared_state=shared_state)
+    except ValueError as e:
+        logger.warning(f"Gemini client initialization failed: {e}")
+        logger.warning("Some endpoints may not work without GEMINI_API_KEY")
+        gemini_status = "Gemini API key not configured"
+        return
+    except Exception as e:
+        logger.error(f"Unexpected error initializing Gemini client: {e}")
+        logger.warning("Continuing without Gemini client - health check will fail")
+        gemini_status = f"Gemini client initialization failed: {e}"
+        return
+
+    # Background upload jobs (persisted in SQLite)
+    upload_jobs = UploadJobQueue(
+        UploadJobStore(DATA_DIR / "upload_jobs.sqlite3"),
+        client,
+        workers=int(os.getenv("UPLOAD_WORKERS", str(DEFAULT_UPLOAD_WORKERS))),
+        on_complete=_on_upload_complete,
+        content_index=ContentIndex(DATA_DIR / DEFAULT_INDEX_FILENAME),
+        # PDF/DOCX converted to markdown locally before upload (LOCAL_EXTRACTION)
+        extractor=DocumentExtractor(DATA_DIR / "extracted") if extraction_enabled() else None,
+        on_failure=_on_upload_failed,
+    )
+    # Store stats for /health and /readyz, refreshed in the background
+    store_snapshot = StoreSnapshot(
+        lambda: client.get_store_info_async(DEFAULT_STORE),
+        refresh_seconds=float(
+            os.getenv("HEALTH_REFRESH_SECONDS", str(DEFAULT_REFRESH_SECONDS))
+        ),
+        timeout_seconds=float(
+            os.getenv("HEALTH_REFRESH_TIMEOUT_SECONDS", str(DEFAULT_REFRESH_TIMEOUT_SECONDS))
+        ),
+        shared=shared_state,
+    )
+    gemini_client = client
+    gemini_status = "ready"
     logger.info("Gemini client initialized successfully")
-except ValueError as e:
-    logger.warning(f"Gemini client initialization failed: {e}")
-    logger.warning("Some endpoints may not work without GEMINI_API_KEY")
-except Exception as e:
-    logger.error(f"Unexpected error initializing Gemini client: {e}")
-    logger.warning("Continuing without Gemini client - health check will fail")
+
+
+def _gemini_unavailable() -> HTTPException:
+    """503 for a request that needs Gemini before (or without) a client."""
+    if gemini_status == "starting":
+        return HTTPException(
+            status_code=503,
+            detail="Service starting, please retry shortly",
+            headers={"Retry-After": str(GEMINI_STARTING_RETRY_AFTER_SECONDS)},
+        )
+    return HTTPException(status_code=503, detail=f"Service unavailable: {gemini_status}")
 
 
 # Global exception handler
 @app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception):
+async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handle all unhandled exceptions."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
     return JSONResponse(
@@ -72,83 +258,407 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Health check endpoint with store information."""
-    if gemini_client is None:
-        return HealthResponse(
-            status="degraded",
-            store_name=None,
-            file_count=None,
-        )
+@app.exception_handler(Rejected)
+async def rejected_handler(request: Request, exc: Rejected) -> JSONResponse:
+    """Turn an admission rejection into a fast 429/503 with Retry-After."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
-    try:
-        store_display_name = os.getenv("FILE_SEARCH_STORE_NAME", DEFAULT_STORE_NAME)
-        store_info = gemini_client.get_store_info(store_display_name)
 
-        logger.info(
-            f"Health check: store={store_info.get('store_name')}, "
-            f"files={store_info.get('file_count')}"
+def _client_id(request: Request) -> str:
+    """
+    Identity a request is rate limited under.
+
+    An API key (X-API-Key or Authorization header, hashed) if sent, else the
+    client IP; X-Forwarded-For is only trusted with TRUST_FORWARDED_FOR.
+    """
+    api_key = request.headers.get("x-api-key") or request.headers.get("authorization")
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if TRUST_FORWARDED_FOR and forwarded_for:
+        return "ip:" + forwarded_for.split(",")[0].strip()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+def _admit(gate: AdmissionGate) -> Callable[..., AsyncIterator[None]]:
+    """
+    Dependency that rate limits a request and holds a gate slot while it runs.
+
+    Runs before the endpoint reads the request body, so a rejected request
+    costs no more than its headers.
+    """
+
+    async def dependency(request: Request) -> AsyncIterator[None]:
+        rate_limiter.check(_client_id(request), gate.endpoint)
+        async with gate.slot():
+            yield
+
+    return dependency
+
+
+def _upstream_busy(exc: Exception) -> HTTPException | None:
+    """
+    Map Gemini being unavailable to a retryable status.
+
+    503 with Retry-After for quota errors (429) and an open circuit breaker,
+    504 for a missed deadline; None for other errors.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail="Gemini is unavailable, please retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
         )
+    if isinstance(exc, DeadlineExceeded):
+        return HTTPException(status_code=504, detail=str(exc))
+    if error_type(exc) != "429":
+        return None
+    return HTTPException(
+        status_code=503,
+        detail="Gemini quota exceeded, please retry shortly",
+        headers={"Retry-After": str(UPSTREAM_RETRY_AFTER_SECONDS)},
+    )
 
-        return HealthResponse(
-            status="healthy",
-            store_name=store_info.get("store_name"),
-            file_count=store_info.get("file_count"),
+
+@app.get("/livez", response_model=LivenessResponse)
+async def liveness() -> LivenessResponse:
+    """Liveness probe; makes no external calls."""
+    return LivenessResponse(status="ok")
+
+
+@app.get("/readyz", response_model=ReadinessResponse)
+async def readiness() -> ReadinessResponse | JSONResponse:
+    """
+    Readiness probe with store stats from the background-refreshed snapshot.
+
+    Returns 503 until the first snapshot is available; afterwards the last
+    good snapshot is served even if a refresh fails (flagged as stale).
+    """
+    if store_snapshot is None:
+        if gemini_status == "starting":
+            content = ReadinessResponse(status="starting")
+        else:
+            content = ReadinessResponse(status="unavailable", error=gemini_status)
+        return JSONResponse(status_code=503, content=content.model_dump())
+
+    info = store_snapshot.info
+    if info is None:
+        return JSONResponse(
+            status_code=503,
+            content=ReadinessResponse(status="starting", error=store_snapshot.error).model_dump(),
         )
-    except Exception as e:
-        logger.error(f"Health check failed: {e}", exc_info=True)
+
+    age = store_snapshot.age_seconds
+    return ReadinessResponse(
+        status="ready",
+        store_name=info.get("store_name"),
+        file_count=info.get("file_count"),
+        age_seconds=round(age, 1) if age is not None else None,
+        stale=store_snapshot.is_stale,
+        error=store_snapshot.error,
+    )
+
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check() -> HealthResponse:
+    """Health check endpoint with store information (served from the snapshot)."""
+    if store_snapshot is None:
         return HealthResponse(
-            status=f"error: {str(e)}",
+            status="starting" if gemini_status == "starting" else "degraded",
             store_name=None,
             file_count=None,
         )
 
+    info = store_snapshot.info
+    if info is None:
+        status = f"error: {store_snapshot.error}" if store_snapshot.error else "starting"
+        return HealthResponse(status=status, store_name=None, file_count=None)
 
-@app.post("/api/query", response_model=QueryResponse)
-async def query_case_studies(req: QueryRequest):
-    """
-    Query case studies using natural language.
+    return HealthResponse(
+        status="healthy",
+        store_name=info.get("store_name"),
+        file_count=info.get("file_count"),
+    )
 
-    Args:
-        req: Query request with question
 
-    Returns:
-        Query response with answer and citations
-    """
-    if gemini_client is None:
+def _resolve_store(store: str | None) -> str:
+    """Map a request's store id to a configured store (400 if unknown)."""
+    if not store:
+        return DEFAULT_STORE
+    if store not in CONFIGURED_STORES:
         raise HTTPException(
-            status_code=503,
-            detail="Service unavailable: Gemini API key not configured",
+            status_code=400,
+            detail=f"Unknown store: {store}. Available: {', '.join(CONFIGURED_STORES)}",
         )
+    return store
 
-    # Validate question
-    if not req.question or not req.question.strip():
+
+def _resolve_stores(store: str | None, stores: list[str] | None) -> StoreSelection:
+    """
+    Map a query's store selection to configured stores (400 if invalid).
+
+    Returns:
+        A single store display name, or a list of them for a federated query
+    """
+    if stores is None:
+        return _resolve_store(store)
+    if store:
+        raise HTTPException(status_code=400, detail="Pass either store or stores, not both")
+    if not stores:
+        raise HTTPException(status_code=400, detail="stores cannot be empty")
+
+    if ALL_STORES in stores:
+        selected = list(CONFIGURED_STORES)
+    else:
+        selected = list(dict.fromkeys(_resolve_store(name) for name in stores))
+    return selected[0] if len(selected) == 1 else selected
+
+
+def _generation_key(max_output_tokens: int | None, temperature: float | None) -> str:
+    """Cache key component for per-request generation settings ("" for defaults)."""
+    if max_output_tokens is None and temperature is None:
+        return ""
+    return f"max_output_tokens={max_output_tokens} temperature={temperature}"
+
+
+def _token_usage(usage_metadata: Any) -> TokenUsage | None:
+    """Convert Gemini usage_metadata to the API model."""
+    if usage_metadata is None:
+        return None
+    return TokenUsage(
+        prompt_tokens=getattr(usage_metadata, "prompt_token_count", None) or 0,
+        cached_tokens=getattr(usage_metadata, "cached_content_token_count", None) or 0,
+        output_tokens=getattr(usage_metadata, "candidates_token_count", None) or 0,
+        thoughts_tokens=getattr(usage_metadata, "thoughts_token_count", None) or 0,
+        total_tokens=getattr(usage_metadata, "total_token_count", None) or 0,
+    )
+
+
+def _store_key(store_display_name: StoreSelection) -> str:
+    """Cache key component for a store selection (order-independent)."""
+    if isinstance(store_display_name, str):
+        return store_display_name
+    return "+".join(sorted(store_display_name))
+
+
+def _validate_question(question: str) -> None:
+    """Reject empty or overly long questions with a 400."""
+    if not question or not question.strip():
         logger.warning("Empty question received")
         raise HTTPException(status_code=400, detail="Question cannot be empty")
 
-    if len(req.question) > 1000:
-        logger.warning(f"Question too long: {len(req.question)} characters")
+    if len(question) > 1000:
+        logger.warning(f"Question too long: {len(question)} characters")
         raise HTTPException(
             status_code=400, detail="Question is too long (max 1000 characters)"
         )
 
+
+async def _lookup_cache(
+    client: GeminiClient, cache_key: CacheKey, store_version: str
+) -> tuple[QueryResponse | None, list[float] | None]:
+    """
+    Look up a query in the answer cache (exact, then semantic if enabled).
+
+    Returns:
+        Tuple of (cached_response, question_embedding); the embedding is reused
+        when the fresh answer is stored
+    """
+    cached = await query_cache.get_async(cache_key, store_version)
+    if cached is not None:
+        logger.info("Query served from cache")
+        return cached, None
+
+    embedding = None
+    if query_cache.semantic_enabled:
+        try:
+            embedding = await client.embed_async(cache_key[0])
+            cached = query_cache.get_similar(cache_key, embedding, store_version)
+        except RuntimeError as e:
+            logger.warning(f"Semantic cache lookup skipped: {e}")
+        if cached is not None:
+            logger.info("Query served from semantic cache")
+    return cached, embedding
+
+
+def _sync_local_index(wait: bool = False) -> int:
+    """
+    Re-sync the local index with the case-studies folder if the store version moved.
+
+    Uploads and ingestion.py bump the version of the store they change (under
+    DATA_DIR), so a file added through another worker process is indexed by
+    this one on its next local lookup. Blocking; call it off the event loop.
+
+    Args:
+        wait: Wait for a sync already running instead of using the index as it is
+
+    Returns:
+        Number of files (re)indexed
+    """
+    global local_index_version
+    version = read_store_version(DATA_DIR, CONFIGURED_STORES)
+    if version == local_index_version:
+        return 0
+    if not _local_index_sync_lock.acquire(blocking=wait):
+        return 0
     try:
-        logger.info(f"Processing query: {req.question[:50]}...")
-        store_display_name = os.getenv("FILE_SEARCH_STORE_NAME", DEFAULT_STORE_NAME)
+        if version == local_index_version:
+            return 0
+        indexed = local_index.sync_folder(CASE_STUDIES_DIR)
+        local_index_version = version
+        return indexed
+    finally:
+        _local_index_sync_lock.release()
+
+
+def _attach_previews(question: str, citations: list[Citation]) -> list[Citation]:
+    """Fill citation snippets with the best local chunk of each cited file."""
+    _sync_local_index()
+    previews: dict[str, str | None] = {}
+    for citation in citations:
+        if citation.file not in previews:
+            hits = local_index.search(question, k=1, file=citation.file)
+            previews[citation.file] = hits[0].snippet if hits else None
+    return [
+        citation.model_copy(update={"snippet": previews[citation.file]})
+        if citation.snippet is None
+        else citation
+        for citation in citations
+    ]
+
+
+def _local_answer(question: str) -> QueryResponse | None:
+    """
+    Answer from the local index when Gemini is unreachable.
+
+    Returns:
+        Degraded response quoting the best local matches, or None if nothing matches
+    """
+    _sync_local_index()
+    hits = local_index.search(question, k=DEGRADED_ANSWER_HITS)
+    if not hits:
+        return None
+    excerpts = "\n\n".join(f"**{hit.file}**: {hit.snippet}…" for hit in hits)
+    return QueryResponse(
+        answer=(
+            "Gemini is currently unreachable, so this is not a generated answer. "
+            f"The most relevant case study excerpts are:\n\n{excerpts}"
+        ),
+        citations=[
+            Citation(file=hit.file, chunk_id=hit.chunk_id, snippet=hit.snippet)
+            for hit in hits
+        ],
+        degraded=True,
+    )
 
+
+async def _answer_question(
+    client: GeminiClient,
+    question: str,
+    store_display_name: StoreSelection = DEFAULT_STORE,
+    max_output_tokens: int | None = None,
+    temperature: float | None = None,
+) -> QueryResponse:
+    """
+    Answer a question from the cache or with a File Search query.
+
+    Args:
+        client: Gemini client
+        question: Validated question
+        store_display_name: Display name of the File Search store, or a list of
+            display names for a federated query
+        max_output_tokens: Output token limit (None for the client default)
+        temperature: Sampling temperature (None for the client default)
+
+    Returns:
+        Query response with answer and citations
+    """
+
+    # Serve from cache when possible
+    store_version = read_store_version(DATA_DIR, store_display_name)
+    cache_key = QueryCache.make_key(
+        question,
+        SALES_SYSTEM_PROMPT,
+        _store_key(store_display_name),
+        _generation_key(max_output_tokens, temperature),
+    )
+    cached, embedding = await _lookup_cache(client, cache_key, store_version)
+    if cached is not None:
+        return cached
+
+    async def fetch() -> QueryResponse:
         # Query Gemini with File Search
-        answer_text, grounding_metadata = gemini_client.query(
-            question=req.question,
+        answer_text, grounding_metadata, usage_metadata = await client.query_async(
+            question=question,
             system_prompt=SALES_SYSTEM_PROMPT,
             store_display_name=store_display_name,
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
         )
 
-        # Extract citations
-        citations = extract_citations(grounding_metadata)
+        # Extract citations (grouped by file) and the answer spans they support
+        citations, spans = build_citations(grounding_metadata, answer_text or "")
+        citations = await run_in_threadpool(_attach_previews, question, citations)
 
         logger.info(f"Query successful: {len(citations)} citations found")
-        return QueryResponse(answer=answer_text, citations=citations)
+        response = QueryResponse(
+            answer=answer_text,
+            citations=citations,
+            spans=spans,
+            usage=_token_usage(usage_metadata),
+        )
+        await query_cache.put_async(cache_key, response, store_version, embedding)
+        return response
+
+    # Identical questions already in flight share the same upstream call
+    try:
+        with QUERIES_IN_FLIGHT.track_inprogress():
+            return await query_flight.do(cache_key, fetch)
+    except RuntimeError as e:
+        degraded = await run_in_threadpool(_local_answer, question)
+        if degraded is None:
+            raise
+        logger.warning(f"Query failed, answering from local index: {e}")
+        return degraded
+
+
+def _sse_event(event: str, data: dict[str, Any]) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post(
+    "/api/query", response_model=QueryResponse, dependencies=[Depends(_admit(query_gate))]
+)
+async def query_case_studies(req: QueryRequest) -> QueryResponse:
+    """
+    Query case studies using natural language.
+
+    Args:
+        req: Query request with question
+
+    Returns:
+        Query response with answer and citations
+    """
+    if gemini_client is None:
+        raise _gemini_unavailable()
+
+    _validate_question(req.question)
+    store_display_name = _resolve_stores(req.store, req.stores)
+
+    try:
+        logger.info(f"Processing query: {req.question[:50]}...")
+        return await _answer_question(
+            gemini_client,
+            req.question,
+            store_display_name,
+            req.max_output_tokens,
+            req.temperature,
+        )
 
     except ValueError as e:
         logger.error(f"Configuration error: {e}", exc_info=True)
@@ -157,7 +667,9 @@ async def query_case_studies(req: QueryRequest):
         ) from e
     except RuntimeError as e:
         logger.error(f"Query failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}") from e
+        raise _upstream_busy(e) or HTTPException(
+            status_code=500, detail=f"Query failed: {str(e)}"
+        ) from e
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
         raise HTTPException(
@@ -165,100 +677,413 @@ async def query_case_studies(req: QueryRequest):
         ) from e
 
 
-@app.post("/api/upload", response_model=UploadResponse)
-async def upload_file(file: UploadFile = File(...)):
+@app.post("/api/query/batch", response_model=BatchQueryResponse)
+async def query_case_studies_batch(
+    req: BatchQueryRequest, request: Request
+) -> BatchQueryResponse:
     """
-    Upload a case study document to the knowledge base.
+    Answer several questions concurrently (e.g. one per RFP section).
+
+    Identical questions (after normalization) share a single model call.
+    Results are returned in request order; a failing question gets an error
+    entry instead of failing the whole batch.
+
+    The batch is charged to the rate limit before any work starts, then each
+    unique question holds its own query-gate slot while it runs, so a batch
+    counts against the gate as the upstream calls it makes.
 
     Args:
-        file: The file to upload (PDF, DOCX, TXT, MD)
+        req: Batch request with questions
+        request: Incoming request (rate limited per question)
 
     Returns:
-        Upload response with success status and message
+        Batch response with one result per question
     """
     if gemini_client is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Service unavailable: Gemini API key not configured",
-        )
+        raise _gemini_unavailable()
 
-    # Validate file type
-    SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md"}
-    file_ext = Path(file.filename).suffix.lower() if file.filename else ""
-    if file_ext not in SUPPORTED_EXTENSIONS:
+    if not req.questions:
+        raise HTTPException(status_code=400, detail="Questions cannot be empty")
+    if len(req.questions) > BATCH_MAX_QUESTIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file type: {file_ext}. Supported: {', '.join(SUPPORTED_EXTENSIONS)}",
+            detail=f"Too many questions (max {BATCH_MAX_QUESTIONS} per batch)",
+        )
+    # Batches have their own bucket, charged per question (capped at the burst)
+    rate_limiter.check(_client_id(request), BATCH_RATE_LIMIT_ENDPOINT, cost=len(req.questions))
+
+    client = gemini_client
+    store_display_name = _resolve_stores(req.store, req.stores)
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def answer(question: str) -> BatchQueryItem:
+        try:
+            _validate_question(question)
+            async with semaphore, query_gate.slot():
+                response = await _answer_question(
+                    client, question, store_display_name, req.max_output_tokens, req.temperature
+                )
+            return BatchQueryItem(
+                question=question,
+                answer=response.answer,
+                citations=response.citations,
+                spans=response.spans,
+                usage=response.usage,
+                degraded=response.degraded,
+            )
+        except HTTPException as e:
+            return BatchQueryItem(question=question, error=str(e.detail))
+        except Rejected as e:
+            return BatchQueryItem(question=question, error=e.detail)
+        except Exception as e:
+            logger.error(f"Batch item failed: {e}", exc_info=True)
+            return BatchQueryItem(question=question, error=f"Query failed: {str(e)}")
+
+    # Collapse duplicates: one task per normalized question
+    unique: dict[str, str] = {}
+    for question in req.questions:
+        unique.setdefault(normalize_question(question), question)
+    logger.info(f"Processing batch: {len(req.questions)} questions, {len(unique)} unique")
+
+    answers = await asyncio.gather(*(answer(question) for question in unique.values()))
+    by_key = dict(zip(unique, answers, strict=True))
+
+    return BatchQueryResponse(
+        results=[
+            by_key[normalize_question(question)].model_copy(update={"question": question})
+            for question in req.questions
+        ]
+    )
+
+
+@app.post("/api/query/stream")
+async def query_case_studies_stream(req: QueryRequest, request: Request) -> StreamingResponse:
+    """
+    Query case studies and stream the answer as Server-Sent Events.
+
+    Emits "delta" events with text as it is generated, then a single "done"
+    event with the full answer and citations (or an "error" event).
+
+    Args:
+        req: Query request with question
+        request: Incoming request (for rate limiting)
+
+    Returns:
+        text/event-stream response
+    """
+    if gemini_client is None:
+        raise _gemini_unavailable()
+
+    _validate_question(req.question)
+
+    client = gemini_client
+    logger.info(f"Processing streaming query: {req.question[:50]}...")
+    store_display_name = _resolve_stores(req.store, req.stores)
+    store_version = read_store_version(DATA_DIR, store_display_name)
+    cache_key = QueryCache.make_key(
+        req.question,
+        SALES_SYSTEM_PROMPT,
+        _store_key(store_display_name),
+        _generation_key(req.max_output_tokens, req.temperature),
+    )
+
+    async def event_stream() -> AsyncIterator[str]:
+        cached, embedding = await _lookup_cache(client, cache_key, store_version)
+        if cached is not None:
+            yield _sse_event("delta", {"text": cached.answer})
+            yield _sse_event("done", cached.model_dump())
+            return
+
+        parts: list[str] = []
+        grounding_metadata = None
+        usage_metadata = None
+        try:
+            with QUERIES_IN_FLIGHT.track_inprogress():
+                async for text, metadata, usage in client.query_stream_async(
+                    question=req.question,
+                    system_prompt=SALES_SYSTEM_PROMPT,
+                    store_display_name=store_display_name,
+                    max_output_tokens=req.max_output_tokens,
+                    temperature=req.temperature,
+                ):
+                    if metadata is not None:
+                        grounding_metadata = metadata
+                    if usage is not None:
+                        usage_metadata = usage
+                    if text:
+                        parts.append(text)
+                        yield _sse_event("delta", {"text": text})
+        except Exception as e:
+            logger.error(f"Streaming query failed: {e}", exc_info=True)
+            degraded = (
+                await run_in_threadpool(_local_answer, req.question) if not parts else None
+            )
+            if degraded is not None:
+                yield _sse_event("delta", {"text": degraded.answer})
+                yield _sse_event("done", degraded.model_dump())
+            else:
+                yield _sse_event("error", {"detail": f"Query failed: {str(e)}"})
+            return
+
+        answer = "".join(parts)
+        citations, spans = build_citations(grounding_metadata, answer)
+        citations = await run_in_threadpool(_attach_previews, req.question, citations)
+        logger.info(f"Streaming query successful: {len(citations)} citations found")
+        response = QueryResponse(
+            answer=answer,
+            citations=citations,
+            spans=spans,
+            usage=_token_usage(usage_metadata),
         )
+        await query_cache.put_async(cache_key, response, store_version, embedding)
+        yield _sse_event("done", response.model_dump())
+
+    # The slot is held until the stream ends; the background task also runs
+    # when the client disconnects early
+    rate_limiter.check(_client_id(request), query_gate.endpoint)
+    await query_gate.acquire()
+    admitted_at = time.monotonic()
+
+    async def release_slot() -> None:
+        query_gate.release(time.monotonic() - admitted_at)
 
-    # Check file size (100MB limit)
-    MAX_FILE_SIZE_MB = 100
-    MB_TO_BYTES = 1024 * 1024
-    content = await file.read()
-    file_size_mb = len(content) / MB_TO_BYTES
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release_slot),
+    )
+
+
+@app.post(
+    "/api/upload",
+    response_model=UploadResponse,
+    status_code=202,
+    dependencies=[Depends(_admit(upload_gate))],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "store": {"type": "string"},
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_file(request: Request) -> UploadResponse | JSONResponse:
+    """
+    Upload a case study document to the knowledge base.
+
+    The multipart body (fields "file" and optional "store") is parsed as it
+    arrives and the file is written once, next to its final location in the
+    case-studies folder; a background job then uploads it to the store.
+    Poll /api/upload/{job_id} for progress.
+
+    Args:
+        request: Incoming request; its body is streamed, never spooled
+
+    Returns:
+        Upload response with the job id
+    """
+    if upload_jobs is None:
+        raise _gemini_unavailable()
 
-    if file_size_mb > MAX_FILE_SIZE_MB:
+    # Reject obviously oversized requests before reading the body
+    try:
+        content_length = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header") from None
+    if content_length > MAX_FILE_SIZE_BYTES + MULTIPART_OVERHEAD_BYTES:
         raise HTTPException(
             status_code=400,
-            detail=f"File exceeds {MAX_FILE_SIZE_MB}MB limit ({file_size_mb:.1f}MB)",
+            detail=f"File exceeds {MAX_FILE_SIZE_MB}MB limit "
+            f"({content_length / MB_TO_BYTES:.1f}MB)",
         )
 
-    # Save to temporary file and case-studies folder
-    case_studies_dir = Path("/app/case-studies")
-    case_studies_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Save to case-studies folder (local backup)
-    original_filename = file.filename or f"upload{file_ext}"
-    case_study_path = case_studies_dir / original_filename
-    
-    # Handle filename conflicts by adding a number suffix
-    counter = 1
-    while case_study_path.exists():
-        name_part = case_study_path.stem
-        case_study_path = case_studies_dir / f"{name_part}_{counter}{file_ext}"
-        counter += 1
-    
+    # Stream the file to a partial file in the case-studies folder, hashing as we go
+    CASE_STUDIES_DIR.mkdir(parents=True, exist_ok=True)
     try:
-        # Save to case-studies folder
-        case_study_path.write_bytes(content)
-        logger.info(f"Saved file to case-studies folder: {case_study_path.name}")
-        
-        # Also save to temporary file for Gemini upload
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=file_ext, prefix="upload_"
-        ) as tmp_file:
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        with timer("upload_write"):
+            upload = await receive_upload(
+                request, CASE_STUDIES_DIR, MAX_FILE_SIZE_BYTES, SUPPORTED_EXTENSIONS
+            )
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    partial_path = upload.partial_path
+    file_size_mb = upload.size_bytes / MB_TO_BYTES
 
-        try:
-            store_display_name = os.getenv("FILE_SEARCH_STORE_NAME", DEFAULT_STORE_NAME)
-            success, message = gemini_client.upload_file(tmp_path, store_display_name)
+    try:
+        store_display_name = _resolve_store(upload.fields.get("store"))
 
-            if success:
-                logger.info(f"File uploaded successfully: {file.filename}")
-                return UploadResponse(
+        # Skip documents that are already in the store
+        existing = (
+            upload_jobs.content_index.get(upload.sha256, store_display_name)
+            if upload_jobs.content_index is not None
+            else None
+        )
+        if existing is not None:
+            partial_path.unlink(missing_ok=True)
+            existing_name = Path(existing.path).name
+            logger.info(f"Duplicate upload of {existing_name} skipped")
+            return JSONResponse(
+                status_code=200,
+                content=UploadResponse(
                     success=True,
-                    filename=case_study_path.name,
-                    message=message,
+                    filename=existing_name,
+                    message=f"Already in knowledge base: {existing_name}",
                     file_size_mb=round(file_size_mb, 2),
-                )
-            else:
-                logger.error(f"File upload failed: {message}")
-                # Remove the saved file if upload failed
-                case_study_path.unlink(missing_ok=True)
-                raise HTTPException(status_code=500, detail=message)
+                ).model_dump(),
+            )
+
+        # Rename into place in the case-studies folder (local backup; same
+        # folder, so the bytes are not copied); the upload job reads it from
+        # there so it survives a restart
+        file_ext = Path(upload.filename).suffix.lower()
+        original_filename = upload.filename
+        case_study_path = CASE_STUDIES_DIR / original_filename
+
+        # Handle filename conflicts by adding a number suffix
+        counter = 1
+        while case_study_path.exists():
+            name_part = Path(original_filename).stem
+            case_study_path = CASE_STUDIES_DIR / f"{name_part}_{counter}{file_ext}"
+            counter += 1
 
-        finally:
-            # Clean up temporary file
-            Path(tmp_path).unlink(missing_ok=True)
+        partial_path.replace(case_study_path)
+        logger.info(f"Saved file to case-studies folder: {case_study_path.name}")
+        if file_ext in TEXT_EXTENSIONS:
+            # PDF/DOCX text is extracted when the next sync picks them up, so
+            # the upload response does not wait on extraction
+            await run_in_threadpool(local_index.add_file, case_study_path)
+
+        job_id = upload_jobs.submit(
+            case_study_path.name, case_study_path, store_display_name, upload.sha256
+        )
+        logger.info(f"Queued upload job {job_id}: {case_study_path.name}")
+
+        return UploadResponse(
+            success=True,
+            filename=case_study_path.name,
+            message=f"Upload queued: {case_study_path.name}",
+            file_size_mb=round(file_size_mb, 2),
+            job_id=job_id,
+        )
 
     except HTTPException:
+        partial_path.unlink(missing_ok=True)
         raise
     except Exception as e:
         logger.error(f"Upload error: {e}", exc_info=True)
+        partial_path.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}") from e
 
 
+@app.get("/api/upload/{job_id}", response_model=UploadProgressResponse)
+async def upload_status(job_id: str) -> UploadProgressResponse:
+    """
+    Get the status of a background upload job.
+
+    Args:
+        job_id: Job id returned by /api/upload
+
+    Returns:
+        Upload progress for the job
+    """
+    if upload_jobs is None:
+        raise _gemini_unavailable()
+
+    progress = upload_jobs.status(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"Upload job not found: {job_id}")
+    return progress
+
+
+@app.get("/api/search", response_model=SearchResponse)
+async def search_case_studies(
+    q: str = Query(..., min_length=1, max_length=1000),
+    k: int = Query(5, ge=1, le=LOCAL_SEARCH_MAX_K),
+) -> SearchResponse:
+    """
+    Search the local case study index (no Gemini call).
+
+    Args:
+        q: Free-text query
+        k: Number of chunks to return
+
+    Returns:
+        Best matching chunks with snippets
+    """
+    await run_in_threadpool(_sync_local_index)
+    hits = await run_in_threadpool(local_index.search, q, k)
+    return SearchResponse(
+        query=q,
+        hits=[
+            SearchHitResponse(
+                file=hit.file, chunk_id=hit.chunk_id, score=hit.score, snippet=hit.snippet
+            )
+            for hit in hits
+        ],
+    )
+
+
+@app.get("/api/related", response_model=RelatedResponse)
+async def related_case_studies(
+    file: str = Query(..., min_length=1),
+    k: int = Query(5, ge=1, le=LOCAL_SEARCH_MAX_K),
+) -> RelatedResponse:
+    """
+    Find case studies similar to a given one.
+
+    Args:
+        file: Case study file name (as returned in citations)
+        k: Number of related files to return
+
+    Returns:
+        Related files with similarity scores
+    """
+    await run_in_threadpool(_sync_local_index)
+    related = await run_in_threadpool(local_index.related_files, file, k)
+    if not related and not local_index.has_file(file):
+        raise HTTPException(status_code=404, detail=f"Case study not indexed: {file}")
+    return RelatedResponse(
+        file=file,
+        related=[RelatedFile(file=name, similarity=score) for name, score in related],
+    )
+
+
+@app.get("/api/stores", response_model=StoresResponse)
+async def list_stores() -> StoresResponse:
+    """Stores that can be passed as "store" to the query and upload endpoints."""
+    return StoresResponse(default=DEFAULT_STORE, stores=CONFIGURED_STORES)
+
+
+@app.get("/api/cache/stats", response_model=CacheStatsResponse)
+async def cache_stats() -> CacheStatsResponse:
+    """Query cache hit/miss counters and in-flight coalescing counters."""
+    return query_cache.stats().model_copy(
+        update={"upstream_calls": query_flight.calls, "coalesced": query_flight.coalesced}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics (stage latencies, Gemini errors, in-flight work)."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Several workers (app.serve): aggregate every process's metrics
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/")
 async def root() -> dict[str, str | dict[str, str] | bool]:
     """Root endpoint with API information."""
@@ -267,27 +1092,111 @@ async def root() -> dict[str, str | dict[str, str] | bool]:
         "version": "1.0.0",
         "status": "running",
         "gemini_configured": gemini_client is not None,
+        "gemini_status": gemini_status,
         "endpoints": {
             "health": "/health",
+            "livez": "/livez",
+            "readyz": "/readyz",
             "query": "/api/query",
+            "query_stream": "/api/query/stream",
+            "query_batch": "/api/query/batch",
             "upload": "/api/upload",
+            "upload_status": "/api/upload/{job_id}",
+            "search": "/api/search",
+            "related": "/api/related",
+            "stores": "/api/stores",
+            "cache_stats": "/api/cache/stats",
+            "metrics": "/metrics",
             "docs": "/docs",
         },
     }
 
 
 @app.on_event("startup")
-async def startup_event():
+async def startup_event() -> None:
     """Log startup information."""
     logger.info("CaseStudy AI API starting up...")
-    logger.info(f"Gemini client configured: {gemini_client is not None}")
+    app.state.gemini_init_task = asyncio.create_task(_start_gemini())
+    app.state.local_index_task = asyncio.create_task(_build_local_index())
     logger.info("API is ready to accept requests")
 
 
+async def _start_gemini() -> None:
+    """Build the Gemini client off the event loop, then start its background work."""
+    started = time.perf_counter()
+    await run_in_threadpool(_init_gemini)
+    logger.info(
+        f"Gemini client configured: {gemini_client is not None} "
+        f"({time.perf_counter() - started:.2f}s)"
+    )
+    if gemini_client is not None:
+        app.state.store_warmup_task = asyncio.create_task(_warm_stores(gemini_client))
+    if store_snapshot is not None:
+        store_snapshot.start()
+    if upload_jobs is not None and _startup_lease("upload-resume"):
+        resumed = upload_jobs.resume_pending()
+        if resumed:
+            logger.info(f"Resumed {resumed} pending upload jobs")
+
+
+def _startup_lease(task: str) -> bool:
+    """
+    Whether this worker should run a start-up task that must happen once.
+
+    Without shared state there is a single worker, which always runs it.
+    """
+    if shared_state is None:
+        return True
+    try:
+        return shared_state.add(
+            f"lease:{SERVER_INSTANCE_ID}:{task}", str(os.getpid()), STARTUP_LEASE_SECONDS
+        )
+    except Exception as e:
+        logger.warning(f"Shared state unavailable, running {task} anyway: {e}")
+        return True
+
+
+async def _warm_stores(client: GeminiClient) -> None:
+    """Resolve every configured store once, so first requests skip the lookup."""
+    if not await run_in_threadpool(_startup_lease, "store-warmup"):
+        logger.info("Store warm-up left to another worker")
+        return
+    try:
+        resolved = await client.warm_stores_async(CONFIGURED_STORES)
+        logger.info(f"Stores ready: {', '.join(resolved) or 'none'}")
+    except Exception as e:
+        logger.error(f"Store warm-up failed: {e}", exc_info=True)
+
+
+async def _build_local_index() -> None:
+    """Index the case-studies folder in the background."""
+    try:
+        await run_in_threadpool(_sync_local_index, True)
+        logger.info(
+            f"Local index ready: {local_index.file_count} files, "
+            f"{local_index.chunk_count} chunks"
+        )
+    except Exception as e:
+        logger.error(f"Local index build failed: {e}", exc_info=True)
+
+
 @app.on_event("shutdown")
-async def shutdown_event():
-    """Log shutdown information."""
+async def shutdown_event() -> None:
+    """Log shutdown information and release client resources."""
     logger.info("CaseStudy AI API shutting down...")
+    init_task = getattr(app.state, "gemini_init_task", None)
+    if init_task is not None:
+        # Let a client still being built finish, so it is closed below
+        await init_task
+    if store_snapshot is not None:
+        await store_snapshot.stop()
+    if upload_jobs is not None:
+        upload_jobs.close()
+    if gemini_client is not None:
+        gemini_client.close()
+    close_shared_clients()
+    if shared_state is not None:
+        shared_state.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+"""Prometheus metrics and timing helpers for the hot paths."""
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Constants
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TIMING_LOG_LEVEL = logging.getLevelName(os.getenv("TIMING_LOG_LEVEL", "INFO").upper())
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+STAGE_SECONDS = Histogram(
+    "casestudy_stage_seconds",
+    "Time spent in each hot-path stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+GEMINI_ERRORS = Counter(
+    "casestudy_gemini_errors_total",
+    "Failed Gemini calls by stage and error type",
+    ["stage", "error_type"],
+)
+OPERATION_POLLS = Counter(
+    "casestudy_operation_polls_total",
+    "Status calls made while polling long-running operations",
+    ["stage"],
+)
+QUERIES_IN_FLIGHT = Gauge(
+    "casestudy_queries_in_flight",
+    "Queries currently being answered",
+)
+GEMINI_TOKENS = Counter(
+    "casestudy_gemini_tokens_total",
+    "Tokens reported in Gemini usage metadata, by kind (prompt includes cached)",
+    ["stage", "kind"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "casestudy_admission_in_flight",
+    "Admitted requests currently holding a slot",
+    ["endpoint"],
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "casestudy_admission_queue_depth",
+    "Requests waiting for a slot",
+    ["endpoint"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "casestudy_admission_rejections_total",
+    "Requests turned away by admission control",
+    ["endpoint", "reason"],
+)
+CIRCUIT_STATE = Gauge(
+    "casestudy_circuit_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["name"],
+)
+HEDGED_CALLS = Counter(
+    "casestudy_hedged_calls_total",
+    "Hedged Gemini calls sent, and how many of them beat the original",
+    ["outcome"],
+)
+EXTRACTION_BYTES = Counter(
+    "casestudy_extraction_bytes_total",
+    "Size of PDF/DOCX files extracted locally, before (source) and after (text)",
+    ["kind"],
+)
+UPLOAD_OPERATIONS_PENDING = Gauge(
+    "casestudy_upload_operations_pending",
+    "Store import operations currently being polled",
+)
+
+
+def error_type(exc: BaseException) -> str:
+    """
+    Label for an error: the API status code if any, else the exception class.
+
+    Follows the __cause__ chain, since GeminiClient wraps SDK errors in
+    RuntimeError.
+    """
+    current: BaseException | None = exc
+    while current is not None:
+        code = getattr(current, "code", None)
+        if isinstance(code, int):
+            return str(code)
+        if current.__cause__ is None:
+            return type(current).__name__
+        current = current.__cause__
+    return type(exc).__name__
+
+
+def record_gemini_error(stage: str, exc: BaseException) -> None:
+    """Count a failed Gemini call."""
+    GEMINI_ERRORS.labels(stage=stage, error_type=error_type(exc)).inc()
+
+
+def record_token_usage(stage: str, usage_metadata: Any) -> None:
+    """Count and log the token usage of one Gemini call (no-op without usage)."""
+    if usage_metadata is None:
+        return
+    counts = {
+        "prompt": getattr(usage_metadata, "prompt_token_count", None) or 0,
+        "cached": getattr(usage_metadata, "cached_content_token_count", None) or 0,
+        "output": getattr(usage_metadata, "candidates_token_count", None) or 0,
+        "thoughts": getattr(usage_metadata, "thoughts_token_count", None) or 0,
+    }
+    for kind, count in counts.items():
+        if count:
+            GEMINI_TOKENS.labels(stage=stage, kind=kind).inc(count)
+    total = getattr(usage_metadata, "total_token_count", None) or 0
+    logger.info(
+        f"tokens stage={stage} prompt={counts['prompt']} cached={counts['cached']} "
+        f"output={counts['output']} thoughts={counts['thoughts']} total={total}"
+    )
+
+
+@contextmanager
+def timer(stage: str, gemini: bool = False) -> Iterator[None]:
+    """
+    Time a block into the stage histogram and a key=value log line.
+
+    Args:
+        stage: Stage label
+        gemini: Count exceptions raised in the block as Gemini errors
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception as e:
+        outcome = "error"
+        if gemini:
+            record_gemini_error(stage, e)
+        raise
+    except BaseException:
+        # Cancellation or an abandoned generator, not a failure
+        outcome = "cancelled"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        logger.log(
+            TIMING_LOG_LEVEL,
+            f"timing stage={stage} duration_ms={elapsed * 1000:.1f} outcome={outcome}",
+        )
+
+
+def timed(stage: str, gemini: bool = False) -> Callable[[F], F]:
+    """Decorator form of timer()."""
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timer(stage, gemini):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -1,24 +1,79 @@
 """Pydantic models for API requests and responses."""
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
+# Per-request generation limits
+MAX_OUTPUT_TOKENS_LIMIT = 8192
+
 
 class QueryRequest(BaseModel):
     """Request model for querying case studies."""
     question: str
+    store: Optional[str] = None
+    stores: Optional[List[str]] = None  # Federated query; ["*"] means every store
+    max_output_tokens: Optional[int] = Field(None, ge=1, le=MAX_OUTPUT_TOKENS_LIMIT)
+    temperature: Optional[float] = Field(None, ge=0.0, le=2.0)
 
 
 class Citation(BaseModel):
-    """Citation model for source references."""
+    """Citation model for source references (one per cited file)."""
     file: str
-    chunk_id: Optional[str] = None
+    chunk_id: Optional[str] = None  # First cited chunk
+    chunk_ids: List[str] = []
     page: Optional[int] = None
+    snippet: Optional[str] = None
+    score: Optional[float] = None  # Relevance in [0, 1]
+
+
+class AnswerSpan(BaseModel):
+    """Part of the answer backed by sources (character offsets, end exclusive)."""
+    start: int
+    end: int
+    text: str
+    citations: List[int]  # Indices into the response's citations
+
+
+class TokenUsage(BaseModel):
+    """Tokens used by the model call behind an answer."""
+    prompt_tokens: int = 0  # Includes cached tokens
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    thoughts_tokens: int = 0
+    total_tokens: int = 0
 
 
 class QueryResponse(BaseModel):
     """Response model for query results."""
     answer: str
     citations: List[Citation]
+    spans: List[AnswerSpan] = []
+    usage: Optional[TokenUsage] = None
+    degraded: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    """Request model for answering several questions at once."""
+    questions: List[str]
+    store: Optional[str] = None
+    stores: Optional[List[str]] = None  # Federated query; ["*"] means every store
+    max_output_tokens: Optional[int] = Field(None, ge=1, le=MAX_OUTPUT_TOKENS_LIMIT)
+    temperature: Optional[float] = Field(None, ge=0.0, le=2.0)
+
+
+class BatchQueryItem(BaseModel):
+    """Result for one question of a batch (answer or error)."""
+    question: str
+    answer: Optional[str] = None
+    citations: List[Citation] = []
+    spans: List[AnswerSpan] = []
+    usage: Optional[TokenUsage] = None
+    degraded: bool = False  # Answered from the local index, Gemini unreachable
+    error: Optional[str] = None
+
+
+class BatchQueryResponse(BaseModel):
+    """Response model for batch queries, in request order."""
+    results: List[BatchQueryItem]
 
 
 class HealthResponse(BaseModel):
@@ -34,12 +89,76 @@ class UploadResponse(BaseModel):
     filename: str
     message: str
     file_size_mb: Optional[float] = None
+    job_id: Optional[str] = None
 
 
 class UploadProgressResponse(BaseModel):
     """Upload progress response."""
+    job_id: str
     filename: str
     status: str  # "uploading", "processing", "complete", "error"
     progress: Optional[float] = None
     message: Optional[str] = None
 
+
+
+class CacheStatsResponse(BaseModel):
+    """Query cache statistics."""
+    hits: int
+    semantic_hits: int
+    misses: int
+    size: int
+    max_entries: int
+    ttl_seconds: float
+    semantic_enabled: bool
+    shared_hits: int = 0  # Hits on answers cached by another worker process
+    shared_enabled: bool = False
+    upstream_calls: int = 0  # Gemini queries started after a cache miss
+    coalesced: int = 0  # Requests that joined an identical in-flight query
+
+
+class LivenessResponse(BaseModel):
+    """Liveness probe response."""
+    status: str
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe response with the cached store snapshot."""
+    status: str  # "ready", "starting", "unavailable"
+    store_name: Optional[str] = None
+    file_count: Optional[int] = None
+    age_seconds: Optional[float] = None
+    stale: bool = False
+    error: Optional[str] = None
+
+
+class SearchHitResponse(BaseModel):
+    """A chunk matched by the local retrieval index."""
+    file: str
+    chunk_id: str
+    score: float
+    snippet: str
+
+
+class SearchResponse(BaseModel):
+    """Response model for local search."""
+    query: str
+    hits: List[SearchHitResponse]
+
+
+class RelatedFile(BaseModel):
+    """A case study similar to another one."""
+    file: str
+    similarity: float
+
+
+class RelatedResponse(BaseModel):
+    """Response model for related case studies."""
+    file: str
+    related: List[RelatedFile]
+
+
+class StoresResponse(BaseModel):
+    """Stores served by this API."""
+    default: str
+    stores: List[str]
@@ -0,0 +1,116 @@
+"""Adaptive polling of long-running operations (exponential backoff with jitter)."""
+import asyncio
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass
+from typing import Optional, TypeVar
+
+from .metrics import OPERATION_POLLS
+
+# Constants
+DEFAULT_INITIAL_DELAY_SECONDS = 0.25
+DEFAULT_MAX_DELAY_SECONDS = 10.0
+DEFAULT_MULTIPLIER = 1.5
+DEFAULT_JITTER = 0.2
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("OPERATION_POLL_DEADLINE_SECONDS", "1800"))
+
+T = TypeVar("T")
+
+
+class PollTimeout(TimeoutError):
+    """The operation was still running when the polling deadline passed."""
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """
+    Delay schedule for polling.
+
+    Delays start at initial_delay and grow by multiplier up to max_delay;
+    each is scaled by a random factor in [1 - jitter, 1 + jitter] so many
+    pollers started together spread out. Polling gives up after deadline
+    seconds.
+    """
+
+    initial_delay: float = DEFAULT_INITIAL_DELAY_SECONDS
+    max_delay: float = DEFAULT_MAX_DELAY_SECONDS
+    multiplier: float = DEFAULT_MULTIPLIER
+    jitter: float = DEFAULT_JITTER
+    deadline: float = DEFAULT_DEADLINE_SECONDS
+
+    def delays(self) -> Iterator[float]:
+        """Yield successive jittered delays (endless)."""
+        delay = self.initial_delay
+        while True:
+            yield delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay = min(delay * self.multiplier, self.max_delay)
+
+
+DEFAULT_POLICY = PollPolicy()
+
+
+def _next_delay(delays: Iterator[float], deadline_at: float, stage: str) -> float:
+    remaining = deadline_at - time.monotonic()
+    if remaining <= 0:
+        raise PollTimeout(f"{stage} still running after the polling deadline")
+    return min(next(delays), remaining)
+
+
+def poll_until(
+    fetch: Callable[[], T],
+    is_done: Callable[[T], bool],
+    initial: T,
+    stage: str,
+    policy: Optional[PollPolicy] = None,
+) -> T:
+    """
+    Poll until an operation is done, sleeping between polls.
+
+    Args:
+        fetch: Returns the operation's current state (one API call)
+        is_done: Whether a state is final
+        initial: State returned when the operation was started
+        stage: Label for the poll counter and timeout message
+        policy: Delay schedule (defaults to DEFAULT_POLICY)
+
+    Returns:
+        The final state
+
+    Raises:
+        PollTimeout: If the deadline passes first
+    """
+    policy = policy or DEFAULT_POLICY
+    deadline_at = time.monotonic() + policy.deadline
+    delays = policy.delays()
+    state = initial
+    while not is_done(state):
+        time.sleep(_next_delay(delays, deadline_at, stage))
+        OPERATION_POLLS.labels(stage=stage).inc()
+        state = fetch()
+    return state
+
+
+async def poll_until_async(
+    fetch: Callable[[], Awaitable[T]],
+    is_done: Callable[[T], bool],
+    initial: T,
+    stage: str,
+    policy: Optional[PollPolicy] = None,
+) -> T:
+    """
+    Async variant of poll_until(); waiting holds no thread.
+
+    fetch is a coroutine function, so one event loop can watch many
+    operations at once.
+    """
+    policy = policy or DEFAULT_POLICY
+    deadline_at = time.monotonic() + policy.deadline
+    delays = policy.delays()
+    state = initial
+    while not is_done(state):
+        await asyncio.sleep(_next_delay(delays, deadline_at, stage))
+        OPERATION_POLLS.labels(stage=stage).inc()
+        state = await fetch()
+    return state
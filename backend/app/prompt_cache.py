@@ -0,0 +1,143 @@
+"""Gemini context caching of the static prompt prefix (system instruction + tools)."""
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from .metrics import timer
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CACHE_TTL_SECONDS = 3600
+# Explicit caches below the model's minimum size are rejected by the API
+DEFAULT_MIN_TOKENS = 1024
+CHARS_PER_TOKEN = 4
+# Stop using a cache this long before it expires, and recreate it
+REFRESH_MARGIN_SECONDS = 60.0
+# After a failed create, wait this long before trying again
+RETRY_AFTER_SECONDS = 600.0
+
+PromptCacheKey = tuple[str, str, tuple[str, ...]]
+
+
+def context_cache_enabled() -> bool:
+    """
+    Whether explicit context caching is enabled (GEMINI_CONTEXT_CACHE, default off).
+
+    Off by default: the shipped SALES_SYSTEM_PROMPT is far below the model's
+    minimum cache size, so only Gemini's implicit caching applies to it.
+    """
+    return os.getenv("GEMINI_CONTEXT_CACHE", "false").lower() in ("1", "true", "yes")
+
+
+class PromptCache:
+    """
+    Explicit Gemini context caches for a system prompt and its File Search tool.
+
+    A cached prefix is billed at the reduced cached-token rate and not
+    re-processed on every query. Caches are created lazily per (model,
+    prompt, stores), reused until shortly before they expire and then
+    recreated. Prompts shorter than min_tokens are not cached (the API
+    rejects them); Gemini's implicit caching still applies to them. If
+    creating a cache fails the query goes out uncached, and creation is
+    retried later.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl_seconds: int = DEFAULT_CACHE_TTL_SECONDS,
+        min_tokens: int = DEFAULT_MIN_TOKENS,
+    ):
+        """
+        Initialize an empty prompt cache.
+
+        Args:
+            client: SDK client (needs client.caches)
+            ttl_seconds: Lifetime of each created cache
+            min_tokens: Smallest prompt (estimated tokens) worth caching
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        # Guards the dicts only; creating a cache holds just its key's lock
+        self._lock = threading.Lock()
+        self._key_locks: dict[PromptCacheKey, threading.Lock] = {}
+        self._entries: dict[PromptCacheKey, tuple[str, float]] = {}
+        self._failed_until: dict[PromptCacheKey, float] = {}
+
+    def supported(self, system_prompt: str) -> bool:
+        """Whether a prompt is large enough to cache and the backend can cache it."""
+        if not hasattr(self.client, "caches"):
+            return False
+        return len(system_prompt) // CHARS_PER_TOKEN >= self.min_tokens
+
+    def get(
+        self, model: str, system_prompt: str, tools: list["types.Tool"], store_names: list[str]
+    ) -> Optional[str]:
+        """
+        Name of a live cache for this prefix, creating one if needed.
+
+        Args:
+            model: Model the cache is for
+            system_prompt: System instruction to cache
+            tools: Tools to cache with it (a cached request cannot add tools)
+            store_names: Store resource names the tools search (part of the key)
+
+        Returns:
+            Cached content name, or None if the prefix is not cached
+        """
+        if not self.supported(system_prompt):
+            return None
+        from google.genai import types
+
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+        key = (model, prompt_hash, tuple(store_names))
+        with self._lock:
+            cached_name = self._live_entry(key)
+            if cached_name is not None or self._failed_until.get(key, 0.0) > time.monotonic():
+                return cached_name
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One create per key: concurrent queries for the same prefix wait for it
+        # instead of each creating their own cache, other prefixes are not held up
+        with key_lock:
+            with self._lock:
+                cached_name = self._live_entry(key)
+                if cached_name is not None or self._failed_until.get(key, 0.0) > time.monotonic():
+                    return cached_name
+            try:
+                with timer("context_cache_create", gemini=True):
+                    cached = self.client.caches.create(
+                        model=model,
+                        config=types.CreateCachedContentConfig(
+                            system_instruction=system_prompt,
+                            tools=tools,
+                            ttl=f"{self.ttl_seconds}s",
+                        ),
+                    )
+            except Exception as e:
+                logger.warning(f"Context cache unavailable, sending the prompt uncached: {e}")
+                with self._lock:
+                    self._failed_until[key] = time.monotonic() + RETRY_AFTER_SECONDS
+                    self._entries.pop(key, None)
+                return None
+
+            name: str = cached.name
+            logger.info(f"✓ Created context cache {name} ({self.ttl_seconds}s)")
+            with self._lock:
+                self._entries[key] = (name, time.monotonic() + self.ttl_seconds)
+            return name
+
+    def _live_entry(self, key: PromptCacheKey) -> Optional[str]:
+        """Name of the cache for a key unless it is missing or about to expire (lock held)."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] - REFRESH_MARGIN_SECONDS > time.monotonic():
+            return entry[0]
+        return None
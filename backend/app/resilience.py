@@ -0,0 +1,253 @@
+"""Tail-latency protection for Gemini calls: circuit breaker, latency tracking, hedging."""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Optional, TypeVar
+
+from .metrics import CIRCUIT_STATE, HEDGED_CALLS, error_type
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_SECONDS = 30.0
+DEFAULT_LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+# Each call earns this fraction of a hedge, so hedges stay under ~10% of calls
+HEDGE_TOKENS_PER_CALL = 0.1
+MAX_HEDGE_TOKENS = 10.0
+# Client errors that say nothing about Gemini's health
+HEALTHY_ERROR_CODES = {"400", "401", "403", "404"}
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Gemini calls are failing fast because the circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit open, failing fast for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(RuntimeError):
+    """A Gemini call did not finish within its deadline."""
+
+
+def counts_as_failure(exc: BaseException) -> bool:
+    """Whether an error indicates upstream trouble (timeouts, 429, 5xx, transport)."""
+    return error_type(exc) not in HEALTHY_ERROR_CODES
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (thread-safe).
+
+    After failure_threshold upstream failures in a row the circuit opens and
+    calls fail at once with CircuitOpenError. After reset_seconds one probe
+    call is let through (half-open): success closes the circuit, failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_seconds: float = DEFAULT_RESET_SECONDS,
+    ):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            name: Label for metrics and errors
+            failure_threshold: Consecutive failures that open the circuit (0 disables)
+            reset_seconds: How long the circuit stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        CIRCUIT_STATE.labels(name=name).set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "half_open" or "open"."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning(f"Circuit {self.name}: {self._state} -> {state}")
+        self._state = state
+        CIRCUIT_STATE.labels(name=self.name).set(STATE_VALUES[state])
+
+    def raise_if_open(self) -> None:
+        """
+        Fail fast while the circuit is open, without claiming the probe.
+
+        Lets callers skip queueing for a worker thread when the call would be
+        rejected anyway.
+
+        Raises:
+            CircuitOpenError: If the circuit is open and not yet due for a probe
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+            if self._state != OPEN or remaining <= 0:
+                return
+        raise CircuitOpenError(self.name, max(remaining, 1.0))
+
+    def before_call(self) -> None:
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or a probe is already running)
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+            if self._state == OPEN and remaining <= 0:
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        raise CircuitOpenError(self.name, max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._set_state(CLOSED)
+
+    def record_abandoned(self) -> None:
+        """Release the probe of a call given up by its caller (no verdict)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self, exc: BaseException) -> None:
+        """Count a failed call; opens the circuit at the threshold or on a failed probe."""
+        if self.failure_threshold <= 0 or not counts_as_failure(exc):
+            with self._lock:
+                self._probing = False
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+            self._probing = False
+
+
+class LatencyTracker:
+    """Recent call latencies, for picking a hedging delay."""
+
+    def __init__(self, window: int = DEFAULT_LATENCY_WINDOW):
+        """Keep the last window samples."""
+        self._lock = threading.Lock()
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Add a successful call's latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None until MIN_LATENCY_SAMPLES are in."""
+        with self._lock:
+            if len(self._samples) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(1, round(pct / 100 * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+
+class HedgeBudget:
+    """Caps hedges at a fraction of calls, so a slow upstream is not hit twice as hard."""
+
+    def __init__(self) -> None:
+        """Start with a full budget."""
+        self._lock = threading.Lock()
+        self._tokens = MAX_HEDGE_TOKENS
+
+    def earn(self) -> None:
+        """Credit one primary call."""
+        with self._lock:
+            self._tokens = min(MAX_HEDGE_TOKENS, self._tokens + HEDGE_TOKENS_PER_CALL)
+
+    def spend(self) -> bool:
+        """Take one hedge if the budget allows."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    budget: Optional[HedgeBudget] = None,
+) -> T:
+    """
+    Run call(); if it has not finished after delay seconds, start a second
+    identical call and return whichever succeeds first.
+
+    If one attempt fails the other is still awaited; the error is raised only
+    when both have failed. The losing attempt is cancelled.
+
+    Args:
+        call: Starts one attempt
+        delay: Seconds before hedging (None disables hedging)
+        budget: Limits how often a hedge may be sent
+
+    Returns:
+        The first successful result
+    """
+    if budget is not None:
+        budget.earn()
+    primary = asyncio.ensure_future(call())
+    if delay is None:
+        return await primary
+
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done or (budget is not None and not budget.spend()):
+        return await primary
+
+    HEDGED_CALLS.labels(outcome="sent").inc()
+    hedge = asyncio.ensure_future(call())
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        HEDGED_CALLS.labels(outcome="won").inc()
+                    return task.result()
+                error = task.exception()
+        raise error or RuntimeError("All hedged attempts failed")
+    finally:
+        for task in pending:
+            task.cancel()
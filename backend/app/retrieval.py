@@ -0,0 +1,434 @@
+"""Local hybrid (BM25 + dense vector) retrieval over the case-studies folder."""
+import logging
+import math
+import re
+import threading
+import zlib
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .extraction import EXTRACTABLE_EXTENSIONS, extract_markdown, strip_page_markers
+from .gemini_client import CHUNK_OVERLAP_TOKENS, CHUNK_SIZE_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Constants
+TEXT_EXTENSIONS = {".md", ".txt"}
+INDEXED_EXTENSIONS = TEXT_EXTENSIONS | EXTRACTABLE_EXTENSIONS
+BM25_K1 = 1.5
+BM25_B = 0.75
+VECTOR_DIM = 512
+RRF_K = 60
+CANDIDATES_PER_RANKER = 50
+SNIPPET_CHARS = 240
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens used for both BM25 and hashed vectors."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = CHUNK_SIZE_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> list[str]:
+    """
+    Split text into whitespace-token chunks, mirroring the store's chunking config.
+
+    Args:
+        text: Text to split
+        max_tokens: Tokens per chunk
+        overlap_tokens: Tokens shared between consecutive chunks
+
+    Returns:
+        List of chunk texts
+    """
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, max_tokens - overlap_tokens)
+    return [
+        " ".join(words[start : start + max_tokens])
+        for start in range(0, max(1, len(words) - overlap_tokens), step)
+    ]
+
+
+def embed_tokens(tokens: list[str], dim: int = VECTOR_DIM) -> np.ndarray:
+    """
+    Dense vector for a token list via signed feature hashing.
+
+    Log-scaled term counts are hashed into `dim` buckets and L2-normalized,
+    so dot products are cosine similarities. Needs no model or API calls.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for token, count in Counter(tokens).items():
+        h = zlib.crc32(token.encode("utf-8"))
+        vector[h % dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+@dataclass
+class SearchHit:
+    """A chunk returned by a local search."""
+
+    file: str
+    chunk_id: str
+    score: float
+    snippet: str
+
+
+class LocalIndex:
+    """
+    In-memory hybrid index over local case study files.
+
+    Keeps a BM25 inverted index and a NumPy matrix of hashed chunk vectors.
+    Files can be added or replaced one at a time; removed chunks leave the
+    inverted index at once, and their rows are tombstoned and compacted once
+    they make up a quarter of the index.
+
+    Files are keyed by their path relative to the indexed folder
+    ("emea/retail.md"); lookups by bare file name, as store citations report
+    them, match every file of that name.
+    """
+
+    def __init__(self, dim: int = VECTOR_DIM):
+        """Initialize an empty index."""
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._files: list[str] = []
+        self._chunk_ids: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._texts: list[str] = []
+        self._lengths: list[int] = []
+        self._alive: list[bool] = []
+        self._postings: dict[str, tuple[list[int], list[int]]] = {}
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._size = 0
+        self._dead = 0
+        self._total_length = 0
+        self._by_file: dict[str, list[int]] = {}
+        self._by_name: dict[str, set[str]] = {}
+        self._mtimes: dict[str, int] = {}
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of live chunks."""
+        return self._size - self._dead
+
+    @property
+    def file_count(self) -> int:
+        """Number of indexed files."""
+        return len(self._by_file)
+
+    @property
+    def files(self) -> set[str]:
+        """Keys (relative paths) of indexed files."""
+        with self._lock:
+            return set(self._by_file)
+
+    def has_file(self, file: str) -> bool:
+        """Whether a file is indexed, by key or by bare name."""
+        with self._lock:
+            return bool(self._matching(file))
+
+    def _matching(self, file: str) -> list[str]:
+        """Keys of the files a key or bare file name refers to."""
+        if file in self._by_file:
+            return [file]
+        return sorted(self._by_name.get(file, ()))
+
+    def add_text(self, file: str, text: str) -> int:
+        """
+        Index (or re-index) a document's text.
+
+        Args:
+            file: File name used in hits
+            text: Document text
+
+        Returns:
+            Number of chunks indexed
+        """
+        chunks = chunk_text(text)
+        with self._lock:
+            self._remove_locked(file)
+            self._add_chunks(file, chunks)
+        return len(chunks)
+
+    def add_file(self, path: str | Path, file: Optional[str] = None) -> int:
+        """
+        Index a local file if it has a supported extension.
+
+        PDF and DOCX text is extracted with app.extraction; a file without
+        extractable text (e.g. a scanned PDF) is skipped until it changes.
+
+        Args:
+            path: File to index
+            file: Key used in hits (defaults to the file name)
+
+        Returns:
+            Number of chunks indexed
+        """
+        path = Path(path)
+        file = file or path.name
+        suffix = path.suffix.lower()
+        if suffix not in INDEXED_EXTENSIONS:
+            return 0
+        mtime_ns = path.stat().st_mtime_ns
+        if suffix in TEXT_EXTENSIONS:
+            text = path.read_text(encoding="utf-8", errors="replace")
+        else:
+            try:
+                text = strip_page_markers(extract_markdown(path)[0])
+            except (ValueError, RuntimeError) as e:
+                logger.info(f"Not indexing {file} locally: {e}")
+                text = ""
+        count = self.add_text(file, text)
+        with self._lock:
+            self._mtimes[file] = mtime_ns
+        return count
+
+    def remove(self, file: str) -> None:
+        """Drop a file from the index."""
+        with self._lock:
+            self._remove_locked(file)
+
+    def _remove_locked(self, file: str) -> None:
+        positions = self._by_file.pop(file, None)
+        self._mtimes.pop(file, None)
+        names = self._by_name.get(Path(file).name)
+        if names is not None:
+            names.discard(file)
+            if not names:
+                del self._by_name[Path(file).name]
+        if not positions:
+            return
+        terms: set[str] = set()
+        for pos in positions:
+            self._positions.pop(self._chunk_ids[pos], None)
+            self._alive[pos] = False
+            self._vectors[pos] = 0.0
+            self._total_length -= self._lengths[pos]
+            terms.update(tokenize(self._texts[pos]))
+        self._drop_postings(terms, positions[0], positions[-1])
+        self._dead += len(positions)
+        if self._dead * 4 > self._size:
+            self._compact()
+
+    def _drop_postings(self, terms: set[str], first: int, last: int) -> None:
+        """Remove the chunks first..last (one file's, contiguous) from the inverted index."""
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            ids, counts = posting
+            start, end = bisect_left(ids, first), bisect_left(ids, last + 1)
+            del ids[start:end]
+            del counts[start:end]
+            if not ids:
+                del self._postings[term]
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed > len(self._vectors):
+            capacity = max(needed, 2 * len(self._vectors), 64)
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+
+    def _compact(self) -> None:
+        """Rebuild without tombstoned chunks."""
+        live = [
+            (self._files[pos], self._texts[pos])
+            for pos in range(self._size)
+            if self._alive[pos]
+        ]
+        mtimes = dict(self._mtimes)
+        self._clear()
+        grouped: dict[str, list[str]] = {}
+        for file, text in live:
+            grouped.setdefault(file, []).append(text)
+        for file, texts in grouped.items():
+            self._add_chunks(file, texts)
+        self._mtimes.update(mtimes)
+
+    def _add_chunks(self, file: str, chunks: list[str]) -> None:
+        self._reserve(len(chunks))
+        positions = []
+        for i, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            pos = self._size
+            self._size += 1
+            self._files.append(file)
+            self._chunk_ids.append(f"{file}#{i}")
+            self._positions[f"{file}#{i}"] = pos
+            self._texts.append(chunk)
+            self._lengths.append(len(tokens))
+            self._alive.append(True)
+            self._vectors[pos] = embed_tokens(tokens, self.dim)
+            self._total_length += len(tokens)
+            for term, count in Counter(tokens).items():
+                ids, counts = self._postings.setdefault(term, ([], []))
+                ids.append(pos)
+                counts.append(count)
+            positions.append(pos)
+        self._by_file[file] = positions
+        self._by_name.setdefault(Path(file).name, set()).add(file)
+
+    def sync_folder(self, folder: str | Path) -> int:
+        """
+        Bring the index in line with a folder: add new/changed files, drop removed ones.
+
+        Files are keyed by their path relative to the folder, so same-named
+        files in different subfolders are indexed separately.
+
+        Returns:
+            Number of files (re)indexed
+        """
+        folder = Path(folder)
+        if not folder.exists():
+            return 0
+        files = {
+            f.relative_to(folder).as_posix(): f
+            for f in folder.rglob("*")
+            if f.is_file()
+            and not f.name.startswith(".")
+            and f.suffix.lower() in INDEXED_EXTENSIONS
+        }
+        with self._lock:
+            removed = [name for name in self._by_file if name not in files]
+        for name in removed:
+            self.remove(name)
+
+        updated = 0
+        for name, path in files.items():
+            if self._mtimes.get(name) != path.stat().st_mtime_ns:
+                self.add_file(path, name)
+                updated += 1
+        return updated
+
+    def _bm25_scores(self, query_tokens: list[str]) -> np.ndarray:
+        scores = np.zeros(self._size, dtype=np.float32)
+        live = self.chunk_count
+        if not live:
+            return scores
+        lengths = np.asarray(self._lengths, dtype=np.float32)
+        avg_length = max(self._total_length / live, 1.0)
+        for term in set(query_tokens):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            ids = np.asarray(posting[0], dtype=np.int64)
+            tf = np.asarray(posting[1], dtype=np.float32)
+            df = len(ids)
+            idf = math.log(1.0 + (live - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[ids] / avg_length)
+            np.add.at(scores, ids, idf * tf * (BM25_K1 + 1.0) / (tf + norm))
+        return scores
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest positive scores, best first."""
+        if not len(scores):
+            return np.zeros(0, dtype=np.int64)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top[scores[top] > 0]
+
+    def search(self, query: str, k: int = 5, file: Optional[str] = None) -> list[SearchHit]:
+        """
+        Hybrid top-k search fused with reciprocal rank fusion.
+
+        Args:
+            query: Free-text query
+            k: Number of chunks to return
+            file: Only search chunks of this file (key or bare file name)
+
+        Returns:
+            Best matching chunks, best first
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        query_vector = embed_tokens(tokens, self.dim)
+
+        with self._lock:
+            if file is not None:
+                alive = np.zeros(self._size, dtype=bool)
+                for match in self._matching(file):
+                    alive[self._by_file[match]] = True
+            else:
+                alive = np.asarray(self._alive, dtype=bool)
+            bm25 = self._bm25_scores(tokens)
+            dense = self._vectors[: self._size] @ query_vector
+            bm25[~alive] = 0.0
+            dense[~alive] = 0.0
+
+            fused: dict[int, float] = {}
+            rankings = (
+                self._top(bm25, CANDIDATES_PER_RANKER),
+                self._top(dense, CANDIDATES_PER_RANKER),
+            )
+            for ranking in rankings:
+                for rank, pos in enumerate(ranking.tolist()):
+                    fused[pos] = fused.get(pos, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+            best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [
+                SearchHit(
+                    file=self._files[pos],
+                    chunk_id=self._chunk_ids[pos],
+                    score=round(score, 6),
+                    snippet=self._texts[pos][:SNIPPET_CHARS],
+                )
+                for pos, score in best
+            ]
+
+    def related_files(self, file: str, k: int = 5) -> list[tuple[str, float]]:
+        """
+        Files most similar to a given file (cosine of mean chunk vectors).
+
+        Args:
+            file: Indexed file (key, or bare name: the first file of that name)
+            k: Number of files to return
+
+        Returns:
+            List of (file, similarity), best first; empty if file is unknown
+        """
+        with self._lock:
+            matches = self._matching(file)
+            if not matches:
+                return []
+            file = matches[0]
+            names = list(self._by_file)
+            centroids = np.stack(
+                [self._vectors[self._by_file[name]].mean(axis=0) for name in names]
+            )
+            norms = np.linalg.norm(centroids, axis=1)
+            norms[norms == 0] = 1.0
+            centroids /= norms[:, None]
+            similarities = centroids @ centroids[names.index(file)]
+            order = np.argsort(-similarities)
+            return [
+                (names[i], round(float(similarities[i]), 4))
+                for i in order.tolist()
+                if names[i] != file
+            ][:k]
+
+    def snippet(self, chunk_id: str) -> Optional[str]:
+        """Text preview of an indexed chunk, if known."""
+        with self._lock:
+            pos = self._positions.get(chunk_id)
+            return self._texts[pos][:SNIPPET_CHARS] if pos is not None else None
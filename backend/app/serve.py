@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Run the API with one or more worker processes.
+
+    python -m app.serve                 # WEB_CONCURRENCY workers, default one
+    python -m app.serve --workers 4 --port 8000
+
+Workers share store names, health snapshots and cached answers through
+STATE_BACKEND, which defaults to "sqlite" (DATA_DIR/shared_state.sqlite3)
+when more than one worker runs; use "redis" with STATE_URL to share between
+hosts. Prometheus metrics of all workers are aggregated on /metrics.
+
+One worker is the default, so the configured rate limits and admission
+queues are the ones clients see. Set WEB_CONCURRENCY (or --workers) for
+more: rate limits, admission queues, upload worker pools and the local
+search index stay per worker, so with N workers the effective limits are N
+times the configured ones.
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8000
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY if set, else one worker."""
+    configured = os.getenv("WEB_CONCURRENCY", "").strip()
+    if configured:
+        return max(1, int(configured))
+    return 1
+
+
+def main(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = 1) -> None:
+    """
+    Serve app.main:app until interrupted.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        workers: Worker processes
+    """
+    os.environ.setdefault("SERVER_INSTANCE_ID", uuid.uuid4().hex)
+    metrics_dir = None
+    if workers > 1:
+        os.environ.setdefault("STATE_BACKEND", "sqlite")
+        if os.environ["STATE_BACKEND"] == "local":
+            logger.warning("STATE_BACKEND=local: each worker keeps its own caches")
+        if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            metrics_dir = tempfile.mkdtemp(prefix="casestudy-metrics-")
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    logger.info(f"Starting {workers} worker(s) on {host}:{port}")
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            log_level=os.getenv("LOG_LEVEL", "info"),
+        )
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: WEB_CONCURRENCY, else one)",
+    )
+    args = parser.parse_args()
+
+    main(args.host, args.port, args.workers or default_workers())
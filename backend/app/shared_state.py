@@ -0,0 +1,205 @@
+"""Key-value state shared by the worker processes of one deployment."""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+# Constants
+LOCAL_STATE = "local"
+SQLITE_STATE = "sqlite"
+REDIS_STATE = "redis"
+DEFAULT_STATE_FILENAME = "shared_state.sqlite3"
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+REDIS_KEY_PREFIX = "casestudy:"
+SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+REDIS_DELETE_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class SharedState(Protocol):
+    """
+    String key-value store with per-key expiry.
+
+    SQLiteState shares state between workers on one host; RedisState between
+    hosts. Both behave the same, so SQLite is the local stand-in for Redis.
+    """
+
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None: ...
+
+    def add(self, key: str, value: str, ttl_seconds: float) -> bool: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def delete_prefix(self, prefix: str) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteState:
+    """Shared state in a SQLite file (WAL mode, safe across processes)."""
+
+    def __init__(self, db_path: str | Path):
+        """Open (or create) the state database."""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # A cache: losing the last writes on power loss is fine, an fsync per write is not
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        """Value of a key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM shared_state WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        """Store a value that expires after ttl_seconds."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared_state VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl_seconds),
+            )
+
+    def add(self, key: str, value: str, ttl_seconds: float) -> bool:
+        """Store a value only if the key is missing or expired (atomic); True if stored."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO shared_state VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at WHERE shared_state.expires_at <= ?",
+                (key, value, now + ttl_seconds, now),
+            )
+        return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        """Remove a key."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM shared_state WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove every key starting with prefix (and purge expired keys)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM shared_state WHERE substr(key, 1, ?) = ? OR expires_at <= ?",
+                (len(prefix), prefix, time.time()),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class RedisState:
+    """Shared state in Redis (or any server speaking its protocol)."""
+
+    def __init__(self, url: str = DEFAULT_REDIS_URL, client: Any = None):
+        """
+        Connect to Redis.
+
+        Args:
+            url: Redis URL
+            client: Existing redis.Redis-compatible client (url is then ignored)
+
+        Raises:
+            RuntimeError: If the redis package is not installed
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "STATE_BACKEND=redis needs the redis package (pip install redis)"
+                ) from e
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self._redis = client
+
+    def get(self, key: str) -> Optional[str]:
+        """Value of a key, or None if missing or expired."""
+        value = self._redis.get(REDIS_KEY_PREFIX + key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        """Store a value that expires after ttl_seconds."""
+        self._redis.set(REDIS_KEY_PREFIX + key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    def add(self, key: str, value: str, ttl_seconds: float) -> bool:
+        """Store a value only if the key is missing (SET NX); True if stored."""
+        return bool(
+            self._redis.set(
+                REDIS_KEY_PREFIX + key, value, px=max(1, int(ttl_seconds * 1000)), nx=True
+            )
+        )
+
+    def delete(self, key: str) -> None:
+        """Remove a key."""
+        self._redis.delete(REDIS_KEY_PREFIX + key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove every key starting with prefix."""
+        batch = []
+        for key in self._redis.scan_iter(match=f"{REDIS_KEY_PREFIX}{prefix}*"):
+            batch.append(key)
+            if len(batch) >= REDIS_DELETE_BATCH:
+                self._redis.delete(*batch)
+                batch = []
+        if batch:
+            self._redis.delete(*batch)
+
+    def close(self) -> None:
+        """Close the connection pool."""
+        self._redis.close()
+
+
+def state_backend_name() -> str:
+    """Configured state backend (STATE_BACKEND: "local", "sqlite" or "redis")."""
+    return os.getenv("STATE_BACKEND", LOCAL_STATE).strip().lower()
+
+
+def create_shared_state(data_dir: str | Path) -> Optional[SharedState]:
+    """
+    Create the configured shared state.
+
+    STATE_URL overrides the location: a SQLite file path, or a Redis URL.
+
+    Args:
+        data_dir: Folder for the default SQLite file
+
+    Returns:
+        The shared state, or None for "local" (each process keeps its own)
+
+    Raises:
+        ValueError: If STATE_BACKEND is unknown
+    """
+    name = state_backend_name()
+    url = os.getenv("STATE_URL")
+    if name == LOCAL_STATE:
+        return None
+    if name == SQLITE_STATE:
+        return SQLiteState(url or Path(data_dir) / DEFAULT_STATE_FILENAME)
+    if name == REDIS_STATE:
+        return RedisState(url or DEFAULT_REDIS_URL)
+    raise ValueError(
+        f"Unknown STATE_BACKEND: {name} (use {LOCAL_STATE}, {SQLITE_STATE} or {REDIS_STATE})"
+    )
@@ -0,0 +1,55 @@
+"""Request coalescing for identical in-flight calls."""
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Share one in-flight call among concurrent callers with the same key.
+
+    The first caller starts the call as a task; callers arriving while it runs
+    await the same task and receive its result (or exception). A caller that
+    disconnects does not cancel the shared call for the others.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._inflight: dict[Hashable, asyncio.Task[T]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def inflight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func, or join the call already running for key.
+
+        Args:
+            key: Identity of the call
+            func: Coroutine function performing the call
+
+        Returns:
+            The shared result
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
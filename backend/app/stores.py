@@ -0,0 +1,159 @@
+"""Registry of File Search stores: display name → resource name, with TTL refresh."""
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Optional
+
+from .shared_state import SharedState
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_STORE_TTL_SECONDS = 3600.0
+SHARED_KEY_PREFIX = "store:"
+
+
+def configured_stores(default_store: str) -> list[str]:
+    """
+    Store display names this process serves.
+
+    FILE_SEARCH_STORES is a comma-separated list; the default store
+    (FILE_SEARCH_STORE_NAME) is always included and listed first.
+    """
+    names = [default_store]
+    for name in os.getenv("FILE_SEARCH_STORES", "").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class StoreRegistry:
+    """
+    Thread-safe map from store display name to resource name.
+
+    Entries expire after ttl_seconds and are resolved again on next use; if
+    that fails, the previous resource name keeps being served. Concurrent
+    lookups of the same unknown store resolve it once, so a store is never
+    created twice.
+
+    With shared state, names resolved by one worker process are picked up by
+    the others instead of each listing the stores again.
+    """
+
+    def __init__(
+        self,
+        resolve: Callable[[str], Optional[str]],
+        ttl_seconds: float = DEFAULT_STORE_TTL_SECONDS,
+        shared: Optional[SharedState] = None,
+    ):
+        """
+        Initialize an empty registry.
+
+        Args:
+            resolve: Finds (or creates) a store by display name and returns its
+                resource name, or None if it could not be determined
+            ttl_seconds: How long a resolved name is trusted
+            shared: State shared with other worker processes
+        """
+        self.resolve = resolve
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._name_locks: dict[str, threading.Lock] = {}
+
+    def _fresh(self, display_name: str) -> Optional[str]:
+        entry = self._entries.get(display_name)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def _put_local(self, display_name: str, resource_name: str) -> None:
+        with self._lock:
+            self._entries[display_name] = (resource_name, time.monotonic() + self.ttl_seconds)
+
+    def _shared_get(self, display_name: str) -> Optional[str]:
+        """Name another worker resolved (failures of the shared state are a miss)."""
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.get(SHARED_KEY_PREFIX + display_name)
+        except Exception as e:
+            logger.warning(f"Shared state unavailable, resolving store locally: {e}")
+            return None
+
+    def put(self, display_name: str, resource_name: str) -> None:
+        """Record a resolved store (and share it with other workers)."""
+        self._put_local(display_name, resource_name)
+        if self.shared is not None:
+            try:
+                self.shared.set(SHARED_KEY_PREFIX + display_name, resource_name, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Could not share store {display_name}: {e}")
+
+    def lookup(self, display_name: str) -> Optional[str]:
+        """Resource name if already known here or to another worker; never resolves."""
+        with self._lock:
+            cached = self._fresh(display_name)
+        if cached is not None:
+            return cached
+        shared = self._shared_get(display_name)
+        if shared is not None:
+            self._put_local(display_name, shared)
+        return shared
+
+    def get(self, display_name: str) -> Optional[str]:
+        """
+        Resource name for a store, resolving it if unknown or expired.
+
+        Returns:
+            The resource name, or None if it could not be resolved and was
+            never known
+        """
+        with self._lock:
+            cached = self._fresh(display_name)
+            if cached is not None:
+                return cached
+            name_lock = self._name_locks.setdefault(display_name, threading.Lock())
+
+        with name_lock:
+            # Another thread may have resolved it while we waited
+            with self._lock:
+                cached = self._fresh(display_name)
+                stale = self._entries.get(display_name)
+            if cached is not None:
+                return cached
+            shared = self._shared_get(display_name)
+            if shared is not None:
+                self._put_local(display_name, shared)
+                return shared
+
+            resource_name = self.resolve(display_name)
+            if resource_name is not None:
+                self.put(display_name, resource_name)
+                return resource_name
+            if stale is not None:
+                logger.warning(f"Could not refresh store {display_name}, using cached name")
+                return stale[0]
+            return None
+
+    def invalidate(self, display_name: Optional[str] = None) -> None:
+        """Forget one store (or all of them), here and in the shared state."""
+        with self._lock:
+            if display_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(display_name, None)
+        if self.shared is not None:
+            if display_name is None:
+                self.shared.delete_prefix(SHARED_KEY_PREFIX)
+            else:
+                self.shared.delete(SHARED_KEY_PREFIX + display_name)
+
+    def snapshot(self) -> dict[str, str]:
+        """Currently known display name → resource name pairs."""
+        with self._lock:
+            return {name: entry[0] for name, entry in self._entries.items()}
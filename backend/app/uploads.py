@@ -0,0 +1,176 @@
+"""Receive a multipart/form-data upload by streaming the request body to disk."""
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+# Constants
+FILE_FIELD = "file"
+MAX_FIELD_BYTES = 64 * 1024
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+
+class InvalidUpload(Exception):
+    """The upload was rejected (bad body, unsupported file, over the size limit)."""
+
+
+@dataclass
+class ReceivedUpload:
+    """A file received from a multipart upload and saved next to its final location."""
+
+    partial_path: Path
+    filename: str
+    size_bytes: int
+    sha256: str
+    fields: dict[str, str]
+
+
+class _Events:
+    """
+    Collects the parser's callbacks.
+
+    The callbacks are synchronous; the events are handled after each chunk is
+    fed, so file writes can be awaited off the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.items: list[tuple[str, bytes]] = []
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+
+    def callbacks(self) -> Any:
+        """Callbacks for MultipartParser."""
+        return {
+            "on_part_begin": lambda: self.items.append(("part", b"")),
+            "on_header_field": lambda chunk, start, end: self._header_field.extend(
+                chunk[start:end]
+            ),
+            "on_header_value": lambda chunk, start, end: self._header_value.extend(
+                chunk[start:end]
+            ),
+            "on_header_end": self._header_end,
+            "on_part_data": lambda chunk, start, end: self.items.append(
+                ("data", bytes(chunk[start:end]))
+            ),
+            "on_part_end": lambda: self.items.append(("end", b"")),
+        }
+
+    def _header_end(self) -> None:
+        if bytes(self._header_field).lower() == b"content-disposition":
+            self.items.append(("disposition", bytes(self._header_value)))
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def drain(self) -> list[tuple[str, bytes]]:
+        """Return and forget the events collected so far."""
+        items, self.items = self.items, []
+        return items
+
+
+async def receive_upload(
+    request: Request,
+    folder: Path,
+    max_bytes: int,
+    allowed_extensions: set[str],
+) -> ReceivedUpload:
+    """
+    Stream the "file" part of a multipart body to a hidden partial file in folder.
+
+    The body is parsed as it arrives, so nothing is spooled first: the file
+    type is checked as soon as the part headers are in, the size limit stops
+    reading as soon as it is exceeded, and the SHA-256 is computed while
+    writing. Other form fields (e.g. "store") are returned as text.
+
+    Args:
+        request: Incoming request whose body has not been read
+        folder: Folder of the final file (the partial file is renamed into place)
+        max_bytes: Largest accepted file
+        allowed_extensions: Accepted file suffixes (lower case, with the dot)
+
+    Returns:
+        The saved upload
+
+    Raises:
+        InvalidUpload: The body is not a valid upload; no partial file is left
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise InvalidUpload("Expected a multipart/form-data body")
+
+    events = _Events()
+    parser = MultipartParser(boundary, events.callbacks())
+    partial_path = folder / f".upload-{uuid.uuid4().hex}.partial"
+    out: Optional[BinaryIO] = None
+    buffer = bytearray()
+    digest = hashlib.sha256()
+    size_bytes = 0
+    filename: Optional[str] = None
+    fields: dict[str, str] = {}
+    part_name = ""
+    value = bytearray()
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, data in events.drain():
+                if kind == "part":
+                    part_name = ""
+                    value.clear()
+                elif kind == "disposition":
+                    _, disposition = parse_options_header(data)
+                    part_name = disposition.get(b"name", b"").decode("utf-8", "replace")
+                    if part_name == FILE_FIELD:
+                        if out is not None:
+                            raise InvalidUpload("Only one file per upload")
+                        raw_name = disposition.get(b"filename", b"").decode("utf-8", "replace")
+                        filename = Path(raw_name.replace("\\", "/")).name
+                        suffix = Path(filename).suffix.lower()
+                        if suffix not in allowed_extensions:
+                            raise InvalidUpload(
+                                f"Unsupported file type: {suffix}. "
+                                f"Supported: {', '.join(sorted(allowed_extensions))}"
+                            )
+                        out = await run_in_threadpool(partial_path.open, "wb")
+                elif kind == "data" and part_name == FILE_FIELD and out is not None:
+                    size_bytes += len(data)
+                    if size_bytes > max_bytes:
+                        raise InvalidUpload(f"File exceeds {max_bytes // (1024 * 1024)}MB limit")
+                    digest.update(data)
+                    buffer.extend(data)
+                    if len(buffer) >= WRITE_BUFFER_BYTES:
+                        await run_in_threadpool(out.write, bytes(buffer))
+                        buffer.clear()
+                elif kind == "data":
+                    value.extend(data)
+                    if len(value) > MAX_FIELD_BYTES:
+                        raise InvalidUpload(f"Form field {part_name} is too large")
+                elif kind == "end" and part_name and part_name != FILE_FIELD:
+                    fields[part_name] = value.decode("utf-8", "replace")
+        parser.finalize()
+        if out is None or filename is None:
+            raise InvalidUpload(f"No {FILE_FIELD} in upload")
+        if buffer:
+            await run_in_threadpool(out.write, bytes(buffer))
+        await run_in_threadpool(out.close)
+    except BaseException as e:
+        if out is not None:
+            out.close()
+        partial_path.unlink(missing_ok=True)
+        if isinstance(e, MultipartParseError):
+            raise InvalidUpload(f"Malformed multipart body: {e}") from e
+        raise
+
+    return ReceivedUpload(
+        partial_path=partial_path,
+        filename=filename,
+        size_bytes=size_bytes,
+        sha256=digest.hexdigest(),
+        fields=fields,
+    )
@@ -0,0 +1 @@
+# Benchmarks for the backend (run from backend/: python -m benchmarks.<name>)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent queries with the blocking client call versus query_async.
+
+    python -m benchmarks.bench_async_queries --requests 32 --latency-ms 200
+    python -m benchmarks.bench_async_queries --requests 32 --max-concurrency 16
+
+Sends the same concurrent queries from one event loop to the fake Gemini
+backend twice: calling the blocking GeminiClient.query() inside the
+coroutine, as the endpoints used to, and awaiting GeminiClient.query_async(),
+which runs the call on the client's bounded executor. A probe coroutine ticks
+every few milliseconds meanwhile; its worst delay is how long /health and
+every other request on the worker would have been stalled.
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+from app.gemini_client import DEFAULT_MAX_CONCURRENCY, GeminiClient
+from app.prompts import SALES_SYSTEM_PROMPT
+
+from .harness import fake_backend_env, latency_summary, report
+
+# Constants
+DEFAULT_REQUESTS = 32
+DEFAULT_LATENCY_MS = 200.0
+PROBE_INTERVAL_SECONDS = 0.005
+STORE_NAME = "bench-async-queries"
+
+
+async def _probe(stop: asyncio.Event, stalls: list[float]) -> None:
+    """Record how late each tick of the event loop is."""
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL_SECONDS
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+        stalls.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run(
+    name: str, ask: Callable[[str], Awaitable[object]], requests: int, run_id: str
+) -> None:
+    latencies: list[float] = []
+    stalls: list[float] = []
+
+    async def one(i: int) -> None:
+        started = time.perf_counter()
+        # Unique questions: the answer cache and coalescing must not help
+        await ask(f"[{run_id} {i}] Which case studies mention cost savings?")
+        latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop, stalls))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    print(
+        f"   {name:<26} {elapsed:>6.2f}s  {requests / elapsed:>7.1f} req/s  "
+        f"{latency_summary(latencies)}  "
+        f"max loop stall {max(stalls, default=0.0) * 1000:>7.1f}ms"
+    )
+
+
+async def _compare(client: GeminiClient, requests: int) -> None:
+    # Resolve the store first so neither run pays for creating it
+    client.get_store_name(STORE_NAME)
+
+    async def blocking(question: str) -> object:
+        return client.query(question, SALES_SYSTEM_PROMPT, STORE_NAME)
+
+    async def on_executor(question: str) -> object:
+        return await client.query_async(question, SALES_SYSTEM_PROMPT, STORE_NAME)
+
+    await _run("blocking call in coroutine", blocking, requests, "blocking")
+    await _run("query_async (executor)", on_executor, requests, "executor")
+
+
+def main(
+    requests: int = DEFAULT_REQUESTS,
+    latency_ms: float = DEFAULT_LATENCY_MS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """
+    Run the benchmark and print a summary.
+
+    Args:
+        requests: Concurrent queries per mode
+        latency_ms: Fake Gemini latency per call
+        max_concurrency: Executor threads of the client (GEMINI_MAX_CONCURRENCY)
+    """
+    os.environ.update(fake_backend_env(FAKE_GEMINI_LATENCY_SECONDS=str(latency_ms / 1000)))
+    client = GeminiClient(max_concurrency=max_concurrency)
+
+    title = (
+        f"{requests} concurrent queries, fake latency {latency_ms:g}ms, "
+        f"{max_concurrency} executor threads"
+    )
+    try:
+        with report(title):
+            asyncio.run(_compare(client, requests))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark blocking versus executor-backed Gemini queries"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=DEFAULT_REQUESTS, help="Concurrent queries per mode"
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=DEFAULT_LATENCY_MS,
+        help=f"Fake Gemini latency per call (default: {DEFAULT_LATENCY_MS:g})",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Executor threads of the client (default: {DEFAULT_MAX_CONCURRENCY})",
+    )
+    args = parser.parse_args()
+    main(args.requests, args.latency_ms, args.max_concurrency)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark N sequential /api/query calls against one /api/query/batch call.
+
+    python -m benchmarks.bench_batch --questions 15 --latency-ms 300
+    python -m benchmarks.bench_batch --questions 15 --duplicates 5 --batch-concurrency 8
+
+Runs the API in-process against the fake Gemini backend with injected
+latency, the way a proposal writer's questions arrive: one round trip per
+question, or all of them in one batch. --duplicates repeats some questions
+in both runs: sequential repeats are served from the answer cache, and the
+batch collapses them into one model call each. Prints wall time and
+upstream calls per mode.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from .harness import fake_backend_env, report
+
+# Constants
+DEFAULT_QUESTIONS = 15
+DEFAULT_DUPLICATES = 0
+DEFAULT_LATENCY_MS = 300.0
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+
+def _questions(run_id: str, count: int, duplicates: int) -> list[str]:
+    """Unique questions per run (so the answer cache never helps), some repeated."""
+    unique = [f"[{run_id}] Requirement {i}: which case studies show it?" for i in range(count)]
+    return unique + unique[: min(duplicates, count)]
+
+
+async def _compare(questions: int, duplicates: int) -> None:
+    from app import main as api
+
+    app = api.app
+    await app.router.startup()
+    # The Gemini client is built by a start-up task; measure from when it is ready
+    await app.state.gemini_init_task
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        timeout=DEFAULT_TIMEOUT_SECONDS,
+    )
+    try:
+        sequential = _questions("sequential", questions, duplicates)
+        calls_before = api.query_flight.calls
+        started = time.perf_counter()
+        for question in sequential:
+            response = await client.post("/api/query", json={"question": question})
+            response.raise_for_status()
+        sequential_seconds = time.perf_counter() - started
+        sequential_calls = api.query_flight.calls - calls_before
+
+        batch = _questions("batch", questions, duplicates)
+        calls_before = api.query_flight.calls
+        started = time.perf_counter()
+        response = await client.post("/api/query/batch", json={"questions": batch})
+        response.raise_for_status()
+        batch_seconds = time.perf_counter() - started
+        batch_calls = api.query_flight.calls - calls_before
+        errors = sum(1 for item in response.json()["results"] if item["error"])
+    finally:
+        await client.aclose()
+        await app.router.shutdown()
+
+    print(f"   {'mode':<22} {'seconds':>8} {'upstream calls':>15}")
+    print(f"   {'sequential /api/query':<22} {sequential_seconds:>8.2f} {sequential_calls:>15}")
+    print(f"   {'one batch call':<22} {batch_seconds:>8.2f} {batch_calls:>15}")
+    if errors:
+        print(f"   ({errors} batch items failed)")
+    print(f"   speed-up: {sequential_seconds / batch_seconds:.1f}x")
+
+
+def main(
+    questions: int = DEFAULT_QUESTIONS,
+    duplicates: int = DEFAULT_DUPLICATES,
+    latency_ms: float = DEFAULT_LATENCY_MS,
+    batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> None:
+    """
+    Run the benchmark and print a summary.
+
+    Args:
+        questions: Distinct questions per run
+        duplicates: Questions asked a second time in each run
+        latency_ms: Fake Gemini latency per call
+        batch_concurrency: Questions of a batch answered at once (BATCH_MAX_CONCURRENCY)
+    """
+    # Fake backend and throwaway state; the API reads these at import
+    os.environ.update(
+        fake_backend_env(
+            "bench-batch-",
+            FAKE_GEMINI_LATENCY_SECONDS=str(latency_ms / 1000),
+            BATCH_MAX_CONCURRENCY=str(batch_concurrency),
+            RATE_LIMIT_PER_MINUTE="0",
+        )
+    )
+
+    title = (
+        f"{questions} questions (+{duplicates} repeated), fake latency {latency_ms:g}ms, "
+        f"batch concurrency {batch_concurrency}"
+    )
+    with report(title):
+        asyncio.run(_compare(questions, duplicates))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark sequential queries versus one batch query"
+    )
+    parser.add_argument(
+        "--questions", type=int, default=DEFAULT_QUESTIONS, help="Distinct questions per run"
+    )
+    parser.add_argument(
+        "--duplicates",
+        type=int,
+        default=DEFAULT_DUPLICATES,
+        help="Questions asked a second time in each run",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=DEFAULT_LATENCY_MS,
+        help=f"Fake Gemini latency per call (default: {DEFAULT_LATENCY_MS:g})",
+    )
+    parser.add_argument(
+        "--batch-concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help=f"Questions of a batch answered at once (default: {DEFAULT_BATCH_CONCURRENCY})",
+    )
+    args = parser.parse_args()
+    main(args.questions, args.duplicates, args.latency_ms, args.batch_concurrency)
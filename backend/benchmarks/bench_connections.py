@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark connection reuse of the shared Gemini HTTP pool against a local stub.
+
+    python -m benchmarks.bench_connections --requests 500 --threads 16
+
+A local HTTP server stands in for the Gemini API. It counts TCP connections
+and waits --handshake-ms on each new one to approximate a TLS handshake. The
+same generate_content calls are made with a fresh genai.Client per call and
+with the shared pooled client.
+"""
+import argparse
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google import genai
+from google.genai import types
+
+from app.connections import HttpSettings, close_shared_clients, shared_genai_client
+from app.gemini_client import DEFAULT_MODEL
+
+from .harness import latency_summary, report
+
+# Constants
+DEFAULT_REQUESTS = 500
+DEFAULT_THREADS = 16
+DEFAULT_HANDSHAKE_MS = 30.0
+STUB_RESPONSE = json.dumps(
+    {"candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}}]}
+).encode()
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+    handshake_seconds = 0.0
+    lock = threading.Lock()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _StubServer
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake_seconds)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("content-length") or 0))
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def _run(
+    name: str, server: _StubServer, call: Callable[[], None], requests: int, threads: int
+) -> None:
+    server.connections = 0
+    latencies: list[float] = []
+
+    def one(_: int) -> None:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"   {name:<22} {server.connections:>5} connections  "
+        f"{requests / elapsed:>8.1f} req/s  {latency_summary(latencies)}"
+    )
+
+
+def main(
+    requests: int = DEFAULT_REQUESTS,
+    threads: int = DEFAULT_THREADS,
+    handshake_ms: float = DEFAULT_HANDSHAKE_MS,
+) -> None:
+    """
+    Run the benchmark and print a summary.
+
+    Args:
+        requests: Calls per mode
+        threads: Concurrent callers
+        handshake_ms: Simulated cost of opening a connection
+    """
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    server.handshake_seconds = handshake_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    api_key = "bench-key"
+
+    def fresh_client_call() -> None:
+        client = genai.Client(api_key=api_key, http_options=types.HttpOptions(base_url=base_url))
+        client.models.generate_content(model=DEFAULT_MODEL, contents="ping")
+        client.close()
+
+    shared = shared_genai_client(
+        api_key,
+        HttpSettings(base_url=base_url, max_connections=threads, max_keepalive_connections=threads),
+    )
+
+    def shared_client_call() -> None:
+        shared.models.generate_content(model=DEFAULT_MODEL, contents="ping")
+
+    title = (
+        f"{requests} generate_content calls, {threads} threads, {handshake_ms:g}ms per new connection"
+    )
+    with report(title):
+        _run("client per call", server, fresh_client_call, requests, threads)
+        _run("shared pooled client", server, shared_client_call, requests, threads)
+
+    close_shared_clients()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Gemini HTTP connection reuse")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Calls per mode")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Concurrent callers")
+    parser.add_argument(
+        "--handshake-ms",
+        type=float,
+        default=DEFAULT_HANDSHAKE_MS,
+        help=f"Simulated connection setup cost (default: {DEFAULT_HANDSHAKE_MS:g})",
+    )
+    args = parser.parse_args()
+    main(args.requests, args.threads, args.handshake_ms)
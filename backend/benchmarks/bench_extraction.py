@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingesting PDF/DOCX files raw versus as locally extracted text.
+
+    python -m benchmarks.bench_extraction --folder ../case-studies
+    python -m benchmarks.bench_extraction --folder ../case-studies --mb-per-second 0.5
+
+Ingests every PDF/DOCX in the folder twice into the fake Gemini backend:
+once as the original files, once through the extraction process pool. The
+fake store's import time grows with the size uploaded (--mb-per-second), a
+stand-in for the upload and PROCESSING time of the real API. Prints bytes
+saved and end-to-end ingest time per file for both runs.
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.backends import create_genai_client
+from app.extraction import ExtractedDocument, is_extractable
+from app.ingestion import get_or_create_store, ingest_file, local_extractor
+
+from .harness import fake_backend_env, report
+
+# Constants
+DEFAULT_WORKERS = 4
+DEFAULT_MB_PER_SECOND = 1.0
+DEFAULT_OPERATION_SECONDS = 0.5
+STORE_NAME = "bench-extraction"
+
+
+@dataclass
+class FileRun:
+    """One file ingested in one mode."""
+
+    path: Path
+    uploaded_bytes: int
+    seconds: float
+    ok: bool
+
+
+def _ingest(files: list[Path], extract: bool, workers: int) -> tuple[list[FileRun], float]:
+    """Ingest files into a fresh fake store; returns per-file runs and wall time."""
+    client = create_genai_client(None)
+    store_name = get_or_create_store(client, STORE_NAME)
+    started = time.monotonic()
+    with local_extractor(extract) as extractor:
+        futures = [extractor.submit(path) if extractor else None for path in files]
+
+        def run(path: Path, future: Optional[Future[ExtractedDocument]]) -> FileRun:
+            file_started = time.monotonic()
+            extracted = extractor.wait(path, future) if extractor else None
+            upload_path = extracted.path if extracted else path
+            uploaded_bytes = upload_path.stat().st_size
+            try:
+                ok, _ = ingest_file(client, store_name, path, upload_path)
+            finally:
+                if extracted is not None:
+                    extracted.path.unlink(missing_ok=True)
+            return FileRun(path, uploaded_bytes, time.monotonic() - file_started, ok)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            runs = list(executor.map(run, files, futures))
+    return runs, time.monotonic() - started
+
+
+def main(
+    folder: str,
+    workers: int = DEFAULT_WORKERS,
+    mb_per_second: float = DEFAULT_MB_PER_SECOND,
+    operation_seconds: float = DEFAULT_OPERATION_SECONDS,
+    verbose: bool = False,
+) -> None:
+    """
+    Run the benchmark and print a per-file comparison.
+
+    Args:
+        folder: Folder with PDF/DOCX files (searched recursively)
+        workers: Files ingested concurrently
+        mb_per_second: Fake store import throughput (upload plus processing)
+        operation_seconds: Fixed part of each fake import
+        verbose: Show the ingestion output of both runs
+    """
+    os.environ.update(
+        fake_backend_env(
+            FAKE_GEMINI_PROCESSING_MB_PER_SECOND=str(mb_per_second),
+            FAKE_GEMINI_OPERATION_SECONDS=str(operation_seconds),
+        )
+    )
+
+    files = sorted(
+        f for f in Path(folder).rglob("*") if f.is_file() and is_extractable(f)
+    )
+    if not files:
+        raise ValueError(f"No PDF/DOCX files in {folder}")
+
+    output = None if verbose else io.StringIO()
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        raw_runs, raw_seconds = _ingest(files, extract=False, workers=workers)
+        text_runs, text_seconds = _ingest(files, extract=True, workers=workers)
+
+    title = (
+        f"{len(files)} files, {workers} workers, fake import {operation_seconds:g}s "
+        f"+ {mb_per_second:g}MB/s, {os.cpu_count()} CPU cores"
+    )
+    with report(title, width=78):
+        print(
+            f"   {'file':<28} {'raw KB':>9} {'text KB':>9} {'saved':>6} "
+            f"{'raw s':>7} {'text s':>7}"
+        )
+        for raw, text in zip(raw_runs, text_runs, strict=True):
+            saved = 1 - text.uploaded_bytes / raw.uploaded_bytes if raw.uploaded_bytes else 0.0
+            status = "" if raw.ok and text.ok else "  (failed)"
+            print(
+                f"   {raw.path.name[:28]:<28} {raw.uploaded_bytes / 1024:>9.1f} "
+                f"{text.uploaded_bytes / 1024:>9.1f} {saved:>6.0%} "
+                f"{raw.seconds:>7.2f} {text.seconds:>7.2f}{status}"
+            )
+        raw_total = sum(run.uploaded_bytes for run in raw_runs)
+        text_total = sum(run.uploaded_bytes for run in text_runs)
+        saved_total = 1 - text_total / raw_total if raw_total else 0.0
+        print(
+            f"   {'total':<28} {raw_total / 1024:>9.1f} {text_total / 1024:>9.1f} "
+            f"{saved_total:>6.0%} {raw_seconds:>7.2f} {text_seconds:>7.2f}  (wall)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark raw versus locally extracted PDF/DOCX ingestion"
+    )
+    parser.add_argument("--folder", required=True, help="Folder with PDF/DOCX files")
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="Files ingested concurrently"
+    )
+    parser.add_argument(
+        "--mb-per-second",
+        type=float,
+        default=DEFAULT_MB_PER_SECOND,
+        help="Fake store import throughput (upload plus processing)",
+    )
+    parser.add_argument(
+        "--operation-seconds",
+        type=float,
+        default=DEFAULT_OPERATION_SECONDS,
+        help="Fixed part of each fake import, in seconds",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show ingestion output")
+    args = parser.parse_args()
+
+    main(args.folder, args.workers, args.mb_per_second, args.operation_seconds, args.verbose)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local retrieval index: build time and query latency.
+
+    python -m benchmarks.bench_retrieval --documents 10000
+    python -m benchmarks.bench_retrieval --documents 10000 --words 1200 --queries 500
+
+Generates synthetic case studies (Zipf-distributed words from a fixed
+vocabulary, so BM25 posting lists are as skewed as in real text), indexes
+them into a LocalIndex and times:
+- the full build, and re-indexing one file into the built index (an upload)
+- search() for short multi-word queries (BM25 + dense vectors, fused)
+- search() restricted to one file (citation previews)
+- related_files() (the "related case studies" lookup)
+"""
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from app.retrieval import LocalIndex
+
+from .harness import latency_summary, report, time_calls
+
+# Constants
+DEFAULT_DOCUMENTS = 10_000
+DEFAULT_WORDS = 600
+DEFAULT_QUERIES = 200
+DEFAULT_TOP_K = 5
+VOCABULARY_SIZE = 20_000
+QUERY_WORDS = 4
+SEED = 42
+
+
+def _vocabulary(rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def _documents(count: int, words: int, rng: random.Random) -> tuple[list[str], list[str]]:
+    """Synthetic document texts and the vocabulary they were drawn from."""
+    vocabulary = _vocabulary(rng)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    texts = [" ".join(rng.choices(vocabulary, weights, k=words)) for _ in range(count)]
+    return texts, vocabulary
+
+
+def _timed(name: str, call: Callable[[int], object], count: int) -> None:
+    latencies = time_calls(call, count)
+    print(f"   {name:<24} {latency_summary(latencies, (50, 95, 99), decimals=2)}")
+
+
+def main(
+    documents: int = DEFAULT_DOCUMENTS,
+    words: int = DEFAULT_WORDS,
+    queries: int = DEFAULT_QUERIES,
+    k: int = DEFAULT_TOP_K,
+) -> None:
+    """
+    Run the benchmark and print a summary.
+
+    Args:
+        documents: Synthetic documents to index
+        words: Words per document
+        queries: Timed calls per lookup kind
+        k: Results per lookup
+    """
+    rng = random.Random(SEED)
+    texts, vocabulary = _documents(documents, words, rng)
+    files = [f"case-study-{i:05d}.md" for i in range(documents)]
+
+    index = LocalIndex()
+    started = time.perf_counter()
+    for file, text in zip(files, texts, strict=True):
+        index.add_text(file, text)
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.add_text(files[0], texts[-1])
+    reindex_ms = (time.perf_counter() - started) * 1000
+
+    # Queries mix frequent and rare words, like real questions
+    questions = [
+        " ".join(rng.choice(vocabulary[: VOCABULARY_SIZE // (10**j)]) for j in range(QUERY_WORDS))
+        for _ in range(queries)
+    ]
+    picked_files = [rng.choice(files) for _ in range(queries)]
+
+    title = (
+        f"{documents} documents x {words} words: {index.chunk_count} chunks, "
+        f"built in {build_seconds:.2f}s ({documents / build_seconds:.0f} docs/s)"
+    )
+    with report(title):
+        print(f"   re-index one file        {reindex_ms:>7.2f}ms")
+        _timed("search", lambda i: index.search(questions[i], k=k), queries)
+        _timed(
+            "search within a file",
+            lambda i: index.search(questions[i], k=1, file=picked_files[i]),
+            queries,
+        )
+        _timed("related_files", lambda i: index.related_files(picked_files[i], k=k), queries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local retrieval index")
+    parser.add_argument(
+        "--documents",
+        type=int,
+        default=DEFAULT_DOCUMENTS,
+        help=f"Synthetic documents to index (default: {DEFAULT_DOCUMENTS})",
+    )
+    parser.add_argument("--words", type=int, default=DEFAULT_WORDS, help="Words per document")
+    parser.add_argument(
+        "--queries", type=int, default=DEFAULT_QUERIES, help="Timed calls per lookup kind"
+    )
+    parser.add_argument("--k", type=int, default=DEFAULT_TOP_K, help="Results per lookup")
+    args = parser.parse_args()
+    main(args.documents, args.words, args.queries, args.k)
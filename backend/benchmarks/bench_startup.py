@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start: import time of app.main and time until /livez answers.
+
+    python -m benchmarks.bench_startup                         # report
+    python -m benchmarks.bench_startup --max-import-ms 1000 --max-ready-ms 2000
+
+Import time comes from `python -X importtime -c "import app.main"` (best of
+--runs, to filter out noise); ready time is from spawning uvicorn to the
+first 200 from /livez. Exits 1 when a budget is exceeded or a module that
+must stay out of the import path (the Gemini SDK) is imported, so cold-start
+regressions fail the quality checks.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+from .harness import BACKEND_DIR, fake_backend_env, free_port, report, wait_until_answering
+
+# Constants
+DEFAULT_RUNS = 3
+DEFAULT_TOP = 10
+READY_TIMEOUT_SECONDS = 60.0
+# Loaded by the start-up task instead (seconds on their own)
+DEFERRED_MODULES = ("google.genai",)
+
+
+@dataclass
+class ImportProfile:
+    """One `python -X importtime` run."""
+
+    total_ms: float
+    # (module, cumulative ms) for every module imported
+    modules: list[tuple[str, float]]
+
+
+def _env() -> dict[str, str]:
+    """Environment for the measured processes (fake backend, throwaway data)."""
+    return {**os.environ, **fake_backend_env("bench-startup-")}
+
+
+def profile_import(module: str = "app.main") -> ImportProfile:
+    """Import a module in a fresh interpreter and parse -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        cumulative_ms = int(cumulative) / 1000
+        modules.append((name, cumulative_ms))
+        if name == module:
+            total_ms = cumulative_ms
+    return ImportProfile(total_ms=total_ms, modules=modules)
+
+
+def measure_ready() -> float:
+    """Milliseconds from spawning uvicorn to the first successful /livez."""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_answering(server, port, "/livez", READY_TIMEOUT_SECONDS)
+        return (time.perf_counter() - started) * 1000
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main(
+    runs: int = DEFAULT_RUNS,
+    top: int = DEFAULT_TOP,
+    max_import_ms: float | None = None,
+    max_ready_ms: float | None = None,
+) -> bool:
+    """
+    Run the benchmark and print a summary.
+
+    Args:
+        runs: Measurements of each kind (the best one counts)
+        top: Slowest imports to list
+        max_import_ms: Budget for importing app.main
+        max_ready_ms: Budget for /livez to answer after spawning the server
+
+    Returns:
+        True if every budget was met
+    """
+    profiles = [profile_import() for _ in range(runs)]
+    best = min(profiles, key=lambda profile: profile.total_ms)
+    ready_ms = min(measure_ready() for _ in range(runs))
+
+    failures = []
+    imported = {name for name, _ in best.modules}
+    for module in DEFERRED_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported by app.main (must load in the background)")
+    if max_import_ms is not None and best.total_ms > max_import_ms:
+        failures.append(f"import app.main {best.total_ms:.0f}ms > {max_import_ms:g}ms")
+    if max_ready_ms is not None and ready_ms > max_ready_ms:
+        failures.append(f"/livez after {ready_ms:.0f}ms > {max_ready_ms:g}ms")
+
+    with report(f"Cold start, best of {runs}"):
+        print(f"   import app.main   {best.total_ms:>8.1f}ms")
+        print(f"   /livez answering  {ready_ms:>8.1f}ms")
+        print("   slowest imports (cumulative):")
+        children = [entry for entry in best.modules if entry[0] != "app.main"]
+        for name, cumulative_ms in sorted(children, key=lambda entry: -entry[1])[:top]:
+            print(f"      {cumulative_ms:>8.1f}ms  {name}")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cold start of the API")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Measurements of each kind")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Slowest imports to list")
+    parser.add_argument(
+        "--max-import-ms", type=float, default=None, help="Fail if importing app.main is slower"
+    )
+    parser.add_argument(
+        "--max-ready-ms", type=float, default=None, help="Fail if /livez takes longer to answer"
+    )
+    args = parser.parse_args()
+
+    ok = main(args.runs, args.top, args.max_import_ms, args.max_ready_ms)
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark query throughput as the number of worker processes grows.
+
+    python -m benchmarks.bench_workers --max-workers 8 --requests 400 --concurrency 64
+
+For 1, 2, 4, ... up to --max-workers, starts app.serve against the fake
+Gemini backend (shared SQLite state, throwaway data) and loads /api/query
+with unique questions, so every request goes through the full answer path.
+Scaling flattens once workers outnumber CPU cores.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+
+import httpx
+
+from app.loadtest import EndpointStats, run_queries
+
+from .harness import (
+    BACKEND_DIR,
+    fake_backend_env,
+    free_port,
+    latency_summary,
+    report,
+    wait_until_answering,
+)
+
+# Constants
+DEFAULT_MAX_WORKERS = os.cpu_count() or 1
+DEFAULT_REQUESTS = 400
+DEFAULT_CONCURRENCY = 64
+DEFAULT_LATENCY_SECONDS = 0.05
+STARTUP_TIMEOUT_SECONDS = 60.0
+
+
+def _worker_counts(max_workers: int) -> list[int]:
+    """1, 2, 4, ... and max_workers itself."""
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+async def _run(workers: int, requests: int, concurrency: int, latency: float) -> EndpointStats:
+    """Start a server with some workers, load it and stop it."""
+    port = free_port()
+    env = {
+        **os.environ,
+        **fake_backend_env(
+            "bench-workers-",
+            FAKE_GEMINI_LATENCY_SECONDS=str(latency),
+            RATE_LIMIT_PER_MINUTE="0",
+            ADMISSION_QUERY_QUEUE=str(requests),
+            LOG_LEVEL="warning",
+            TIMING_LOG_LEVEL="DEBUG",
+        ),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--port", str(port), "--workers", str(workers)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    limits = httpx.Limits(max_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=60.0, limits=limits
+        ) as client:
+            # Queries get 503 until the Gemini client is built: wait for /readyz
+            await asyncio.to_thread(
+                wait_until_answering, server, port, "/readyz", STARTUP_TIMEOUT_SECONDS
+            )
+            # Warm up every worker before measuring
+            await run_queries(client, workers * 4, min(concurrency, workers * 4), repeat=False)
+            return await run_queries(client, requests, concurrency, repeat=False)
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+async def main(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    requests: int = DEFAULT_REQUESTS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    latency: float = DEFAULT_LATENCY_SECONDS,
+) -> None:
+    """
+    Run the benchmark and print a summary.
+
+    Args:
+        max_workers: Largest number of worker processes to try
+        requests: Queries per run
+        concurrency: Queries in flight at once
+        latency: Simulated Gemini latency per call, in seconds
+    """
+    title = (
+        f"{requests} queries per run, concurrency {concurrency}, "
+        f"{latency * 1000:g}ms fake Gemini latency, {os.cpu_count()} CPU cores"
+    )
+    with report(title):
+        baseline = None
+        for workers in _worker_counts(max_workers):
+            stats = await _run(workers, requests, concurrency, latency)
+            total = len(stats.latencies) + stats.errors
+            throughput = total / stats.elapsed if stats.elapsed else 0.0
+            baseline = baseline or throughput
+            print(
+                f"   {workers:>3} workers  {throughput:>8.1f} req/s  "
+                f"x{throughput / baseline:>5.2f}  {stats.errors:>4} err  "
+                f"{latency_summary(stats.latencies)}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark throughput from 1 to N workers")
+    parser.add_argument(
+        "--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Most worker processes"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=DEFAULT_REQUESTS, help="Queries per run"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Queries in flight at once"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=DEFAULT_LATENCY_SECONDS,
+        help="Fake Gemini latency per call, in seconds",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.max_workers, args.requests, args.concurrency, args.latency))
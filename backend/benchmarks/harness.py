@@ -0,0 +1,106 @@
+"""Helpers shared by the benchmarks: fake-backend settings, servers and report formatting."""
+import os
+import socket
+import subprocess
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+import httpx
+
+from app.loadtest import percentile
+
+# Constants
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_WIDTH = 50
+POLL_SECONDS = 0.01
+
+
+def fake_backend_env(scratch_prefix: Optional[str] = None, **settings: str) -> dict[str, str]:
+    """
+    Environment that runs the API or a GeminiClient against the fake backend.
+
+    Args:
+        scratch_prefix: If set, point CASE_STUDIES_DIR and DATA_DIR at a new
+            temporary folder with this prefix, so runs start from empty state
+        settings: Further variables (e.g. FAKE_GEMINI_LATENCY_SECONDS="0.2")
+
+    Returns:
+        Variables to merge into os.environ or a subprocess environment
+    """
+    env = {"GEMINI_BACKEND": "fake", "GEMINI_CONTEXT_CACHE": "false"}
+    if scratch_prefix is not None:
+        scratch = tempfile.mkdtemp(prefix=scratch_prefix)
+        env["CASE_STUDIES_DIR"] = os.path.join(scratch, "case-studies")
+        env["DATA_DIR"] = os.path.join(scratch, "data")
+    env.update(settings)
+    return env
+
+
+def free_port() -> int:
+    """A TCP port on 127.0.0.1 that is free right now."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def wait_until_answering(
+    server: subprocess.Popen[bytes], port: int, path: str, timeout: float
+) -> None:
+    """
+    Poll a spawned server until path answers 200.
+
+    /livez answers as soon as the process is up; /readyz only once the
+    Gemini client is built and the API can serve queries.
+
+    Raises:
+        RuntimeError: If the server exits or does not answer within timeout seconds
+    """
+    deadline = time.monotonic() + timeout
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            try:
+                if client.get(path).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(POLL_SECONDS)
+    raise RuntimeError(f"{path} not answering after {timeout:g}s")
+
+
+def latency_summary(
+    latencies: list[float], percentiles: tuple[int, ...] = (50, 99), decimals: int = 1
+) -> str:
+    """Percentiles of latencies in seconds, formatted as "p50  12.3ms  p99  45.6ms"."""
+    ordered = sorted(latencies)
+    return "  ".join(
+        f"p{pct} {percentile(ordered, pct) * 1000:>7.{decimals}f}ms"
+        for pct in percentiles
+    )
+
+
+def time_calls(call: Callable[[int], object], count: int) -> list[float]:
+    """Seconds taken by call(0) ... call(count - 1), one after another."""
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+@contextmanager
+def report(title: str, width: int = REPORT_WIDTH) -> Iterator[None]:
+    """Print a benchmark's title and results between separator lines."""
+    separator = "=" * width
+    print(f"\n{separator}")
+    print(title)
+    try:
+        yield
+    finally:
+        print(separator)
@@ -0,0 +1,75 @@
+"""Shared fixtures: a GeminiClient on the offline fake backend, and the API on it."""
+import asyncio
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from app import main
+from app.admission import RateLimiter
+from app.cache import QueryCache
+from app.gemini_client import GeminiClient
+from app.retrieval import LocalIndex
+from app.singleflight import SingleFlight
+
+Post = Callable[[str, dict[str, Any]], httpx.Response]
+
+
+@pytest.fixture
+def fake_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[Callable[..., GeminiClient]]:
+    """
+    Build GeminiClients on the fake backend; settings are environment variables.
+
+    Usage: fake_client(FAKE_GEMINI_SLOW_RATE="0.05", GEMINI_HEDGE="true")
+    """
+    clients: list[GeminiClient] = []
+
+    def make(**env: str) -> GeminiClient:
+        monkeypatch.setenv("GEMINI_BACKEND", "fake")
+        monkeypatch.setenv("FAKE_GEMINI_LATENCY_SECONDS", "0.02")
+        monkeypatch.setenv("GEMINI_CONTEXT_CACHE", "false")
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        client = GeminiClient()
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def api(
+    fake_client: Callable[..., GeminiClient], monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Callable[..., Post]:
+    """
+    Point the API at a fake client (settings as for fake_client); returns a POST helper.
+
+    Rate limiting is off; tests that need it replace main.rate_limiter.
+    """
+
+    def make(**env: str) -> Post:
+        monkeypatch.setattr(main, "gemini_client", fake_client(**env))
+        monkeypatch.setattr(main, "CASE_STUDIES_DIR", tmp_path / "case-studies")
+        monkeypatch.setattr(main, "DATA_DIR", tmp_path / "data")
+        monkeypatch.setattr(main, "local_index", LocalIndex())
+        monkeypatch.setattr(main, "local_index_version", None)
+        monkeypatch.setattr(main, "query_cache", QueryCache(max_entries=64))
+        monkeypatch.setattr(main, "query_flight", SingleFlight())
+        monkeypatch.setattr(main, "rate_limiter", RateLimiter(rate_per_minute=0))
+
+        def post(path: str, body: dict[str, Any]) -> httpx.Response:
+            async def send() -> httpx.Response:
+                async with httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=main.app), base_url="http://test"
+                ) as client:
+                    return await client.post(path, json=body)
+
+            return asyncio.run(send())
+
+        return post
+
+    return make
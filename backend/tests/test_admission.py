@@ -0,0 +1,86 @@
+"""Rate limiting and admission gates: 429/503 with Retry-After, batches charged per question."""
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import pytest
+
+from app import main
+from app.admission import AdmissionGate, RateLimiter
+
+Post = Callable[[str, dict[str, Any]], httpx.Response]
+
+QUESTION = {"question": "Which case studies cover retail?"}
+
+
+def _fill(gate: AdmissionGate, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make every slot of a gate busy, with no room to queue."""
+    monkeypatch.setattr(gate, "running", gate.max_concurrency)
+    monkeypatch.setattr(gate, "max_queue", 0)
+
+
+def test_rate_limited_query_gets_429_with_retry_after(
+    api: Callable[..., Post], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    post = api()
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(rate_per_minute=1, burst=1))
+
+    assert post("/api/query", QUESTION).status_code == 200
+    response = post("/api/query", QUESTION)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_query_beyond_the_gate_queue_gets_503_with_retry_after(
+    api: Callable[..., Post], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    post = api()
+    _fill(main.query_gate, monkeypatch)
+
+    response = post("/api/query", QUESTION)
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_batch_is_rate_limited_before_it_takes_a_gate_slot(
+    api: Callable[..., Post], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    post = api()
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(rate_per_minute=1, burst=2))
+    _fill(main.query_gate, monkeypatch)
+    batch = {"questions": ["retail?", "logistics?"]}
+
+    # Admitted by the rate limit; each question is then turned away by the full gate
+    response = post("/api/query/batch", batch)
+    assert response.status_code == 200, response.text
+    assert all("Server busy" in item["error"] for item in response.json()["results"])
+
+    # Two questions cost two tokens: the bucket is empty, so 429 before the gate
+    response = post("/api/query/batch", batch)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_batch_takes_one_gate_slot_per_unique_question(
+    api: Callable[..., Post], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    post = api()
+    acquired: list[int] = []
+    acquire = main.query_gate.acquire
+
+    async def counting_acquire() -> None:
+        acquired.append(main.query_gate.running)
+        await acquire()
+
+    monkeypatch.setattr(main.query_gate, "acquire", counting_acquire)
+
+    response = post(
+        "/api/query/batch",
+        {"questions": ["Retail?", "logistics?", "retail", "banking?"]},
+    )
+
+    assert response.status_code == 200, response.text
+    assert len(acquired) == 3
+    assert main.query_gate.running == 0
@@ -0,0 +1,63 @@
+"""/api/query/batch against the offline fake backend."""
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app import main
+
+Post = Callable[[str, dict[str, Any]], httpx.Response]
+
+
+def test_degraded_answers_are_flagged_in_the_batch(
+    api: Callable[..., Post], tmp_path: Path
+) -> None:
+    post = api(FAKE_GEMINI_ERROR_RATE="1")
+    folder = tmp_path / "case-studies"
+    folder.mkdir()
+    (folder / "retail.md").write_text("# Retail\n\nCheckout times fell by 30% for a retailer.\n")
+
+    response = post("/api/query/batch", {"questions": ["How did checkout times change?"]})
+
+    assert response.status_code == 200, response.text
+    [item] = response.json()["results"]
+    assert item["error"] is None
+    assert item["degraded"] is True
+    assert [citation["file"] for citation in item["citations"]] == ["retail.md"]
+
+
+def test_results_come_back_in_request_order_with_duplicates_asked_once(
+    api: Callable[..., Post],
+) -> None:
+    post = api()
+    questions = ["Retail checkout?", "Logistics picking?", "retail checkout", "Banking loans?"]
+
+    response = post("/api/query/batch", {"questions": questions})
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [item["question"] for item in results] == questions
+    assert all(item["error"] is None for item in results)
+    # The two spellings of the retail question share one answer and one upstream call
+    assert results[0]["answer"] == results[2]["answer"]
+    assert len({item["answer"] for item in results}) == 3
+    assert main.query_flight.calls == 3
+
+
+def test_a_failing_question_gets_an_error_entry_without_failing_the_batch(
+    api: Callable[..., Post],
+) -> None:
+    post = api()
+    questions = ["Retail checkout?", " ", "x" * 1001, "Banking loans?"]
+
+    response = post("/api/query/batch", {"questions": questions})
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [item["question"] for item in results] == questions
+    assert results[1]["error"] == "Question cannot be empty"
+    assert "too long" in results[2]["error"]
+    assert results[1]["answer"] is None and results[2]["answer"] is None
+    assert results[0]["error"] is None and results[0]["answer"]
+    assert results[3]["error"] is None and results[3]["answer"]
@@ -0,0 +1,90 @@
+"""Answer cache: LRU eviction, TTL expiry and store-version invalidation."""
+import asyncio
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from app import ingestion, main
+from app.cache import QueryCache, bump_store_version, read_store_version
+from app.fake_backend import FakeGenaiClient, FakeSettings
+from app.gemini_client import GeminiClient
+from app.models import QueryResponse
+from app.singleflight import SingleFlight
+
+MakeClient = Callable[..., GeminiClient]
+
+PROMPT = "You answer questions about case studies."
+STORE = "cache-test"
+
+
+def _key(question: str) -> tuple[str, str, str]:
+    return QueryCache.make_key(question, PROMPT, STORE)
+
+
+def _answer(text: str) -> QueryResponse:
+    return QueryResponse(answer=text, citations=[])
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = QueryCache(max_entries=2)
+    cache.put(_key("retail?"), _answer("retail"), "1")
+    cache.put(_key("logistics?"), _answer("logistics"), "1")
+
+    # Reading retail makes logistics the least recently used entry
+    assert cache.get(_key("Retail"), "1") == _answer("retail")
+    cache.put(_key("banking?"), _answer("banking"), "1")
+
+    assert cache.get(_key("logistics?"), "1") is None
+    assert cache.get(_key("retail?"), "1") == _answer("retail")
+    assert cache.get(_key("banking?"), "1") == _answer("banking")
+    assert cache.stats().size == 2
+
+
+def test_entries_expire_after_the_ttl() -> None:
+    cache = QueryCache(ttl_seconds=0.05)
+    cache.put(_key("retail?"), _answer("retail"), "1")
+    assert cache.get(_key("retail?"), "1") is not None
+
+    time.sleep(0.1)
+
+    assert cache.get(_key("retail?"), "1") is None
+    assert cache.stats().size == 0
+
+
+def test_store_versions_are_kept_per_store(tmp_path: Path) -> None:
+    before = read_store_version(tmp_path, ["retail", "logistics"])
+    bump_store_version(tmp_path, "logistics")
+
+    assert read_store_version(tmp_path, "retail") == "0"
+    assert read_store_version(tmp_path, "logistics") != "0"
+    assert read_store_version(tmp_path, ["logistics", "retail"]) != before
+
+
+def test_ingesting_any_folder_invalidates_cached_answers_for_its_store(
+    fake_client: MakeClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    client = fake_client()
+    data_dir = tmp_path / "data"
+    monkeypatch.setenv("DATA_DIR", str(data_dir))
+    monkeypatch.setattr(main, "DATA_DIR", data_dir)
+    monkeypatch.setattr(main, "CASE_STUDIES_DIR", tmp_path / "case-studies")
+    monkeypatch.setattr(main, "query_cache", QueryCache(max_entries=16))
+    monkeypatch.setattr(main, "query_flight", SingleFlight())
+    ingestion_client = FakeGenaiClient(FakeSettings(latency_seconds=0.0, operation_seconds=0.0))
+    monkeypatch.setattr(ingestion, "create_genai_client", lambda api_key=None: ingestion_client)
+
+    question = "Which case studies cover retail?"
+    asyncio.run(main._answer_question(client, question))
+    asyncio.run(main._answer_question(client, question))
+    assert main.query_flight.calls == 1
+
+    # Ingest a folder that is not the API's case-studies folder
+    other_folder = tmp_path / "imported"
+    other_folder.mkdir()
+    (other_folder / "retail.md").write_text("# Retail\n\nCheckout times fell by 30%.\n")
+    ingestion.main(str(other_folder), main.DEFAULT_STORE)
+
+    asyncio.run(main._answer_question(client, question))
+    assert main.query_flight.calls == 2
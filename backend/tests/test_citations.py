@@ -0,0 +1,94 @@
+"""Citations and answer spans built from grounding metadata."""
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from app.citations import build_citations
+
+
+def _chunk(title: str, text: str, chunk_id: Optional[str] = None) -> Any:
+    return SimpleNamespace(
+        id=chunk_id, retrieved_context=SimpleNamespace(title=title, text=text)
+    )
+
+
+def _support(
+    start: int, end: int, indices: list[int], scores: Optional[list[float]] = None
+) -> Any:
+    return SimpleNamespace(
+        segment=SimpleNamespace(start_index=start, end_index=end, text=None),
+        grounding_chunk_indices=indices,
+        confidence_scores=scores,
+    )
+
+
+def _metadata(chunks: list[Any], supports: list[Any]) -> Any:
+    return SimpleNamespace(grounding_chunks=chunks, grounding_supports=supports)
+
+
+def test_chunks_are_grouped_per_file_and_supports_count_each_file_once() -> None:
+    answer = "Checkout got faster. Picking sped up. Both cut costs."
+    chunks = [
+        _chunk("retail.md", "Checkout times fell by 30%.", "c1"),
+        _chunk("retail.md", "Checkout times fell by 30%.", "c1"),  # same chunk again
+        _chunk("retail.md", "Queues got shorter.", "c2"),
+        _chunk("logistics.md", "Warehouse picking sped up.", "c3"),
+    ]
+    supports = [
+        # Two chunks of retail.md back this segment: it counts once for the file
+        _support(0, 20, [0, 2]),
+        _support(21, 37, [3]),
+        _support(38, 53, [1, 3]),
+    ]
+
+    citations, spans = build_citations(_metadata(chunks, supports), answer)
+
+    assert [citation.file for citation in citations] == ["retail.md", "logistics.md"]
+    retail, logistics = citations
+    assert retail.chunk_ids == ["c1", "c2"]
+    assert retail.snippet == "Checkout times fell by 30%."
+    # No confidences reported: the score is the share of supports citing the file
+    assert retail.score == round(2 / 3, 3)
+    assert logistics.score == round(2 / 3, 3)
+    assert [span.citations for span in spans] == [[0], [1], [0, 1]]
+    assert [span.text for span in spans] == [
+        "Checkout got faster.",
+        "Picking sped up.",
+        "Both cut costs.",
+    ]
+
+
+def test_each_chunk_takes_the_score_in_its_own_slot() -> None:
+    chunks = [_chunk("retail.md", "Checkout."), _chunk("logistics.md", "Picking.")]
+    supports = [
+        # Slot 0 points outside grounding_chunks; its score must not shift onto slot 1
+        _support(0, 5, [7, 0], [0.95, 0.4]),
+        _support(0, 5, [1, 0], [0.7, 0.6]),
+        # Fewer scores than chunks: the unscored chunk keeps its best score so far
+        _support(0, 5, [0, 1], [0.5]),
+    ]
+
+    citations, _ = build_citations(_metadata(chunks, supports), "Done.")
+
+    scores = {citation.file: citation.score for citation in citations}
+    assert scores == {"retail.md": 0.6, "logistics.md": 0.7}
+    assert [citation.file for citation in citations] == ["logistics.md", "retail.md"]
+
+
+def test_byte_offsets_are_mapped_to_character_spans_in_non_ascii_answers() -> None:
+    answer = "Café checkout — 30% faster. Über-fast picking."
+    first = "Café checkout — 30% faster."
+    second = "Über-fast picking."
+    first_end = len(first.encode("utf-8"))
+    second_start = first_end + 1
+    second_end = second_start + len(second.encode("utf-8"))
+    chunks = [_chunk("retail.md", "Checkout."), _chunk("logistics.md", "Picking.")]
+    supports = [_support(0, first_end, [0]), _support(second_start, second_end, [1])]
+
+    _, spans = build_citations(_metadata(chunks, supports), answer)
+
+    assert [(span.start, span.end) for span in spans] == [
+        (0, len(first)),
+        (len(first) + 1, len(answer)),
+    ]
+    assert [span.text for span in spans] == [first, second]
+    assert [answer[span.start : span.end] for span in spans] == [first, second]
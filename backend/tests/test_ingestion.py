@@ -0,0 +1,166 @@
+"""Ingestion retries and folder sync against the offline fake backend."""
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+
+from app import ingestion
+from app.content_index import ContentIndex
+from app.fake_backend import FakeAPIError, FakeGenaiClient, FakeSettings
+
+
+@pytest.fixture
+def fake_genai(monkeypatch: pytest.MonkeyPatch) -> FakeGenaiClient:
+    """One fake client for every create_genai_client() call of the test."""
+    client = FakeGenaiClient(FakeSettings(latency_seconds=0.0, operation_seconds=0.0))
+    monkeypatch.setenv("GEMINI_BACKEND", "fake")
+    monkeypatch.setattr(ingestion, "create_genai_client", lambda api_key=None: client)
+    return client
+
+
+def test_dry_run_sync_does_not_create_the_store(
+    fake_genai: FakeGenaiClient, tmp_path: Path
+) -> None:
+    folder = tmp_path / "case-studies"
+    folder.mkdir()
+    (folder / "retail.md").write_text("# Retail\n\nCheckout times fell by 30%.\n")
+
+    index_path = str(tmp_path / "index.sqlite3")
+    ingestion.sync(str(folder), "sync-test", index_path=index_path, dry_run=True)
+
+    assert list(fake_genai.file_search_stores.list()) == []
+
+
+class _Pager:
+    """The parts of the SDK pager list_store_documents relies on."""
+
+    def __init__(self, page: list[Any], next_page_token: str | None):
+        self.page = page
+        self.config = {"page_token": next_page_token}
+
+
+def test_store_documents_retry_each_page(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ingestion, "RETRY_BASE_DELAY_SECONDS", 0)
+    pages = {None: (["doc-1", "doc-2"], "page-2"), "page-2": (["doc-3"], None)}
+    fetches: list[str | None] = []
+
+    def list_documents(*, parent: str, config: Any = None) -> _Pager:
+        page_token = (config or {}).get("page_token")
+        fetches.append(page_token)
+        if page_token == "page-2" and fetches.count("page-2") == 1:
+            raise FakeAPIError(429, "Resource exhausted")
+        return _Pager(*pages[page_token])
+
+    client: Any = SimpleNamespace(
+        file_search_stores=SimpleNamespace(documents=SimpleNamespace(list=list_documents))
+    )
+
+    documents = ingestion.list_store_documents(client, "fileSearchStores/test")
+
+    assert documents == ["doc-1", "doc-2", "doc-3"]
+    assert fetches == [None, "page-2", "page-2"]
+
+
+def _failing(*errors: Exception) -> tuple[Callable[[], str], list[int]]:
+    """A call that raises errors in turn, then succeeds; and its call log."""
+    calls: list[int] = []
+
+    def call() -> str:
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return call, calls
+
+
+def test_uploads_are_not_sent_again_after_a_server_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(ingestion, "RETRY_BASE_DELAY_SECONDS", 0)
+
+    upload, calls = _failing(FakeAPIError(503, "Service unavailable"))
+    with pytest.raises(FakeAPIError):
+        ingestion.with_backoff_non_idempotent(upload)
+    assert len(calls) == 1
+
+    # Rejected by quota, or never sent: safe to send again
+    upload, calls = _failing(
+        FakeAPIError(429, "Resource exhausted"), httpx.ConnectError("connection refused")
+    )
+    assert ingestion.with_backoff_non_idempotent(upload) == "ok"
+    assert len(calls) == 3
+
+    # Lookups are idempotent and still retried on server errors
+    lookup, calls = _failing(FakeAPIError(503, "Service unavailable"))
+    assert ingestion.with_backoff(lookup) == "ok"
+    assert len(calls) == 2
+
+
+def _store_documents(client: FakeGenaiClient, display_name: str) -> list[str]:
+    store_name = ingestion.find_store(client, display_name)
+    assert store_name is not None
+    return sorted(doc.name for doc in ingestion.list_store_documents(client, store_name))
+
+
+def test_identical_files_at_two_paths_share_one_document_without_churn(
+    fake_genai: FakeGenaiClient, tmp_path: Path
+) -> None:
+    folder = tmp_path / "case-studies"
+    for region in ("emea", "apac"):
+        (folder / region).mkdir(parents=True)
+        (folder / region / "retail.md").write_text("# Retail\n\nCheckout times fell by 30%.\n")
+    index_path = str(tmp_path / "index.sqlite3")
+
+    ingestion.sync(str(folder), "sync-test", index_path=index_path)
+    documents = _store_documents(fake_genai, "sync-test")
+    assert len(documents) == 1
+
+    # A second pass finds nothing to do: no upload, no delete
+    ingestion.sync(str(folder), "sync-test", index_path=index_path)
+    assert _store_documents(fake_genai, "sync-test") == documents
+    index = ingestion.open_index(index_path)
+    assert len(index.entries("sync-test")) == 2
+
+    # Removing one copy keeps the document the other copy still needs
+    (folder / "apac" / "retail.md").unlink()
+    ingestion.sync(str(folder), "sync-test", index_path=index_path)
+    assert _store_documents(fake_genai, "sync-test") == documents
+    assert [Path(doc.path).parent.name for doc in index.entries("sync-test")] == ["emea"]
+    index.close()
+
+
+def test_content_index_keeps_rows_of_an_old_database(tmp_path: Path) -> None:
+    db_path = tmp_path / "index.sqlite3"
+    case_study = tmp_path / "retail.md"
+    case_study.write_text("# Retail\n")
+    stat = case_study.stat()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE documents (sha256 TEXT NOT NULL, store TEXT NOT NULL, "
+            "document_name TEXT, path TEXT NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (sha256, store))"
+        )
+        conn.execute(
+            "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ("abc", "s", "doc-1", str(case_study), stat.st_size, stat.st_mtime_ns, 0.0),
+        )
+    conn.close()
+
+    index = ContentIndex(db_path)
+    try:
+        assert index.find_unchanged(case_study, "s") is not None
+        index.put("abc", "s", "doc-1", tmp_path / "retail.md")
+        copy = tmp_path / "copy.md"
+        copy.write_text("# Retail\n")
+        index.put("abc", "s", "doc-1", copy)
+        assert sorted(Path(doc.path).name for doc in index.entries("s")) == [
+            "copy.md",
+            "retail.md",
+        ]
+    finally:
+        index.close()
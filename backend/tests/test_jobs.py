@@ -0,0 +1,154 @@
+"""Background upload jobs against the offline fake backend."""
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.gemini_client import GeminiClient
+from app.jobs import UploadJobQueue, UploadJobStore
+
+MakeClient = Callable[..., GeminiClient]
+
+JOB_TIMEOUT_SECONDS = 10.0
+
+
+@pytest.fixture
+def job_store(tmp_path: Path) -> Iterator[UploadJobStore]:
+    store = UploadJobStore(tmp_path / "upload_jobs.sqlite3")
+    yield store
+    store.close()
+
+
+def _case_study(folder: Path, index: int) -> Path:
+    path = folder / f"case-study-{index}.md"
+    path.write_text(f"# Case study {index}\n\nThe customer cut costs by {index}0%.\n")
+    return path
+
+
+def _wait_for(queue: UploadJobQueue, job_ids: list[str]) -> tuple[list[str], int]:
+    """Wait until no job is pending; returns the final statuses and peak thread count."""
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    peak_threads = threading.active_count()
+    while time.monotonic() < deadline:
+        jobs = [queue.status(job_id) for job_id in job_ids]
+        statuses = [job.status if job is not None else "missing" for job in jobs]
+        if not any(status in ("uploading", "processing") for status in statuses):
+            return statuses, peak_threads
+        peak_threads = max(peak_threads, threading.active_count())
+        time.sleep(0.05)
+    raise AssertionError(f"Upload jobs still pending after {JOB_TIMEOUT_SECONDS:g}s")
+
+
+def _operation_name(store: UploadJobStore, job_id: str) -> str | None:
+    job = store.get(job_id)
+    return job["operation_name"] if job is not None else None
+
+
+def test_jobs_hold_no_thread_while_the_store_processes(
+    fake_client: MakeClient, job_store: UploadJobStore, tmp_path: Path
+) -> None:
+    # Two executor threads; eight imports of one second each
+    client = fake_client(GEMINI_MAX_CONCURRENCY="2", FAKE_GEMINI_OPERATION_SECONDS="1")
+    threads_before = threading.active_count()
+    queue = UploadJobQueue(job_store, client, workers=8)
+    try:
+        started = time.monotonic()
+        job_ids = [
+            queue.submit(path.name, path, "jobs-test")
+            for path in (_case_study(tmp_path, i) for i in range(8))
+        ]
+        statuses, peak_threads = _wait_for(queue, job_ids)
+        elapsed = time.monotonic() - started
+    finally:
+        queue.close()
+
+    assert statuses == ["complete"] * 8
+    # The queue's loop thread and the two executor threads, not one thread per job
+    assert peak_threads - threads_before <= 3
+    # Holding executor threads while polling would take four rounds (~4s)
+    assert elapsed < 2.5
+
+
+def test_resume_waits_for_the_recorded_import_instead_of_uploading_again(
+    fake_client: MakeClient,
+    job_store: UploadJobStore,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = fake_client(FAKE_GEMINI_OPERATION_SECONDS="1")
+    stores = client.client.file_search_stores
+    uploads: list[Path] = []
+    upload_to_store = stores.upload_to_file_search_store
+
+    def counting_upload(**kwargs: Any) -> Any:
+        uploads.append(Path(kwargs["file"]))
+        return upload_to_store(**kwargs)
+
+    monkeypatch.setattr(stores, "upload_to_file_search_store", counting_upload)
+    path = _case_study(tmp_path, 1)
+
+    # Stop the queue while the store is processing the file, as a restart would
+    queue = UploadJobQueue(job_store, client)
+    job_id = queue.submit(path.name, path, "jobs-test")
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while _operation_name(job_store, job_id) is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    queue.close()
+
+    resumed_queue = UploadJobQueue(job_store, client)
+    try:
+        assert resumed_queue.resume_pending() == 1
+        statuses, _ = _wait_for(resumed_queue, [job_id])
+    finally:
+        resumed_queue.close()
+
+    assert statuses == ["complete"]
+    assert uploads == [path]
+    documents = stores.documents.list(parent=client.get_store_name("jobs-test"))
+    assert [document.display_name for document in documents] == [path.name]
+
+
+def test_failed_upload_removes_the_file_and_reports_it(
+    fake_client: MakeClient, job_store: UploadJobStore, tmp_path: Path
+) -> None:
+    client = fake_client()
+    path = tmp_path / "notes.xyz"
+    path.write_text("Not a supported document type.\n")
+    failed: list[Path] = []
+
+    queue = UploadJobQueue(job_store, client, on_failure=failed.append)
+    try:
+        job_id = queue.submit(path.name, path, "jobs-test")
+        statuses, _ = _wait_for(queue, [job_id])
+    finally:
+        queue.close()
+
+    assert statuses == ["error"]
+    assert not path.exists()
+    assert failed == [path]
+
+
+def test_job_store_adds_the_operation_column_to_an_old_database(tmp_path: Path) -> None:
+    db_path = tmp_path / "upload_jobs.sqlite3"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE upload_jobs (id TEXT PRIMARY KEY, filename TEXT NOT NULL, "
+            "path TEXT NOT NULL, store_display_name TEXT NOT NULL, sha256 TEXT, "
+            "status TEXT NOT NULL, progress REAL, message TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+    conn.close()
+
+    store = UploadJobStore(db_path)
+    try:
+        job_id = store.create("a.md", tmp_path / "a.md", "jobs-test")
+        store.set_operation(job_id, "fileSearchStores/s/operations/1")
+        assert _operation_name(store, job_id) == "fileSearchStores/s/operations/1"
+        assert [job["id"] for job in store.pending()] == [job_id]
+    finally:
+        store.close()
@@ -0,0 +1,103 @@
+"""The per-worker local index: folder sync, removals and uploads made by other workers."""
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from app import main
+from app.cache import bump_store_version
+from app.retrieval import LocalIndex
+
+
+@pytest.fixture
+def case_studies(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """An empty case-studies folder and a fresh local index for this worker."""
+    folder = tmp_path / "case-studies"
+    folder.mkdir()
+    monkeypatch.setattr(main, "CASE_STUDIES_DIR", folder)
+    monkeypatch.setattr(main, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(main, "local_index", LocalIndex())
+    monkeypatch.setattr(main, "local_index_version", None)
+    return folder
+
+
+def test_local_index_resyncs_when_another_worker_bumps_the_store_version(
+    case_studies: Path, tmp_path: Path
+) -> None:
+    (case_studies / "retail.md").write_text("# Retail\n\nCheckout queues got shorter.\n")
+    main._sync_local_index(wait=True)
+    assert main.local_index.files == {"retail.md"}
+
+    # Another worker saves an upload; until the store version moves it is not seen
+    (case_studies / "logistics.md").write_text("# Logistics\n\nWarehouse picking sped up.\n")
+    assert main._sync_local_index() == 0
+    assert not main.local_index.search("warehouse picking")
+
+    bump_store_version(tmp_path / "data", main.DEFAULT_STORE)
+    assert main._sync_local_index() == 1
+    hits = main.local_index.search("warehouse picking")
+    assert hits and hits[0].file == "logistics.md"
+
+
+def _write_docx(path: Path, paragraphs: list[str]) -> None:
+    """A minimal Word file with one body paragraph per entry."""
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{body}</w:body></w:document>",
+        )
+
+
+def test_word_files_are_indexed_from_their_extracted_text(case_studies: Path) -> None:
+    _write_docx(
+        case_studies / "banking.docx",
+        [
+            "A regional bank moved its loan approvals to a new workflow engine.",
+            "Mortgage approvals now take two days instead of three weeks.",
+        ],
+    )
+
+    assert main.local_index.sync_folder(case_studies) == 1
+
+    hits = main.local_index.search("mortgage approvals")
+    assert hits and hits[0].file == "banking.docx"
+    assert "<!-- page" not in hits[0].snippet
+
+
+def test_same_named_files_in_subfolders_are_indexed_separately(case_studies: Path) -> None:
+    for region, outcome in (("emea", "Checkout queues got shorter."), ("apac", "Stock-outs fell.")):
+        (case_studies / region).mkdir()
+        (case_studies / region / "retail.md").write_text(f"# Retail\n\n{outcome}\n")
+
+    main.local_index.sync_folder(case_studies)
+
+    assert main.local_index.files == {"emea/retail.md", "apac/retail.md"}
+    assert [hit.file for hit in main.local_index.search("stock-outs")][:1] == ["apac/retail.md"]
+    # Citations only carry the bare file name; it matches both files
+    assert main.local_index.has_file("retail.md")
+    assert {hit.file for hit in main.local_index.search("retail", file="retail.md")} == {
+        "emea/retail.md",
+        "apac/retail.md",
+    }
+
+    (case_studies / "apac" / "retail.md").unlink()
+    main.local_index.sync_folder(case_studies)
+    assert main.local_index.files == {"emea/retail.md"}
+
+
+def test_removed_chunks_leave_the_inverted_index() -> None:
+    index = LocalIndex()
+    index.add_text("retail.md", "# Retail\n\nCheckout queues got shorter with self-service tills.")
+    index.add_text("logistics.md", "# Logistics\n\nWarehouse picking sped up.")
+    for n in range(4):
+        index.add_text(f"banking-{n}.md", f"# Banking {n}\n\nLoan approvals got faster.")
+    # Too few dead chunks to compact: the tombstoned chunk stays in the arrays
+    index.remove("retail.md")
+
+    assert "checkout" not in index._postings
+    assert not index.search("checkout queues")
+    # The other file's postings are untouched
+    hits = index.search("warehouse picking")
+    assert hits and hits[0].file == "logistics.md"
@@ -0,0 +1,131 @@
+"""Deadlines, hedging and the circuit breaker around Gemini queries (fake backend)."""
+import asyncio
+import time
+from collections.abc import Callable
+
+import pytest
+
+from app.gemini_client import GeminiClient
+from app.loadtest import percentile
+from app.prompts import SALES_SYSTEM_PROMPT
+from app.resilience import CircuitOpenError, DeadlineExceeded
+
+MakeClient = Callable[..., GeminiClient]
+
+QUESTION = "What ROI did retail customers see?"
+
+
+async def _timed_queries(client: GeminiClient, count: int, concurrency: int) -> list[float]:
+    """Latency of count queries, concurrency at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> float:
+        async with semaphore:
+            started = time.perf_counter()
+            await client.query_async(f"{QUESTION} #{index}", SALES_SYSTEM_PROMPT)
+            return time.perf_counter() - started
+
+    return await asyncio.gather(*(one(index) for index in range(count)))
+
+
+def test_hedging_bounds_p99_under_injected_slowness(fake_client: MakeClient) -> None:
+    client = fake_client(
+        FAKE_GEMINI_SLOW_RATE="0.05",
+        FAKE_GEMINI_SLOW_SECONDS="2",
+        FAKE_GEMINI_SEED="7",
+        GEMINI_HEDGE="true",
+        GEMINI_HEDGE_MIN_DELAY_SECONDS="0.1",
+    )
+
+    async def run() -> list[float]:
+        # Prime the latency tracker the hedging delay is based on
+        await _timed_queries(client, 30, concurrency=4)
+        return await _timed_queries(client, 100, concurrency=4)
+
+    latencies = sorted(asyncio.run(run()))
+    # Unhedged, ~5 of 100 calls take 2s+ and p99 lands on one of them
+    assert percentile(latencies, 99) < 1.0
+
+
+def test_breaker_fails_fast_when_open(fake_client: MakeClient) -> None:
+    client = fake_client(
+        FAKE_GEMINI_ERROR_RATE="1",
+        GEMINI_BREAKER_FAILURES="3",
+        GEMINI_BREAKER_RESET_SECONDS="60",
+    )
+
+    async def run() -> None:
+        for _ in range(3):
+            with pytest.raises(RuntimeError, match="injected"):
+                await client.query_async(QUESTION, SALES_SYSTEM_PROMPT)
+        upstream_calls = client.client.calls
+        started = time.perf_counter()
+        with pytest.raises(CircuitOpenError) as raised:
+            await client.query_async(QUESTION, SALES_SYSTEM_PROMPT)
+        assert time.perf_counter() - started < 0.01
+        assert client.client.calls == upstream_calls
+        assert raised.value.retry_after > 0
+
+    asyncio.run(run())
+    assert client.breaker.state == "open"
+
+
+def test_query_past_its_deadline_raises(fake_client: MakeClient) -> None:
+    client = fake_client(
+        FAKE_GEMINI_SLOW_RATE="1",
+        FAKE_GEMINI_SLOW_SECONDS="2",
+        GEMINI_QUERY_TIMEOUT_SECONDS="0.3",
+    )
+
+    async def run() -> None:
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            await client.query_async(QUESTION, SALES_SYSTEM_PROMPT)
+        assert time.perf_counter() - started < 1.0
+
+    asyncio.run(run())
+
+
+def test_stalled_stream_raises_at_the_query_deadline(fake_client: MakeClient) -> None:
+    client = fake_client(
+        FAKE_GEMINI_SLOW_RATE="1",
+        FAKE_GEMINI_SLOW_SECONDS="2",
+        GEMINI_QUERY_TIMEOUT_SECONDS="0.3",
+    )
+
+    async def run() -> None:
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            async for _ in client.query_stream_async(QUESTION, SALES_SYSTEM_PROMPT):
+                pass
+        assert time.perf_counter() - started < 1.0
+
+    asyncio.run(run())
+
+
+def test_stream_fails_fast_without_a_thread_when_the_breaker_is_open(
+    fake_client: MakeClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = fake_client(
+        FAKE_GEMINI_ERROR_RATE="1",
+        GEMINI_BREAKER_FAILURES="1",
+        GEMINI_BREAKER_RESET_SECONDS="60",
+    )
+
+    async def run() -> None:
+        with pytest.raises(RuntimeError, match="injected"):
+            await client.query_async(QUESTION, SALES_SYSTEM_PROMPT)
+        blocking_calls: list[object] = []
+        run_blocking = client._run_blocking
+
+        async def counting_run_blocking(func: Callable[..., object], *args: object) -> object:
+            blocking_calls.append(func)
+            return await run_blocking(func, *args)
+
+        monkeypatch.setattr(client, "_run_blocking", counting_run_blocking)
+        with pytest.raises(CircuitOpenError):
+            async for _ in client.query_stream_async(QUESTION, SALES_SYSTEM_PROMPT):
+                pass
+        assert blocking_calls == []
+
+    asyncio.run(run())
@@ -0,0 +1,58 @@
+"""Identical questions in flight at the same time share one upstream call."""
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app import main
+from app.cache import QueryCache
+from app.gemini_client import GeminiClient
+from app.singleflight import SingleFlight
+
+MakeClient = Callable[..., GeminiClient]
+
+CONCURRENT_QUESTIONS = 50
+
+
+def test_concurrent_identical_questions_make_one_upstream_call(
+    fake_client: MakeClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    client = fake_client(FAKE_GEMINI_LATENCY_SECONDS="0.2", FAKE_GEMINI_OPERATION_SECONDS="0")
+    case_study = tmp_path / "retail-rollout.md"
+    case_study.write_text("# Retail rollout\n\nA retailer cut checkout times by 30%.\n")
+    ok, message, _ = client.upload_file(case_study, main.DEFAULT_STORE)
+    assert ok, message
+
+    generate_calls = 0
+    models = client.client.models
+    generate_content = models.generate_content
+
+    def counting_generate_content(**kwargs: Any) -> Any:
+        nonlocal generate_calls
+        generate_calls += 1
+        return generate_content(**kwargs)
+
+    monkeypatch.setattr(models, "generate_content", counting_generate_content)
+    # A fresh answer cache and flight group, so nothing is served from earlier tests
+    monkeypatch.setattr(main, "query_cache", QueryCache(max_entries=16))
+    monkeypatch.setattr(main, "query_flight", SingleFlight())
+
+    async def ask_all() -> list[main.QueryResponse]:
+        question = "Which case studies cover retail?"
+        return await asyncio.gather(
+            *(main._answer_question(client, question) for _ in range(CONCURRENT_QUESTIONS))
+        )
+
+    responses = asyncio.run(ask_all())
+
+    assert generate_calls == 1
+    assert main.query_flight.calls == 1
+    assert main.query_flight.coalesced == CONCURRENT_QUESTIONS - 1
+    first = responses[0]
+    assert first.answer
+    assert first.citations
+    for response in responses[1:]:
+        assert response.answer == first.answer
+        assert response.citations == first.citations
@@ -0,0 +1,135 @@
+"""/api/upload streams the multipart body to disk, after admission, instead of spooling it."""
+import asyncio
+import hashlib
+from collections.abc import AsyncIterator, Callable, Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app import main
+from app.admission import RateLimiter
+from app.gemini_client import GeminiClient
+from app.jobs import UploadJobQueue, UploadJobStore
+from app.retrieval import LocalIndex
+
+MakeClient = Callable[..., GeminiClient]
+
+BOUNDARY = "upload-test"
+BODY_CHUNK_BYTES = 64 * 1024
+
+
+@pytest.fixture
+def case_studies(
+    fake_client: MakeClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Iterator[Path]:
+    """The API's case-studies folder, with upload jobs on the fake backend."""
+    folder = tmp_path / "case-studies"
+    store = UploadJobStore(tmp_path / "upload_jobs.sqlite3")
+    queue = UploadJobQueue(store, fake_client(FAKE_GEMINI_OPERATION_SECONDS="0"))
+    monkeypatch.setattr(main, "CASE_STUDIES_DIR", folder)
+    monkeypatch.setattr(main, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(main, "local_index", LocalIndex())
+    monkeypatch.setattr(main, "upload_jobs", queue)
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(rate_per_minute=0))
+    yield folder
+    queue.close()
+    store.close()
+
+
+def _multipart(filename: str, size_bytes: int, sent: list[int]) -> AsyncIterator[bytes]:
+    """A multipart body with one file, sent in chunks; sent counts the chunks read."""
+
+    async def body() -> AsyncIterator[bytes]:
+        yield (
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"store\"\r\n\r\n"
+            f"{main.DEFAULT_STORE}\r\n--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: text/markdown\r\n\r\n"
+        ).encode()
+        for offset in range(0, size_bytes, BODY_CHUNK_BYTES):
+            sent.append(offset)
+            yield b"x" * min(BODY_CHUNK_BYTES, size_bytes - offset)
+        yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    return body()
+
+
+def _upload(filename: str, size_bytes: int, sent: list[int]) -> httpx.Response:
+    async def send() -> httpx.Response:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://test"
+        ) as client:
+            return await client.post(
+                "/api/upload",
+                content=_multipart(filename, size_bytes, sent),
+                headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+            )
+
+    return asyncio.run(send())
+
+
+def test_upload_is_written_once_to_the_case_studies_folder(case_studies: Path) -> None:
+    sent: list[int] = []
+    response = _upload("retail.md", 3 * 1024 * 1024, sent)
+
+    assert response.status_code == 202, response.text
+    saved = case_studies / "retail.md"
+    assert response.json()["filename"] == saved.name
+    assert saved.read_bytes() == b"x" * (3 * 1024 * 1024)
+    assert [path.name for path in case_studies.iterdir()] == [saved.name]
+    job = main.upload_jobs.store.get(response.json()["job_id"]) if main.upload_jobs else None
+    assert job is not None
+    assert job["sha256"] == hashlib.sha256(saved.read_bytes()).hexdigest()
+
+
+def test_oversized_upload_stops_reading_at_the_limit(
+    case_studies: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main, "MAX_FILE_SIZE_BYTES", 1024 * 1024)
+    sent: list[int] = []
+    response = _upload("huge.md", 8 * 1024 * 1024, sent)
+
+    assert response.status_code == 400
+    assert "limit" in response.json()["detail"]
+    # Rejected after ~1MB of the 8MB body, and no partial file is left behind
+    assert len(sent) * BODY_CHUNK_BYTES <= 2 * 1024 * 1024
+    assert list(case_studies.iterdir()) == []
+
+
+def test_unsupported_file_type_is_rejected_before_its_data_is_read(case_studies: Path) -> None:
+    sent: list[int] = []
+    response = _upload("payload.exe", 1024 * 1024, sent)
+
+    assert response.status_code == 400
+    assert "Unsupported file type" in response.json()["detail"]
+    assert sent == []
+
+
+def test_rate_limited_upload_is_rejected_before_its_body_is_read(
+    case_studies: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(rate_per_minute=1, burst=1))
+    assert _upload("retail.md", 1024, []).status_code == 202
+
+    sent: list[int] = []
+    response = _upload("logistics.md", 1024 * 1024, sent)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert sent == []
+
+
+def test_upload_beyond_the_gate_queue_is_rejected_before_its_body_is_read(
+    case_studies: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(main.upload_gate, "running", main.upload_gate.max_concurrency)
+    monkeypatch.setattr(main.upload_gate, "max_queue", 0)
+
+    sent: list[int] = []
+    response = _upload("retail.md", 1024 * 1024, sent)
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert sent == []
+    assert not case_studies.exists() or list(case_studies.iterdir()) == []
@@ -10,7 +10,7 @@ import { Button, LoadingSpinner, ErrorAlert, EmptyState } from './ui';
 import { QUERY_EXAMPLES } from '../constants';
 
 export function Chat() {
-  const { data, loading, error, execute, reset } = useQuery();
+  const { data, loading, streaming, error, execute, reset } = useQuery();
   const { health, refetch: refetchHealth } = useHealthCheck(true);
   const [showUpload, setShowUpload] = useState(false);
 
@@ -71,7 +71,7 @@ export function Chat() {
 
       <QueryForm onSubmit={handleSubmit} isLoading={loading} />
 
-      {loading && <LoadingSpinner message="Querying case studies..." />}
+      {loading && !streaming && <LoadingSpinner message="Querying case studies..." />}
 
       {error && <ErrorAlert message={error} onDismiss={handleErrorDismiss} />}
 
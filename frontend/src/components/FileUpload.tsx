@@ -1,11 +1,28 @@
 /** File upload component with drag-and-drop support. */
 
 import { useCallback, useState } from 'react';
-import { uploadFile } from '../services/api.service';
+import { getUploadStatus, uploadFile } from '../services/api.service';
 import { getErrorMessage } from '../utils/errors';
 import { ErrorAlert, LoadingSpinner } from './ui';
-import { MAX_FILE_SIZE_MB, SUPPORTED_FILE_TYPES } from '../constants';
-import type { UploadResponse } from '../types';
+import { MAX_FILE_SIZE_MB, SUPPORTED_FILE_TYPES, UPLOAD_POLL_INTERVAL } from '../constants';
+import type { UploadProgressResponse, UploadResponse } from '../types';
+
+/**
+ * Polls an upload job until it completes or fails.
+ */
+async function waitForUploadJob(
+  jobId: string,
+  onProgress: (status: UploadProgressResponse) => void
+): Promise<UploadProgressResponse> {
+  for (;;) {
+    const status = await getUploadStatus(jobId);
+    onProgress(status);
+    if (status.status === 'complete' || status.status === 'error') {
+      return status;
+    }
+    await new Promise((resolve) => setTimeout(resolve, UPLOAD_POLL_INTERVAL));
+  }
+}
 
 interface FileUploadProps {
   onUploadSuccess?: () => void;
@@ -49,6 +66,19 @@ export function FileUpload({ onUploadSuccess }: FileUploadProps) {
 
       try {
         const result: UploadResponse = await uploadFile(file);
+        if (result.success && result.job_id) {
+          const job = await waitForUploadJob(result.job_id, (status) => {
+            setUploadProgress(
+              status.status === 'processing'
+                ? `Processing ${status.filename}...`
+                : `Uploading ${status.filename}...`
+            );
+          });
+          if (job.status === 'error') {
+            setError(job.message || 'Upload failed');
+            return;
+          }
+        }
         if (result.success) {
           setSuccess(`✓ ${result.filename} uploaded successfully`);
           setUploadProgress(null);
@@ -6,12 +6,14 @@ export const API_BASE_URL =
 
 export const API_ENDPOINTS = {
   QUERY: '/api/query',
+  QUERY_STREAM: '/api/query/stream',
   HEALTH: '/health',
   UPLOAD: '/api/upload',
 } as const;
 
 export const SUPPORTED_FILE_TYPES = ['.pdf', '.docx', '.txt', '.md'] as const;
 export const MAX_FILE_SIZE_MB = 100;
+export const UPLOAD_POLL_INTERVAL = 2000; // milliseconds
 
 export const QUERY_EXAMPLES = [
   'ecommerce platform with Shopify integration',
@@ -1,18 +1,20 @@
 /** Custom hook for managing query state and execution. */
 
 import { useCallback, useState } from 'react';
-import { queryCaseStudies } from '../services/api.service';
+import { streamQueryCaseStudies } from '../services/api.service';
 import { getErrorMessage } from '../utils/errors';
 import { validateQuestion } from '../utils/validation';
 import type { QueryResponse, UseQueryReturn } from '../types';
 
 /**
  * Hook for managing case study queries.
- * Handles loading, error, and data states.
+ * Handles loading, streaming, error, and data states.
+ * The answer is streamed into `data` as it is generated.
  */
 export function useQuery(): UseQueryReturn {
   const [data, setData] = useState<QueryResponse | null>(null);
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const execute = useCallback(async (question: string): Promise<void> => {
@@ -30,13 +32,19 @@ export function useQuery(): UseQueryReturn {
     setData(null);
 
     try {
-      const result = await queryCaseStudies(question);
+      let answer = '';
+      const result = await streamQueryCaseStudies(question, (text) => {
+        answer += text;
+        setStreaming(true);
+        setData({ answer, citations: [] });
+      });
       setData(result);
     } catch (err) {
       setError(getErrorMessage(err));
       setData(null);
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   }, []);
 
@@ -44,11 +52,13 @@ export function useQuery(): UseQueryReturn {
     setData(null);
     setError(null);
     setLoading(false);
+    setStreaming(false);
   }, []);
 
   return {
     data,
     loading,
+    streaming,
     error,
     execute,
     reset,
@@ -2,7 +2,13 @@
 
 import { ApiError, getErrorMessage } from '../utils/errors';
 import { API_BASE_URL, API_ENDPOINTS } from '../constants';
-import type { HealthResponse, QueryRequest, QueryResponse, UploadResponse } from '../types';
+import type {
+  HealthResponse,
+  QueryRequest,
+  QueryResponse,
+  UploadProgressResponse,
+  UploadResponse,
+} from '../types';
 
 /**
  * Base fetch wrapper with error handling and timeout.
@@ -89,6 +95,83 @@ export async function queryCaseStudies(question: string): Promise<QueryResponse>
   return handleResponse<QueryResponse>(response);
 }
 
+/**
+ * Query case studies and stream the answer as it is generated.
+ * Calls onDelta with each text fragment and resolves with the final answer and citations.
+ */
+export async function streamQueryCaseStudies(
+  question: string,
+  onDelta: (text: string) => void
+): Promise<QueryResponse> {
+  const url = `${API_BASE_URL}${API_ENDPOINTS.QUERY_STREAM}`;
+
+  const response = await fetchWithTimeout(
+    url,
+    {
+      method: 'POST',
+      headers: {
+        Accept: 'text/event-stream',
+      },
+      body: JSON.stringify({ question } satisfies QueryRequest),
+    },
+    120000
+  );
+
+  if (!response.ok || !response.body) {
+    return handleResponse<QueryResponse>(response);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const event = parseSseEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      if (event.name === 'delta') {
+        onDelta((event.data as { text: string }).text);
+      } else if (event.name === 'done') {
+        return event.data as QueryResponse;
+      } else if (event.name === 'error') {
+        throw new ApiError(String((event.data as { detail?: string }).detail ?? 'Query failed'));
+      }
+    }
+  }
+
+  throw new ApiError('Stream ended before the answer was complete');
+}
+
+/**
+ * Parses a single Server-Sent Event block into its name and JSON data.
+ */
+function parseSseEvent(block: string): { name: string; data: unknown } {
+  let name = 'message';
+  const dataLines: string[] = [];
+  for (const line of block.split('\n')) {
+    if (line.startsWith('event:')) {
+      name = line.slice(6).trim();
+    } else if (line.startsWith('data:')) {
+      dataLines.push(line.slice(5).trimStart());
+    }
+  }
+  try {
+    return { name, data: JSON.parse(dataLines.join('\n')) as unknown };
+  } catch {
+    throw new ApiError('Invalid event received from server');
+  }
+}
+
 /**
  * Check API health status.
  */
@@ -104,6 +187,7 @@ export async function checkHealth(): Promise<HealthResponse> {
 
 /**
  * Upload a file to the knowledge base.
+ * The server queues the upload and returns a job id; poll it with getUploadStatus.
  */
 export async function uploadFile(file: File): Promise<UploadResponse> {
   const url = `${API_BASE_URL}${API_ENDPOINTS.UPLOAD}`;
@@ -136,3 +220,16 @@ export async function uploadFile(file: File): Promise<UploadResponse> {
     throw new ApiError(getErrorMessage(error), undefined, error);
   }
 }
+
+/**
+ * Get the progress of a background upload job.
+ */
+export async function getUploadStatus(jobId: string): Promise<UploadProgressResponse> {
+  const url = `${API_BASE_URL}${API_ENDPOINTS.UPLOAD}/${encodeURIComponent(jobId)}`;
+
+  const response = await fetchWithTimeout(url, {
+    method: 'GET',
+  });
+
+  return handleResponse<UploadProgressResponse>(response);
+}
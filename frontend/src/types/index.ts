@@ -3,12 +3,27 @@
 export interface Citation {
   file: string;
   chunk_id?: string;
+  chunk_ids?: string[];
   page?: number;
+  snippet?: string | null;
+  /** Relevance in [0, 1]. */
+  score?: number | null;
+}
+
+/** Part of the answer backed by sources (character offsets, end exclusive). */
+export interface AnswerSpan {
+  start: number;
+  end: number;
+  text: string;
+  /** Indices into QueryResponse.citations. */
+  citations: number[];
 }
 
 export interface QueryResponse {
   answer: string;
   citations: Citation[];
+  spans?: AnswerSpan[];
+  degraded?: boolean;
 }
 
 export interface QueryRequest {
@@ -24,6 +39,8 @@ export interface HealthResponse {
 export interface QueryState {
   data: QueryResponse | null;
   loading: boolean;
+  /** True once the first streamed tokens have arrived and until the answer is complete. */
+  streaming: boolean;
   error: string | null;
 }
 
@@ -37,4 +54,15 @@ export interface UploadResponse {
   filename: string;
   message: string;
   file_size_mb?: number | null;
+  job_id?: string | null;
+}
+
+export type UploadStatus = 'uploading' | 'processing' | 'complete' | 'error';
+
+export interface UploadProgressResponse {
+  job_id: string;
+  filename: string;
+  status: UploadStatus;
+  progress?: number | null;
+  message?: string | null;
 }
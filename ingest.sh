@@ -1,12 +1,13 @@
 #!/bin/bash
 # Helper script to run ingestion
-# Usage: ./ingest.sh [folder_path]
+# Usage: ./ingest.sh [folder_path] [extra ingestion options, e.g. --workers 8]
 
 FOLDER=${1:-./case-studies}
+shift
 
 echo "Starting ingestion from: $FOLDER"
 echo "Make sure GEMINI_API_KEY is set in .env file"
 echo ""
 
-docker compose run --rm backend python /app/ingestion.py --folder "$FOLDER"
+docker compose run --rm backend python -m app.ingestion --folder "$FOLDER" "$@"
 
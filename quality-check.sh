@@ -16,22 +16,34 @@ if command -v python3 &> /dev/null; then
     python3 -m pip install -q -r requirements-dev.txt 2>/dev/null || true
     
     echo "  ✓ Running Black (formatting)..."
-    python3 -m black --check app/ || {
+    python3 -m black --check app/ benchmarks/ || {
         echo "  ⚠️  Formatting issues found. Run: make format"
         exit 1
     }
     
     echo "  ✓ Running Ruff (linting)..."
-    python3 -m ruff check app/ || {
+    python3 -m ruff check app/ benchmarks/ || {
         echo "  ⚠️  Linting issues found. Run: make format"
         exit 1
     }
     
     echo "  ✓ Running MyPy (type checking)..."
-    python3 -m mypy app/ --ignore-missing-imports || {
+    python3 -m mypy app/ benchmarks/ --ignore-missing-imports || {
         echo "  ⚠️  Type checking issues found"
         exit 1
     }
+
+    echo "  ✓ Running tests (pytest)..."
+    python3 -m pytest -q || {
+        echo "  ⚠️  Tests failed"
+        exit 1
+    }
+
+    echo "  ✓ Checking cold start (import-time budget)..."
+    python3 -m benchmarks.bench_startup --runs 3 --top 5 --max-import-ms 1500 --max-ready-ms 2000 || {
+        echo "  ⚠️  Cold start regressed; keep heavy imports out of app.main's import path"
+        exit 1
+    }
 else
     echo "  ⚠️  Python3 not found, skipping backend checks"
 fi